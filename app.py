@@ -1,9 +1,11 @@
 # ia_resumen_bancario_santafe.py
 # Herramienta para uso interno - AIE San Justo (Banco de Santa Fe)
 
-import io, re
+import io
 from pathlib import Path
-import numpy as np, pandas as pd, streamlit as st
+import streamlit as st
+from parsers.cache import CACHE, content_key
+from parsers import perf
 
 HERE = Path(__file__).parent
 ASSETS = HERE / "assets"
@@ -18,361 +20,278 @@ if LOGO.exists():
     st.image(str(LOGO), width=200)
 st.title("IA Resumen Bancario – Banco de Santa Fe")
 
-try:
-    import pdfplumber
-except Exception as e:
-    st.error(f"No se pudo importar pdfplumber: {e}")
+modo=st.radio("Modo",("Un archivo","Varios archivos"),horizontal=True,label_visibility="collapsed")
+
+# ===========================
+#   VARIOS ARCHIVOS (en segundo plano)
+# ===========================
+# Cada PDF va a un pool de hilos (parsers.tareas) y la tabla de avance se refresca sola
+# mientras haya archivos en proceso; cada resultado aparece apenas termina.
+if modo=="Varios archivos":
+    subidos=st.file_uploader("Subí los PDFs de los resúmenes (p. ej. el año completo)",type=["pdf"],
+                             accept_multiple_files=True)
+    if not subidos:
+        st.stop()
+    import importlib.util
+    from parsers import tareas
+    hasta="export" if importlib.util.find_spec("xlsxwriter") else "agregados"
+    lote=st.session_state.setdefault("lote",{})   # hash del PDF → Tarea (no se reenvía en cada rerun)
+    activas=[]
+    for f in subidos:
+        data=f.getvalue()
+        k=content_key(data)
+        if k not in lote: lote[k]=tareas.enviar(f.name,data,hasta)
+        if lote[k] not in activas: activas.append(lote[k])
+    en_proceso=any(not t.terminada() for t in activas)
+
+    @st.fragment(run_every=1.0 if en_proceso else None)
+    def avance():
+        import pandas as pd
+        from parsers.common import fmt_cents, vista_pesos
+        listas=sum(t.estado=="listo" for t in activas)
+        st.caption(f"{listas} de {len(activas)} procesados · "
+                   f"{sum(t.estado=='error' for t in activas)} con error")
+        st.dataframe(pd.DataFrame([t.fila() for t in activas]),hide_index=True,use_container_width=True)
+        for t in activas:
+            if t.estado!="listo": continue
+            r=t.resultado; res=r["res"]
+            with st.expander(f"{t.nombre} · {r['banco']} · {'Conciliado' if res['cuadra'] else 'No cuadra'}"):
+                c1,c2,c3,c4=st.columns(4)
+                with c1: st.metric("Saldo inicial",f"$ {fmt_cents(res['saldo_inicial'])}")
+                with c2: st.metric("Créditos (+)",f"$ {fmt_cents(res['total_creditos'])}")
+                with c3: st.metric("Débitos (–)",f"$ {fmt_cents(res['total_debitos'])}")
+                with c4: st.metric("Diferencia",f"$ {fmt_cents(res['diferencia'])}")
+                st.metric("Total Gastos Bancarios",f"$ {fmt_cents(r['agregados']['total_gastos'])}")
+                st.dataframe(vista_pesos(r["df"]),use_container_width=True)
+                if "xlsx" in r:
+                    st.download_button("📥 Descargar Excel",data=r["xlsx"],key=f"xlsx-{t.clave}",
+                                       file_name=f"{Path(t.nombre).stem}.xlsx",
+                                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        # resumen operativo por mes de todo el lote: combina los rollups mensuales (cacheados
+        # por PDF), no vuelve a recorrer los movimientos
+        rollups=[t.resultado["rollup"] for t in activas if t.estado=="listo"]
+        if rollups:
+            from parsers.agregados import combinar, operativo_por
+            st.subheader("Resumen Operativo por mes")
+            por_mes=operativo_por(combinar(rollups),("mes",))
+            st.dataframe(por_mes.map(fmt_cents),use_container_width=True)
+        # al terminar el último se rehace la página entera (y el fragmento deja de refrescarse)
+        if en_proceso and all(t.terminada() for t in activas):
+            st.rerun()
+
+    avance()
     st.stop()
 
-DATE_RE = re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}\b")
-MONEY_RE = re.compile(r'(?<!\S)-?(?:\d{1,3}(?:\.\d{3})*|\d+)\s?,\s?\d{2}-?(?!\S)')
-LONG_INT_RE = re.compile(r"\b\d{6,}\b")
-
-def normalize_money(tok: str) -> float:
-    if not tok: return np.nan
-    tok = tok.strip().replace("−", "-")
-    neg = tok.endswith("-") or tok.startswith("-")
-    tok = tok.strip("-")
-    if "," not in tok: return np.nan
-    main, frac = tok.rsplit(",", 1)
-    main = main.replace(".", "").replace(" ", "")
-    try:
-        val = float(f"{main}.{frac}")
-        return -val if neg else val
-    except: return np.nan
-
-def fmt_ar(n): 
-    return "—" if (n is None or (isinstance(n,float) and np.isnan(n))) else f"{n:,.2f}".replace(",", "§").replace(".", ",").replace("§",".")
-
-def lines_from_text(page): 
-    return [" ".join(l.split()) for l in (page.extract_text() or "").splitlines()]
-
-def lines_from_words(page, ytol=2.0):
-    words = page.extract_words(extra_attrs=["x0","top"])
-    if not words: return []
-    words.sort(key=lambda w:(round(w["top"]/ytol),w["x0"]))
-    lines,cur,band=[],[],None
-    for w in words:
-        b=round(w["top"]/ytol)
-        if band is None or b==band: cur.append(w)
-        else: lines.append(" ".join(x["text"] for x in cur)); cur=[w]
-        band=b
-    if cur: lines.append(" ".join(x["text"] for x in cur))
-    return [" ".join(l.split()) for l in lines]
-
-def normalize_desc(desc): 
-    return " ".join(LONG_INT_RE.sub("", (desc or "").upper()).split())
-
-def extract_all_lines(file_like):
-    out=[]
-    with pdfplumber.open(file_like) as pdf:
-        for pi,p in enumerate(pdf.pages,start=1):
-            lt=lines_from_text(p); lw=lines_from_words(p,ytol=2.0)
-            seen=set(lt); combined=lt+[l for l in lw if l not in seen]
-            for l in combined:
-                if l.strip(): out.append((pi," ".join(l.split())))
-    return out
-def find_saldo_anterior(lines):
-    for _,ln in lines:
-        u=ln.upper()
-        if "SALDO ANTERIOR" in u or "SALDO ULTIMO RESUMEN" in u:
-            am=list(MONEY_RE.finditer(ln))
-            if am: return normalize_money(am[-1].group(0))
-    return np.nan
-
-def find_saldo_final_pdf(lines):
-    for _,ln in reversed(lines):
-        u=ln.upper()
-        if "SALDO AL" in u or "SALDO FINAL" in u:
-            am=list(MONEY_RE.finditer(ln))
-            if am: return normalize_money(am[-1].group(0))
-    return np.nan
-
-def detectar_signo_santafe(desc_norm: str) -> str:
-    u = (desc_norm or "").upper()
-
-    # Créditos claros
-    if any(k in u for k in ("DTNPROVE", "DEP EFEC", "DEPOSITO EFECTIVO", "TRANLINK")):
-        return "credito"
-
-    # Depósito de cheque propio → crédito
-    if "DEP CH PROPIO" in u or "D CH PRO" in u:
-        return "credito"
-
-    # Todo lo demás → débito
-    return "debito"
-
-
-def clasificar(desc,desc_norm,deb,cre):
-    u=(desc or "").upper(); n=(desc_norm or "").upper()
-    if "IVA GRAL" in u: return "IVA 21% (sobre comisiones)"
-    if "IVA RINS" in u: return "IVA 10,5% (sobre comisiones)"
-    if "IMPTRANS" in u or "LEY 25413" in u: return "LEY 25.413"
-    if "SIRCREB" in u: return "SIRCREB"
-    if "COM" in u: return "Gastos por comisiones"
-    if "DEBITO INMEDIATO" in u: return "Débito automático"
-    if cre: return "Crédito"
-    if deb: return "Débito"
-    return "Otros"
-
-def parse_movimientos_santafe(lines):
-    rows=[]; orden=0
-    for pageno,ln in lines:
-        u=ln.upper()
-        if "FECHA MOVIMIENTO" in u or "CONCEPTO" in u: continue
-        if "SALDO ANTERIOR" in u or "SALDO ULTIMO RESUMEN" in u: continue
-        d=DATE_RE.search(ln)
-        if not d: continue
-        am=list(MONEY_RE.finditer(ln))
-        if not am: continue
-        mcount=len(am)
-        if mcount>=2:
-            importe_str=am[-2].group(0); saldo_str=am[-1].group(0)
-            saldo_pdf=normalize_money(saldo_str)
-        else:
-            importe_str=am[-1].group(0); saldo_pdf=np.nan
-        importe=normalize_money(importe_str)
-        first_money=am[0]; desc=ln[d.end():first_money.start()].strip()
-        orden+=1
-        rows.append({"fecha":pd.to_datetime(d.group(0),dayfirst=True,errors="coerce"),
-                     "descripcion":desc,"desc_norm":normalize_desc(desc),
-                     "importe_raw":abs(importe),"saldo_pdf":saldo_pdf,
-                     "mcount":mcount,"pagina":pageno,"orden":orden})
-    return pd.DataFrame(rows)
 uploaded=st.file_uploader("Subí un PDF del resumen bancario (Banco de Santa Fe)",type=["pdf"])
 if uploaded is None: 
     st.stop()
 
-data=uploaded.read()
-lines=extract_all_lines(io.BytesIO(data))
-df_raw=parse_movimientos_santafe(lines)
-
-tiene_saldo_por_linea=df_raw["mcount"].max()>=2
-saldo_anterior=find_saldo_anterior(lines)
-saldo_final_pdf=find_saldo_final_pdf(lines)
-
-df=df_raw.sort_values(["fecha","pagina","orden"]).reset_index(drop=True)
-
-# Insertar saldo anterior
-if not np.isnan(saldo_anterior):
-    apertura={
-        "fecha":df["fecha"].min()-pd.Timedelta(days=1),
-        "descripcion":"SALDO ANTERIOR",
-        "desc_norm":"SALDO ANTERIOR",
-        "importe_raw":0.0,
-        "saldo_pdf":saldo_anterior,
-        "mcount":0,
-        "pagina":0,
-        "orden":0
-    }
-    df=pd.concat([pd.DataFrame([apertura]),df],ignore_index=True)
-
-df["debito"]=0.0
-df["credito"]=0.0
-df["saldo"]=np.nan
-df["signo"]=""
-
-# ---------- Caso 1: PDF con SALDO por línea ----------
-if tiene_saldo_por_linea:
-    for idx,row in df.iterrows():
-        if row["desc_norm"]=="SALDO ANTERIOR":
-            continue
-        importe=float(row["importe_raw"])
-        signo=detectar_signo_santafe(row["desc_norm"])
-        if signo=="debito":
-            df.at[idx,"debito"]=importe
-        else:
-            df.at[idx,"credito"]=importe
-    df["saldo"]=saldo_anterior+df["credito"].cumsum()-df["debito"].cumsum()
-    df.loc[df["debito"]>0,"signo"]="debito"
-    df.loc[df["credito"]>0,"signo"]="credito"
-
-# ---------- Caso 2: PDF SIN saldo por línea ----------
-else:
-    saldos=[]; debitos=[]; creditos=[]; signos=[]
-    saldo=float(saldo_anterior) if not np.isnan(saldo_anterior) else 0.0
-    for idx,row in df.iterrows():
-        if idx==0 and row["desc_norm"]=="SALDO ANTERIOR":
-            saldos.append(saldo)
-            debitos.append(0.0)
-            creditos.append(0.0)
-            signos.append("saldo")
-            continue
-        importe=float(row["importe_raw"])
-        signo=detectar_signo_santafe(row["desc_norm"])
-        if signo=="debito":
-            saldo-=importe
-            deb=importe; cre=0.0
-        else:
-            saldo+=importe
-            deb=0.0; cre=importe
-        saldos.append(saldo)
-        debitos.append(deb)
-        creditos.append(cre)
-        signos.append(signo)
-    df["saldo"]=saldos
-    df["debito"]=debitos
-    df["credito"]=creditos
-    df["signo"]=signos
-
-# Excluir saldo final como movimiento
-df = df[~df["desc_norm"].str.upper().str.contains("SALDO AL|SALDO FINAL")]
-df = df[~((df["desc_norm"] == "") & (df["debito"] > 0) & (df["orden"] > df["orden"].max() - 2))]
-
-
-# Clasificación
-df["Clasificación"]=df.apply(
-    lambda r: clasificar(str(r.get("descripcion","")),
-                         str(r.get("desc_norm","")),
-                         float(r.get("debito",0.0)),
-                         float(r.get("credito",0.0))),
-    axis=1
-)
-# ===========================
-#   RESUMEN / CONCILIACIÓN
-# ===========================
-df_sorted = df.reset_index(drop=True)
-
-saldo_inicial = float(df_sorted["saldo"].iloc[0])
-total_debitos = float(df_sorted["debito"].sum())
-total_creditos = float(df_sorted["credito"].sum())
-
-saldo_final_visto = float(saldo_final_pdf) if not np.isnan(saldo_final_pdf) else float(df_sorted["saldo"].iloc[-1])
-saldo_final_calculado = saldo_inicial + total_creditos - total_debitos
-diferencia = saldo_final_calculado - saldo_final_visto
-cuadra = abs(diferencia) < 0.01
-
-st.subheader("Resumen del período")
-c1, c2, c3 = st.columns(3)
-with c1: st.metric("Saldo inicial", f"$ {fmt_ar(saldo_inicial)}")
-with c2: st.metric("Créditos (+)", f"$ {fmt_ar(total_creditos)}")
-with c3: st.metric("Débitos (–)", f"$ {fmt_ar(total_debitos)}")
-
-c4, c5, c6 = st.columns(3)
-with c4: st.metric("Saldo final (PDF)", f"$ {fmt_ar(saldo_final_visto)}")
-with c5: st.metric("Saldo final calculado", f"$ {fmt_ar(saldo_final_calculado)}")
-with c6: st.metric("Diferencia", f"$ {fmt_ar(diferencia)}")
-
-if cuadra: st.success("Conciliado.")
-else: st.error("No cuadra la conciliación (revisar signos/clasificación).")
-
-st.markdown("---")
+# pandas/numpy y el parser se cargan recién con el primer archivo (pdfplumber al abrirlo)
+try:
+    from parsers.common import fmt_cents, vista_pesos
+    from parsers.santafe import leer_santafe, procesar_santafe
+    from parsers.agregados import resumen_operativo
+    from parsers.clasificacion import version_reglas
+    from parsers.santafe import REGLAS
+    from parsers import plantillas
+except Exception as e:
+    st.error(f"No se pudieron importar los parsers: {e}")
+    st.stop()
 
-# ===========================
-#   RESUMEN OPERATIVO
-# ===========================
-st.subheader("Resumen Operativo: Registración Módulo IVA")
-
-iva21 = float(df_sorted.loc[df_sorted["Clasificación"].eq("IVA 21% (sobre comisiones)"), "debito"].sum())
-iva105 = float(df_sorted.loc[df_sorted["Clasificación"].eq("IVA 10,5% (sobre comisiones)"), "debito"].sum())
-net21 = round(iva21/0.21,2) if iva21 else 0.0
-net105 = round(iva105/0.105,2) if iva105 else 0.0
-
-percep_iva = float(df_sorted.loc[df_sorted["Clasificación"].eq("Percepciones de IVA"), "debito"].sum())
-ley_25413 = float(df_sorted.loc[df_sorted["Clasificación"].eq("LEY 25.413"), "debito"].sum())
-sircreb = float(df_sorted.loc[df_sorted["Clasificación"].eq("SIRCREB"), "debito"].sum())
-
-# Total gastos bancarios
-gastos_mask = df_sorted["Clasificación"].isin([
-    "IVA 21% (sobre comisiones)",
-    "IVA 10,5% (sobre comisiones)",
-    "LEY 25.413",
-    "SIRCREB",
-    "Gastos por comisiones",
-    "Débito automático"
-])
-total_gastos = float(df_sorted.loc[gastos_mask, "debito"].sum())
-
-m1,m2,m3 = st.columns(3)
-with m1: st.metric("Neto Comisiones 21%", f"$ {fmt_ar(net21)}")
-with m2: st.metric("IVA 21%", f"$ {fmt_ar(iva21)}")
-with m3: st.metric("Bruto 21%", f"$ {fmt_ar(net21+iva21)}")
-
-n1,n2,n3 = st.columns(3)
-with n1: st.metric("Neto Comisiones 10,5%", f"$ {fmt_ar(net105)}")
-with n2: st.metric("IVA 10,5%", f"$ {fmt_ar(iva105)}")
-with n3: st.metric("Bruto 10,5%", f"$ {fmt_ar(net105+iva105)}")
-
-o1,o2,o3 = st.columns(3)
-with o1: st.metric("Percepciones de IVA", f"$ {fmt_ar(percep_iva)}")
-with o2: st.metric("Ley 25.413", f"$ {fmt_ar(ley_25413)}")
-with o3: st.metric("SIRCREB", f"$ {fmt_ar(sircreb)}")
-
-st.metric("Total Gastos Bancarios", f"$ {fmt_ar(total_gastos)}")
-
-st.markdown("---")
+data=uploaded.read()
+# Métricas por etapa de esta corrida (panel de diagnóstico al final). El registro se
+# cierra aunque la corrida termine antes (st.stop, excepción, rerun): no queda activo
+# para la siguiente.
+with perf.registrar("app",archivo=uploaded.name,bytes=len(data)) as reg:
+    # Cache por contenido (SHA-256 + versión del parser): evita re-extraer en cada rerun
+    key=content_key(data)
+    # lo que depende de la clasificación (Excel, Parquet) lleva además la versión de las reglas
+    v_reglas=version_reglas(REGLAS)
+    # Extracción en streaming: sólo se retienen los movimientos y las líneas de saldo.
+    # Con plantilla de Santa Fe se lee sólo la región de la tabla (entra en la clave de cache)
+    plantilla=plantillas.cargar("santafe")
+    with perf.etapa("lectura") as e:
+        df_raw,saldo_lines=CACHE.get_or_compute(key,f"santafe-{plantillas.version(plantilla)}",
+                                                lambda: leer_santafe(io.BytesIO(data),plantilla))
+        e["filas"]=len(df_raw)
+
+    df_sorted,res=procesar_santafe(df_raw,saldo_lines)
+
+    # ===========================
+    #   RESUMEN / CONCILIACIÓN
+    # ===========================
+    saldo_inicial = res["saldo_inicial"]
+    total_debitos = res["total_debitos"]
+    total_creditos = res["total_creditos"]
+
+    saldo_final_visto = res["saldo_pdf"]
+    saldo_final_calculado = res["saldo_calc"]
+    diferencia = res["diferencia"]
+    cuadra = res["cuadra"]
+
+    st.subheader("Resumen del período")
+    c1, c2, c3 = st.columns(3)
+    with c1: st.metric("Saldo inicial", f"$ {fmt_cents(saldo_inicial)}")
+    with c2: st.metric("Créditos (+)", f"$ {fmt_cents(total_creditos)}")
+    with c3: st.metric("Débitos (–)", f"$ {fmt_cents(total_debitos)}")
+
+    c4, c5, c6 = st.columns(3)
+    with c4: st.metric("Saldo final (PDF)", f"$ {fmt_cents(saldo_final_visto)}")
+    with c5: st.metric("Saldo final calculado", f"$ {fmt_cents(saldo_final_calculado)}")
+    with c6: st.metric("Diferencia", f"$ {fmt_cents(diferencia)}")
+
+    if cuadra: st.success("Conciliado.")
+    else: st.error("No cuadra la conciliación (revisar signos/clasificación).")
+
+    st.markdown("---")
+
+    # ===========================
+    #   RESUMEN OPERATIVO
+    # ===========================
+    st.subheader("Resumen Operativo: Registración Módulo IVA")
+
+    with perf.etapa("resumen_operativo",filas=len(df_sorted)):
+        ro = resumen_operativo(df_sorted)
+    iva21, iva105, net21, net105 = ro["iva21"], ro["iva105"], ro["net21"], ro["net105"]
+    percep_iva, ley_25413, sircreb = ro["percep_iva"], ro["ley_25413"], ro["sircreb"]
+    total_gastos = ro["total_gastos"]
+
+    m1,m2,m3 = st.columns(3)
+    with m1: st.metric("Neto Comisiones 21%", f"$ {fmt_cents(net21)}")
+    with m2: st.metric("IVA 21%", f"$ {fmt_cents(iva21)}")
+    with m3: st.metric("Bruto 21%", f"$ {fmt_cents(ro['bruto21'])}")
+
+    n1,n2,n3 = st.columns(3)
+    with n1: st.metric("Neto Comisiones 10,5%", f"$ {fmt_cents(net105)}")
+    with n2: st.metric("IVA 10,5%", f"$ {fmt_cents(iva105)}")
+    with n3: st.metric("Bruto 10,5%", f"$ {fmt_cents(ro['bruto105'])}")
+
+    o1,o2,o3 = st.columns(3)
+    with o1: st.metric("Percepciones de IVA", f"$ {fmt_cents(percep_iva)}")
+    with o2: st.metric("Ley 25.413", f"$ {fmt_cents(ley_25413)}")
+    with o3: st.metric("SIRCREB", f"$ {fmt_cents(sircreb)}")
+
+    st.metric("Total Gastos Bancarios", f"$ {fmt_cents(total_gastos)}")
+
+    st.markdown("---")
+
+    # ===========================
+    #   DETALLE DE MOVIMIENTOS
+    # ===========================
+    st.subheader("Detalle de movimientos")
+    df_view = vista_pesos(df_sorted)
+    st.dataframe(df_view,use_container_width=True)
+
+    # ===========================
+    #   DESCARGAS
+    # ===========================
+    st.subheader("Descargar")
+    try:
+        from parsers.export import excel_bytes, hay_xlsxwriter, EXPORT_VERSION
+        if not hay_xlsxwriter(): raise ImportError("xlsxwriter")
+        # El Excel se arma recién cuando se pide (no en cada rerun) y queda en cache por hash
+        pedido=f"xlsx-{key}"
+        if st.button("Generar Excel",use_container_width=True):
+            st.session_state[pedido]=True
+        if st.session_state.get(pedido):
+            with perf.etapa("export_excel",filas=len(df_sorted)):
+                xlsx=CACHE.get_or_compute(key,f"xlsx-v{EXPORT_VERSION}-{v_reglas}",lambda: excel_bytes(df_sorted))
+            st.download_button("📥 Descargar Excel",
+                               data=xlsx,
+                               file_name="resumen_bancario_santafe.xlsx",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                               use_container_width=True)
+    except Exception:
+        from parsers.common import df_pesos
+        csv_bytes=df_pesos(df_sorted).to_csv(index=False).encode("utf-8-sig")
+        st.download_button("📥 Descargar CSV (fallback)",
+                           data=csv_bytes,
+                           file_name="resumen_bancario_santafe.csv",
+                           mime="text/csv",
+                           use_container_width=True)
 
-# ===========================
-#   DETALLE DE MOVIMIENTOS
-# ===========================
-st.subheader("Detalle de movimientos")
-df_view = df_sorted.copy()
-for c in ("debito","credito","saldo"):
-    df_view[c] = df_view[c].map(fmt_ar)
-st.dataframe(df_view,use_container_width=True)
+    try:
+        from parsers.columnar import parquet_bytes, hay_pyarrow, COLUMNAR_VERSION
+        if hay_pyarrow():
+            # Parquet con tipos compactos: se relee mucho más rápido que Excel/CSV
+            parquet=CACHE.get_or_compute(key,f"parquet-v{COLUMNAR_VERSION}-{v_reglas}",
+                                         lambda: parquet_bytes(df_sorted,{"banco":"santafe","archivo":uploaded.name}))
+            st.download_button("📥 Descargar Parquet",
+                               data=parquet,
+                               file_name="resumen_bancario_santafe.parquet",
+                               mime="application/vnd.apache.parquet",
+                               use_container_width=True)
+    except Exception as e:
+        st.warning(f"No se pudo generar el Parquet: {e}")
+
+    # ===========================
+    #   PDF DEL RESUMEN OPERATIVO
+    # ===========================
+    st.subheader("Descargar PDF del Resumen Operativo")
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        with perf.etapa("export_pdf"):
+            pdf_buffer = io.BytesIO()
+            c = canvas.Canvas(pdf_buffer, pagesize=A4)
+            c.setFont("Helvetica", 12)
+            c.drawString(50, 800, "Resumen Operativo - Banco de Santa Fe")
+            c.drawString(50, 780, f"Saldo inicial: $ {fmt_cents(saldo_inicial)}")
+            c.drawString(50, 760, f"Créditos: $ {fmt_cents(total_creditos)}")
+            c.drawString(50, 740, f"Débitos: $ {fmt_cents(total_debitos)}")
+            c.drawString(50, 720, f"Saldo final calculado: $ {fmt_cents(saldo_final_calculado)}")
+            c.drawString(50, 700, f"Saldo final PDF: $ {fmt_cents(saldo_final_visto)}")
+            c.drawString(50, 680, f"Diferencia: $ {fmt_cents(diferencia)}")
+            c.drawString(50, 660, f"Total Gastos Bancarios: $ {fmt_cents(total_gastos)}")
+            c.showPage()
+            c.save()
+            pdf_bytes = pdf_buffer.getvalue()
+        st.download_button("📥 Descargar PDF",
+                           data=pdf_bytes,
+                           file_name="resumen_operativo.pdf",
+                           mime="application/pdf",
+                           use_container_width=True)
+    except Exception as e:
+        st.error(f"No se pudo generar el PDF: {e}")
+
+    # ===========================
+    #   ALMACÉN LOCAL
+    # ===========================
+    st.subheader("Almacén de movimientos")
+
+    @st.cache_resource
+    def almacen():
+        from parsers.almacen import Almacen
+        return Almacen()
 
-# ===========================
-#   DESCARGAS
-# ===========================
-st.subheader("Descargar")
-try:
-    import xlsxwriter
-    output=io.BytesIO()
-    with pd.ExcelWriter(output,engine="xlsxwriter") as writer:
-        df_sorted.to_excel(writer,index=False,sheet_name="Movimientos")
-        wb=writer.book; ws=writer.sheets["Movimientos"]
-        money_fmt=wb.add_format({"num_format":"#,##0.00"})
-        date_fmt=wb.add_format({"num_format":"dd/mm/yyyy"})
-        for idx,col in enumerate(df_sorted.columns,start=0):
-            col_values=df_sorted[col].astype(str)
-            max_len=max(len(col),*(len(v) for v in col_values))
-            ws.set_column(idx,idx,min(max_len+2,40))
-        for c in ["debito","credito","saldo"]:
-            if c in df_sorted.columns:
-                j=df_sorted.columns.get_loc(c)
-                ws.set_column(j,j,16,money_fmt)
-        if "fecha" in df_sorted.columns:
-            j=df_sorted.columns.get_loc("fecha")
-            ws.set_column(j,j,14,date_fmt)
-    st.download_button("📥 Descargar Excel",
-                       data=output.getvalue(),
-                       file_name="resumen_bancario_santafe.xlsx",
-                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                       use_container_width=True)
-except Exception:
-    csv_bytes=df_sorted.to_csv(index=False).encode("utf-8-sig")
-    st.download_button("📥 Descargar CSV (fallback)",
-                       data=csv_bytes,
-                       file_name="resumen_bancario_santafe.csv",
-                       mime="text/csv",
-                       use_container_width=True)
+    try:
+        alm=almacen()
+        cuenta=st.text_input("Cuenta / cliente",key="almacen-cuenta")
+        pdf_hash=key.rsplit("-v",1)[0]
+        if cuenta and st.button("Guardar en el almacén",use_container_width=True):
+            with perf.etapa("almacen_guardar",filas=len(df_sorted)):
+                alm.guardar(df_sorted,res,cuenta,"Banco de Santa Fe",uploaded.name,pdf_hash)
+            st.success(f"Guardado en «{cuenta}».")
+        if cuenta and cuenta in alm.cuentas():
+            # acumulado de la cuenta desde el almacén (consultas indexadas, sin re-parsear)
+            with perf.etapa("almacen_consulta"):
+                per=alm.resumen_periodo(cuenta)
+                ro_cuenta=alm.resumen_operativo(cuenta)
+            a1,a2,a3 = st.columns(3)
+            with a1: st.metric("Resúmenes guardados", per["resumenes"])
+            with a2: st.metric("Débitos acumulados", f"$ {fmt_cents(per['total_debitos'])}")
+            with a3: st.metric("Gastos bancarios acumulados", f"$ {fmt_cents(ro_cuenta['total_gastos'])}")
+            from parsers.agregados import operativo_por
+            st.dataframe(operativo_por(alm.rollup(cuenta),("mes",)).map(fmt_cents),use_container_width=True)
+    except Exception as e:
+        st.warning(f"Almacén no disponible: {e}")
 
 # ===========================
-#   PDF DEL RESUMEN OPERATIVO
+#   DIAGNÓSTICO
 # ===========================
-st.subheader("Descargar PDF del Resumen Operativo")
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-
-    pdf_buffer = io.BytesIO()
-    c = canvas.Canvas(pdf_buffer, pagesize=A4)
-    c.setFont("Helvetica", 12)
-    c.drawString(50, 800, "Resumen Operativo - Banco de Santa Fe")
-    c.drawString(50, 780, f"Saldo inicial: $ {fmt_ar(saldo_inicial)}")
-    c.drawString(50, 760, f"Créditos: $ {fmt_ar(total_creditos)}")
-    c.drawString(50, 740, f"Débitos: $ {fmt_ar(total_debitos)}")
-    c.drawString(50, 720, f"Saldo final calculado: $ {fmt_ar(saldo_final_calculado)}")
-    c.drawString(50, 700, f"Saldo final PDF: $ {fmt_ar(saldo_final_visto)}")
-    c.drawString(50, 680, f"Diferencia: $ {fmt_ar(diferencia)}")
-    c.drawString(50, 660, f"Total Gastos Bancarios: $ {fmt_ar(total_gastos)}")
-    c.showPage()
-    c.save()
-    pdf_bytes = pdf_buffer.getvalue()
-    st.download_button("📥 Descargar PDF",
-                       data=pdf_bytes,
-                       file_name="resumen_operativo.pdf",
-                       mime="application/pdf",
-                       use_container_width=True)
-except Exception as e:
-    st.error(f"No se pudo generar el PDF: {e}")
+with st.expander("Diagnóstico de rendimiento"):
+    pico=reg.meta.get("rss_pico_proceso_mb")
+    st.caption(f"Total {reg.total_s():.3f} s · pico RSS del proceso {pico if pico is not None else '—'} MB · "
+               f"log JSON: {perf.PERF_LOG or 'desactivado (IABANCOS_PERF_LOG)'}")
+    st.dataframe(reg.como_df(),use_container_width=True)
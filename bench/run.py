@@ -0,0 +1,131 @@
+# Benchmark por etapa sobre resúmenes sintéticos:
+#   python -m bench.run --bancos santafe macro --paginas 1 10 100 -o bench_results.json
+#   python -m bench.run --paginas 10 --baseline bench_baseline.json   (compara y marca regresiones)
+import argparse, io, json, platform, sys, time, tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from parsers import santafe as SF
+from parsers.cache import PARSER_VERSION
+from parsers.clasificacion import clasificar_df
+from parsers.common import extract_all_lines
+from parsers.detect import detectar_banco_pdf
+from parsers.export import excel_bytes
+from parsers.galicia import parse_galicia
+from parsers.generico import REGLAS as REGLAS_GENERICO, parse_lines_generic, reconstruir_generico
+from parsers.tokens import LineIndex, find_saldo_anterior_from_lines, find_saldo_final_from_lines
+from .sinteticos import BANCOS, generar
+
+def medir(fn, repeticiones: int = 1, memoria: bool = True):
+    # tiempo: mínimo de N corridas sin tracemalloc; memoria: pico de una corrida trazada
+    tiempos, out = [], None
+    for _ in range(max(1, repeticiones)):
+        t0 = time.perf_counter(); out = fn(); tiempos.append(time.perf_counter() - t0)
+    res = {"seg": round(min(tiempos), 6)}
+    if memoria:
+        tracemalloc.start()
+        try:
+            fn(); res["mem_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+        finally:
+            tracemalloc.stop()
+    return out, res
+
+def correr_caso(banco: str, paginas: int, repeticiones: int = 1, memoria: bool = True, pdf_dir: Path | None = None) -> dict:
+    data = None
+    if pdf_dir:
+        f = pdf_dir / f"{banco}-{paginas}.pdf"
+        if f.exists(): data = f.read_bytes()
+    if data is None:
+        data = generar(banco, paginas)
+        if pdf_dir:
+            pdf_dir.mkdir(parents=True, exist_ok=True); (pdf_dir / f"{banco}-{paginas}.pdf").write_bytes(data)
+
+    etapas = {}
+    _, etapas["deteccion"] = medir(lambda: detectar_banco_pdf(io.BytesIO(data)), repeticiones, memoria)
+    lines, etapas["extract"] = medir(lambda: extract_all_lines(io.BytesIO(data), workers=1), repeticiones, memoria)
+
+    if banco == "galicia":
+        pages = {}
+        for pi, l in lines: pages.setdefault(pi, []).append(l)
+        pages_text = ["\n".join(v) for _, v in sorted(pages.items())]
+        (_, df), etapas["parse"] = medir(lambda: parse_galicia(pages_text), repeticiones, memoria)
+        _, etapas["clasificacion"] = medir(lambda: clasificar_df(df), repeticiones, memoria)
+    elif banco == "santafe":
+        idx, etapas["tokenize"] = medir(lambda: LineIndex.from_lines(lines, SF.DATE_RE), repeticiones, memoria)
+        df_raw, etapas["parse"] = medir(lambda: SF.parse_movimientos_santafe(idx), repeticiones, memoria)
+        (saldo_ant, _), etapas["saldos"] = medir(lambda: (SF.find_saldo_anterior(idx), SF.find_saldo_final_pdf(idx)), repeticiones, memoria)
+        df, etapas["reconstruccion"] = medir(lambda: SF.reconstruir_santafe(df_raw, saldo_ant), repeticiones, memoria)
+        _, etapas["clasificacion"] = medir(lambda: clasificar_df(df, SF.REGLAS_SANTAFE), repeticiones, memoria)
+    else:
+        idx, etapas["tokenize"] = medir(lambda: LineIndex.from_lines(lines), repeticiones, memoria)
+        # cada etapa por separado (como Santa Fe); clasificación sin el cache SQLite del usuario
+        df_raw, etapas["parse"] = medir(lambda: parse_lines_generic(idx).sort_values(["fecha", "orden"]).reset_index(drop=True),
+                                        repeticiones, memoria)
+        (_, saldo_ant), etapas["saldos"] = medir(lambda: (find_saldo_final_from_lines(idx), find_saldo_anterior_from_lines(idx)),
+                                                 repeticiones, memoria)
+        df, etapas["reconstruccion"] = medir(lambda: reconstruir_generico(df_raw, saldo_ant), repeticiones, memoria)
+        _, etapas["clasificacion"] = medir(lambda: clasificar_df(df, REGLAS_GENERICO), repeticiones, memoria)
+
+    _, etapas["export"] = medir(lambda: excel_bytes(df), repeticiones, memoria)
+    return {"banco": banco, "paginas": paginas, "paginas_pdf": max((p for p, _ in lines), default=0),
+            "lineas": len(lines), "filas": len(df), "etapas": etapas}
+
+def comparar(actual: dict, base: dict, tolerancia: float = 0.20, piso_seg: float = 0.005) -> list[str]:
+    # regresión: más lento que la base en más de `tolerancia` y por encima del piso de ruido
+    previos = {(c["banco"], c["paginas"]): c for c in base.get("casos", [])}
+    regresiones = []
+    print(f"{'caso':<18}{'etapa':<16}{'base s':>10}{'actual s':>10}{'x':>7}")
+    for c in actual["casos"]:
+        b = previos.get((c["banco"], c["paginas"]))
+        if not b: continue
+        for etapa, r in c["etapas"].items():
+            rb = b["etapas"].get(etapa)
+            if not rb: continue
+            ratio = r["seg"] / rb["seg"] if rb["seg"] else float("inf")
+            marca = ""
+            if ratio > 1 + tolerancia and r["seg"] - rb["seg"] > piso_seg:
+                marca = "  <-- regresión"; regresiones.append(f"{c['banco']}/{c['paginas']}/{etapa}")
+            print(f"{c['banco'] + '/' + str(c['paginas']):<18}{etapa:<16}{rb['seg']:>10.4f}{r['seg']:>10.4f}{ratio:>7.2f}{marca}")
+    return regresiones
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench.run", description="Benchmark por etapa con resúmenes sintéticos.")
+    ap.add_argument("--bancos", nargs="+", choices=BANCOS, default=list(BANCOS))
+    ap.add_argument("--paginas", nargs="+", type=int, default=[1, 10, 100])
+    ap.add_argument("-r", "--repeticiones", type=int, default=3)
+    ap.add_argument("--sin-memoria", action="store_true", help="no medir pico de memoria (tracemalloc)")
+    ap.add_argument("--pdf-dir", type=Path, help="reusar/guardar los PDFs generados")
+    ap.add_argument("-o", "--salida", type=Path, default=Path("bench_results.json"))
+    ap.add_argument("--baseline", type=Path, help="JSON de una corrida anterior para comparar")
+    ap.add_argument("--tolerancia", type=float, default=0.20)
+    args = ap.parse_args(argv)
+
+    casos = []
+    for banco in args.bancos:
+        for n in args.paginas:
+            c = correr_caso(banco, n, args.repeticiones, not args.sin_memoria, args.pdf_dir)
+            casos.append(c)
+            detalle = " · ".join(f"{k} {v['seg']:.3f}s" for k, v in c["etapas"].items())
+            print(f"{banco}/{n}p ({c['lineas']} líneas, {c['filas']} filas): {detalle}", file=sys.stderr)
+
+    import pdfplumber
+    resultado = {
+        "meta": {"fecha": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "plataforma": platform.platform(), "pandas": pd.__version__, "pdfplumber": pdfplumber.__version__,
+                 "parser_version": PARSER_VERSION, "repeticiones": args.repeticiones},
+        "casos": casos,
+    }
+    args.salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Resultados en {args.salida}", file=sys.stderr)
+
+    if args.baseline:
+        regresiones = comparar(resultado, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerancia)
+        if regresiones:
+            print(f"{len(regresiones)} regresiones: {', '.join(regresiones)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# Generador de resúmenes sintéticos (reportlab) que imitan el layout de cada banco.
+# Determinístico por semilla; de 1 a 2.000 páginas.
+import io, random
+from datetime import date, timedelta
+
+BANCOS = ("santafe", "nacion", "macro", "santander", "galicia")
+
+# Descripciones por banco: (texto, es_credito). Cubren las reglas de clasificación.
+DESCRIPCIONES = {
+    "santafe": [("DTNPROVE 30712345678 PAGO PROVEEDOR", True), ("DEP EFEC CAJERO", True), ("TRANLINK 20123456789", True),
+                ("IMPTRANS", False), ("IVA GRAL", False), ("IVA RINS", False), ("SIRCREB", False), ("COMISION MANTENIMIENTO", False),
+                ("DEBITO INMEDIATO 123456789", False), ("PAGO TARJETA", False)],
+    "nacion": [("TRANSF RECIB 20123456789", True), ("DEPOSITO EN EFECTIVO", True), ("COMIS. MANTENIMIENTO", False),
+               ("I.V.A. BASE", False), ("IMP. S/CREDS", False), ("IVA PERCEP RG 2408", False), ("DB-TRSFE 30712345678", False),
+               ("ING. BRUTOS S/ CRED", False)],
+    "macro": [("CR-TRSFE 30712345678", True), ("CR.PREST PERSONAL", True), ("N/D DBCR 25413", False), ("DEBITO FISCAL IVA BASICO", False),
+              ("COMISION PAQUETE", False), ("DEB.CUOTA PRESTAMO 001", False), ("TRSFE-ET 20123456789", False)],
+    "santander": [("TRANSFERENCIA RECIBIDA", True), ("DEPOSITO CHEQUE", True), ("IMPUESTO LEY 25413", False), ("IVA 10,5 COMISION", False),
+                  ("COMISION SERVICIO CUENTA", False), ("SIRCREB", False), ("DEBITO AUTOMATICO SEGURO", False)],
+    "galicia": [("TRANSFERENCIA DE TERCEROS", True), ("DEPOSITO EFECTIVO", True), ("IMP. DEB./CRE. LEY 25413", False), ("SIRCREB", False),
+                ("IVA GRAL COMISION", False), ("COMISION SERVICIO DE CUENTA", False), ("PAGO VISA", False)],
+}
+
+def fmt(v: float, trailing_minus: bool = False) -> str:
+    s = f"{abs(v):,.2f}".replace(",", "§").replace(".", ",").replace("§", ".")
+    if v < 0: return s + "-" if trailing_minus else "-" + s
+    return s
+
+def _movimientos(banco: str, n: int, rng: random.Random, desde: date):
+    # ~40 movimientos por día, fechas no decrecientes
+    saldo = round(rng.uniform(50_000, 500_000), 2)
+    for i in range(n):
+        desc, cred = rng.choice(DESCRIPCIONES[banco])
+        imp = round(rng.uniform(5, 80_000), 2)
+        saldo = round(saldo + (imp if cred else -imp), 2)
+        yield desde + timedelta(days=i // 40), desc, imp, cred, saldo
+
+class _Hoja:
+    # canvas con cursor vertical; pasa de página sola
+    def __init__(self, encabezado):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        self.buf = io.BytesIO()
+        self.c = canvas.Canvas(self.buf, pagesize=A4)
+        self.encabezado = encabezado
+        self.paginas = 0
+        self._nueva()
+
+    def _nueva(self):
+        if self.paginas: self.c.showPage()
+        self.paginas += 1
+        self.c.setFont("Helvetica", 8)
+        self.y = 810
+        for t in self.encabezado:
+            self.texto(t)
+
+    def fila(self, celdas):
+        # celdas: [(x, texto, "l"|"r")]
+        if self.y < 50: self._nueva()
+        for x, t, al in celdas:
+            (self.c.drawRightString if al == "r" else self.c.drawString)(x, self.y, t)
+        self.y -= 15
+
+    def texto(self, t):
+        self.fila([(40, t, "l")])
+
+    def bytes(self) -> bytes:
+        self.c.showPage(); self.c.save()
+        return self.buf.getvalue()
+
+def generar(banco: str, paginas: int = 1, seed: int = 0, filas_por_pagina: int = 48) -> bytes:
+    if banco not in BANCOS: raise ValueError(f"banco desconocido: {banco}")
+    if not 1 <= paginas <= 2000: raise ValueError("paginas debe estar entre 1 y 2000")
+    rng = random.Random(f"{banco}-{paginas}-{seed}")
+    desde = date(2024, 3, 1)
+    # filas: se reserva espacio para cabeceras, saldos y (Santander) el detalle impositivo
+    n = max(1, paginas * filas_por_pagina - 12)
+    movs = list(_movimientos(banco, n, rng, desde))
+    saldo_ini = round(movs[0][4] - (movs[0][2] if movs[0][3] else -movs[0][2]), 2)
+    saldo_fin = movs[-1][4]
+    hasta = movs[-1][0]
+
+    if banco == "santafe":
+        h = _Hoja(["NUEVO BANCO DE SANTA FE S.A.", "FECHA MOVIMIENTO CONCEPTO IMPORTE SALDO"])
+        h.fila([(40, "SALDO ANTERIOR", "l"), (540, fmt(saldo_ini), "r")])
+        for f, d, imp, cred, s in movs:
+            h.fila([(40, f.strftime("%d/%m/%Y"), "l"), (110, d, "l"), (450, fmt(imp), "r"), (540, fmt(s), "r")])
+        h.fila([(40, f"SALDO AL {hasta:%d/%m/%Y}", "l"), (540, fmt(saldo_fin), "r")])
+
+    elif banco == "nacion":
+        h = _Hoja(["BANCO DE LA NACION ARGENTINA", "FECHA DESCRIPCION COMPROBANTE DEBITO CREDITO SALDO"])
+        h.fila([(40, "SALDO ANTERIOR", "l"), (540, fmt(saldo_ini), "r")])
+        for k, (f, d, imp, cred, s) in enumerate(movs):
+            h.fila([(40, f.strftime("%d/%m/%y"), "l"), (90, d, "l"), (300, str(100000 + k), "l"),
+                    (390 if not cred else 460, fmt(imp), "r"), (540, fmt(s), "r")])
+        h.fila([(40, "SALDO FINAL", "l"), (540, fmt(saldo_fin), "r")])
+
+    elif banco == "macro":
+        h = _Hoja(["BANCO MACRO S.A.", "CUENTA CORRIENTE BANCARIA", "FECHA DESCRIPCION REFERENCIA DEBITOS CREDITOS SALDO"])
+        h.fila([(40, f"SALDO ULTIMO EXTRACTO AL {desde - timedelta(days=1):%d/%m/%Y}", "l"), (540, fmt(saldo_ini), "r")])
+        for f, d, imp, cred, s in movs:
+            h.fila([(40, f.strftime("%d/%m/%y"), "l"), (90, d, "l"), (390 if not cred else 460, fmt(imp), "r"), (540, fmt(s), "r")])
+        h.fila([(40, f"SALDO FINAL AL DIA {hasta:%d/%m/%Y}", "l"), (540, fmt(saldo_fin), "r")])
+
+    elif banco == "santander":
+        h = _Hoja(["Banco Santander Argentina", "Cuenta Corriente en pesos", "Fecha Descripción Débito Crédito Saldo"])
+        h.fila([(40, "SALDO ANTERIOR", "l"), (540, fmt(saldo_ini), "r")])
+        for f, d, imp, cred, s in movs:
+            h.fila([(40, f.strftime("%d/%m/%y"), "l"), (90, d, "l"), (390 if not cred else 460, fmt(imp), "r"), (540, fmt(s), "r")])
+        h.fila([(40, "SALDO FINAL", "l"), (540, fmt(saldo_fin), "r")])
+        # bloque que el parser debe descartar: líneas con fecha y dos montos
+        h.texto("DETALLE IMPOSITIVO")
+        for k in range(8):
+            h.fila([(40, f"{(desde + timedelta(days=k)):%d/%m/%y}", "l"), (90, "IMPUESTO LEY 25413 BASE", "l"),
+                    (460, fmt(rng.uniform(1000, 90000)), "r"), (540, fmt(rng.uniform(5, 500)), "r")])
+
+    else:  # galicia: débitos con "-" a la izquierda, fecha dd/mm, período en la cabecera
+        h = _Hoja(["BANCO GALICIA", "RESUMEN DE CUENTA", f"Período: {desde:%d/%m/%Y} al {hasta:%d/%m/%Y}"])
+        h.texto(f"Saldo inicial $ {fmt(saldo_ini)}")
+        for f, d, imp, cred, s in movs:
+            h.fila([(40, f.strftime("%d/%m"), "l"), (90, d, "l"), (540, fmt(imp if cred else -imp), "r")])
+        h.texto(f"Saldo final $ {fmt(saldo_fin)}")
+
+    return h.bytes()
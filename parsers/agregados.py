@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Resumen operativo (registración módulo IVA) a partir de los movimientos clasificados.
+# Montos en centavos (int); el neto se redondea al centavo.
+# Una sola pasada agrupada: débitos por Clasificación (y opcionalmente por cuenta/mes)
+# y las métricas salen de esas sumas, no de una máscara por métrica. Los "rollups"
+# mensuales (cuenta, mes, Clasificación, debito) se guardan/combinan, así un informe de
+# varios meses o cuentas escala con la cantidad de grupos y no de movimientos.
+
+AGREGADOS_VERSION = "2"   # entra en la clave de cache de la etapa (parsers.pipeline)
+
+IVA_21 = "IVA 21% (sobre comisiones)"
+IVA_105 = "IVA 10,5% (sobre comisiones)"
+GASTOS = (IVA_21, IVA_105, "LEY 25.413", "SIRCREB", "Gastos por comisiones", "Débito automático")
+SIN_FECHA = "sin fecha"
+
+def _metricas(d, neto) -> dict:
+    # d(etiqueta) → débitos de esa clasificación; neto(iva, alícuota) → neto redondeado.
+    # Sirve igual para escalares (un resumen) y para columnas (un grupo por fila).
+    iva21, iva105 = d(IVA_21), d(IVA_105)
+    net21, net105 = neto(iva21, 0.21), neto(iva105, 0.105)
+    return {
+        "iva21": iva21,
+        "iva105": iva105,
+        "net21": net21,
+        "net105": net105,
+        "bruto21": net21 + iva21,
+        "bruto105": net105 + iva105,
+        "percep_iva": d("Percepciones de IVA"),
+        "ley_25413": d("LEY 25.413"),
+        "sircreb": d("SIRCREB"),
+        "total_gastos": sum(d(g) for g in GASTOS),
+    }
+
+def operativo(debitos: dict) -> dict:
+    # débitos (centavos) por etiqueta de clasificación → métricas del resumen operativo.
+    # Lo usan resumen_operativo (sobre un df) y el almacén (sobre sumas SQL).
+    def d(e):
+        return int(debitos.get(e, 0))
+    def neto(iva, a):
+        return round(iva / a)
+    return _metricas(d, neto)
+
+def resumen_operativo(df: pd.DataFrame) -> dict:
+    # sin columna de clasificación (parsers que no clasifican, p. ej. Galicia) → todo en 0
+    if "Clasificación" not in df.columns:
+        return operativo({})
+    return operativo(df.groupby("Clasificación", sort=False)["debito"].sum().to_dict())
+
+def meses(fechas) -> pd.Series:
+    # fecha → "aaaa-mm" (mismo formato que strftime('%Y-%m') en SQLite); sin fecha → SIN_FECHA.
+    # Se formatea cada mes distinto una vez, no cada fila.
+    m = pd.Series(pd.to_datetime(fechas, errors="coerce")).to_numpy(dtype="datetime64[ns]").astype("datetime64[M]")
+    codigos, unicos = pd.factorize(m, use_na_sentinel=False)
+    txt = np.array([SIN_FECHA if np.isnat(u) else str(u) for u in unicos], dtype=object)
+    return pd.Series(txt[codigos])
+
+def rollup(df: pd.DataFrame, cuenta: str | None = None) -> pd.DataFrame:
+    # movimientos clasificados → débitos por (cuenta, mes, Clasificación), una fila por grupo
+    cols = ["cuenta", "mes", "Clasificación", "debito"]
+    if "Clasificación" not in df.columns or df.empty:
+        return pd.DataFrame({c: pd.Series(dtype="int64" if c == "debito" else object) for c in cols})
+    mes = meses(df["fecha"]).to_numpy() if "fecha" in df.columns else SIN_FECHA
+    g = pd.DataFrame({"mes": mes, "Clasificación": df["Clasificación"].to_numpy(), "debito": df["debito"].to_numpy()})
+    r = g.groupby(["mes", "Clasificación"], sort=False, dropna=False, observed=True)["debito"].sum().reset_index()
+    r.insert(0, "cuenta", cuenta or "")
+    return r
+
+def combinar(rollups) -> pd.DataFrame:
+    # varios rollups (resúmenes, cuentas, meses ya calculados) → uno solo
+    r = pd.concat(list(rollups), ignore_index=True)
+    return r.groupby(["cuenta", "mes", "Clasificación"], sort=False, dropna=False)["debito"].sum().reset_index()
+
+def operativo_por(r: pd.DataFrame, por=("mes",)) -> pd.DataFrame:
+    # rollup → métricas del resumen operativo por grupo (`por`: "cuenta" y/o "mes"),
+    # una fila por grupo ordenada por sus claves; por=() → una sola fila con el total
+    por = list(por)
+    sumas = r.groupby(por + ["Clasificación"], sort=True)["debito"].sum()
+    if por:
+        ancho = sumas.unstack("Clasificación", fill_value=0)
+    else:
+        ancho = sumas.to_frame("total").T
+    cero = pd.Series(0, index=ancho.index, dtype="int64")
+    def d(e):
+        return ancho[e].astype("int64") if e in ancho.columns else cero
+    def neto(iva, a):
+        return (iva / a).round().astype("int64")
+    return pd.DataFrame(_metricas(d, neto), index=ancho.index)
@@ -0,0 +1,204 @@
+# Almacén local de movimientos (SQLite): los resúmenes ya parseados quedan guardados por
+# cuenta y se pueden consultar por período sin volver a subir ni parsear los PDFs.
+#   python -m parsers.almacen cargar --cuenta "Cliente X" "2025/*.pdf"
+#   python -m parsers.almacen consultar --cuenta "Cliente X" --desde 2025-01-01 --hasta 2025-12-31
+# Montos en centavos (INTEGER) y fechas ISO (TEXT, ordenan como fechas). Índices por
+# (cuenta, fecha) y (clasificacion, fecha); cada resumen se inserta en una sola
+# transacción y volver a guardar el mismo PDF (mismo SHA-256 del contenido, sin la
+# versión del parser) reemplaza sus filas en lugar de duplicarlas.
+# Las consultas devuelven los mismos resúmenes que muestra app.py (período y operativo).
+import argparse, hashlib, os, sqlite3, sys, threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .agregados import SIN_FECHA, operativo
+from .cache import CACHE_DIR
+from .common import fmt_cents
+
+ALMACEN_DB = os.environ.get("IABANCOS_ALMACEN_DB", str(CACHE_DIR / "movimientos.sqlite"))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resumenes (
+    id INTEGER PRIMARY KEY, cuenta TEXT NOT NULL, banco TEXT, archivo TEXT, hash TEXT UNIQUE,
+    desde TEXT, hasta TEXT, saldo_inicial INTEGER, total_creditos INTEGER, total_debitos INTEGER,
+    saldo_pdf INTEGER, cuadra INTEGER, movimientos INTEGER, cargado TEXT);
+CREATE TABLE IF NOT EXISTS movimientos (
+    resumen_id INTEGER NOT NULL REFERENCES resumenes(id) ON DELETE CASCADE,
+    cuenta TEXT NOT NULL, banco TEXT, fecha TEXT, descripcion TEXT, desc_norm TEXT,
+    clasificacion TEXT, debito INTEGER NOT NULL, credito INTEGER NOT NULL, saldo INTEGER);
+CREATE INDEX IF NOT EXISTS movimientos_cuenta_fecha ON movimientos (cuenta, fecha);
+CREATE INDEX IF NOT EXISTS movimientos_clasificacion_fecha ON movimientos (clasificacion, fecha);
+CREATE INDEX IF NOT EXISTS movimientos_resumen ON movimientos (resumen_id);
+CREATE INDEX IF NOT EXISTS resumenes_cuenta_desde ON resumenes (cuenta, desde);
+"""
+
+def _iso(v):
+    return None if v is None or pd.isna(v) else pd.Timestamp(v).date().isoformat()
+
+def _entero(v):
+    # saldos que pueden faltar en el resumen (None) → NULL
+    return None if v is None else int(v)
+
+def _filtro(cuenta=None, desde=None, hasta=None, col_fecha="fecha"):
+    # → (WHERE ..., parámetros); fechas como "aaaa-mm-dd" o date/Timestamp
+    conds, params = [], []
+    if cuenta is not None: conds.append("cuenta = ?"); params.append(cuenta)
+    if desde is not None: conds.append(f"{col_fecha} >= ?"); params.append(_iso(desde))
+    if hasta is not None: conds.append(f"{col_fecha} <= ?"); params.append(_iso(hasta))
+    return (" WHERE " + " AND ".join(conds)) if conds else "", params
+
+class Almacen:
+    def __init__(self, path=ALMACEN_DB):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # una conexión compartida (sesiones de Streamlit, hilos): las operaciones van con lock
+        self._con = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.execute("PRAGMA foreign_keys=ON")
+            self._con.executescript(ESQUEMA)
+
+    def cerrar(self):
+        self._con.close()
+
+    def _consulta(self, sql: str, params=()):
+        with self._lock:
+            return self._con.execute(sql, params).fetchall()
+
+    def guardar(self, df: pd.DataFrame, res: dict, cuenta: str, banco: str = "", archivo: str = "",
+                hash: str | None = None) -> int:
+        # un resumen parseado (montos en centavos) → id; todo en una transacción
+        n = len(df)
+        def col(c, default=None):
+            return df[c] if c in df.columns else pd.Series(default, index=df.index, dtype=object)
+        fechas = pd.to_datetime(col("fecha"), errors="coerce")
+        fecha_txt = fechas.dt.strftime("%Y-%m-%d").where(fechas.notna(), None).tolist()
+        montos = {c: df[c].to_numpy(dtype=np.int64) if c in df.columns else np.zeros(n, dtype=np.int64)
+                  for c in ("debito", "credito")}
+        saldo = pd.array(df["saldo"], dtype="Int64") if "saldo" in df.columns else pd.array([None] * n, dtype="Int64")
+        filas = list(zip(fecha_txt, col("descripcion").astype(object).tolist(), col("desc_norm").astype(object).tolist(),
+                         col("Clasificación").astype(object).tolist(),
+                         montos["debito"].tolist(), montos["credito"].tolist(),
+                         [None if pd.isna(x) else int(x) for x in saldo]))
+        with self._lock, self._con:
+            if hash is not None:
+                self._con.execute("DELETE FROM resumenes WHERE hash = ?", (hash,))
+            cur = self._con.execute(
+                "INSERT INTO resumenes (cuenta, banco, archivo, hash, desde, hasta, saldo_inicial, total_creditos, "
+                "total_debitos, saldo_pdf, cuadra, movimientos, cargado) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (cuenta, banco, archivo, hash, _iso(fechas.min()), _iso(fechas.max()),
+                 _entero(res["saldo_inicial"]), int(res["total_creditos"]), int(res["total_debitos"]),
+                 _entero(res["saldo_pdf"]), int(bool(res["cuadra"])), n, datetime.now().isoformat(timespec="seconds")))
+            rid = cur.lastrowid
+            self._con.executemany(
+                "INSERT INTO movimientos (resumen_id, cuenta, banco, fecha, descripcion, desc_norm, clasificacion, "
+                "debito, credito, saldo) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                [(rid, cuenta, banco, *f) for f in filas])
+        return rid
+
+    def contiene(self, hash: str) -> bool:
+        return bool(self._consulta("SELECT 1 FROM resumenes WHERE hash = ?", (hash,)))
+
+    def cuentas(self) -> list[str]:
+        return [r[0] for r in self._consulta("SELECT DISTINCT cuenta FROM resumenes ORDER BY cuenta")]
+
+    def resumenes(self, cuenta: str | None = None) -> pd.DataFrame:
+        where, params = _filtro(cuenta)
+        with self._lock:
+            return pd.read_sql_query(f"SELECT * FROM resumenes{where} ORDER BY cuenta, desde", self._con, params=params)
+
+    def movimientos(self, cuenta: str | None = None, desde=None, hasta=None,
+                    clasificacion: str | None = None) -> pd.DataFrame:
+        where, params = _filtro(cuenta, desde, hasta)
+        if clasificacion is not None:
+            where += (" AND" if where else " WHERE") + " clasificacion = ?"; params.append(clasificacion)
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT * FROM movimientos{where} ORDER BY cuenta, fecha, rowid",
+                                   self._con, params=params)
+        df["fecha"] = pd.to_datetime(df["fecha"])
+        return df.rename(columns={"clasificacion": "Clasificación"})
+
+    def debitos_por_clase(self, cuenta: str | None = None, desde=None, hasta=None) -> dict:
+        where, params = _filtro(cuenta, desde, hasta)
+        return dict(self._consulta(f"SELECT clasificacion, SUM(debito) FROM movimientos{where} "
+                                   "GROUP BY clasificacion", params))
+
+    def rollup(self, cuenta: str | None = None, desde=None, hasta=None) -> pd.DataFrame:
+        # débitos por (cuenta, mes, Clasificación) con el formato de agregados.rollup
+        # (para agregados.operativo_por: resumen operativo por mes y/o cuenta)
+        where, params = _filtro(cuenta, desde, hasta)
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT cuenta, COALESCE(strftime('%Y-%m', fecha), '{SIN_FECHA}') AS mes, "
+                f"clasificacion AS \"Clasificación\", SUM(debito) AS debito FROM movimientos{where} "
+                "GROUP BY cuenta, mes, clasificacion", self._con, params=params)
+
+    def resumen_operativo(self, cuenta: str | None = None, desde=None, hasta=None) -> dict:
+        # mismas métricas que agregados.resumen_operativo, con un GROUP BY en SQL
+        return operativo(self.debitos_por_clase(cuenta, desde, hasta))
+
+    def resumen_periodo(self, cuenta: str, desde=None, hasta=None) -> dict:
+        # "Resumen del período" de la app sobre el rango: créditos/débitos de los
+        # movimientos; saldo inicial del primer resumen del rango y saldo final (PDF) del último
+        where, params = _filtro(cuenta, desde, hasta)
+        cre, deb = self._consulta(f"SELECT COALESCE(SUM(credito), 0), COALESCE(SUM(debito), 0) "
+                                  f"FROM movimientos{where}", params)[0]
+        rw, rp = _filtro(cuenta, desde, hasta, col_fecha="desde")
+        bordes = self._consulta(f"SELECT saldo_inicial, saldo_pdf FROM resumenes{rw} ORDER BY desde", rp)
+        # un resumen sin saldo inicial/final (NULL) deja esos valores en None
+        saldo_inicial = bordes[0][0] if bordes else 0
+        saldo_pdf = bordes[-1][1] if bordes else 0
+        saldo_calc = None if saldo_inicial is None else saldo_inicial + cre - deb
+        diferencia = None if saldo_calc is None or saldo_pdf is None else saldo_calc - saldo_pdf
+        return {
+            "saldo_inicial": saldo_inicial,
+            "total_creditos": cre,
+            "total_debitos": deb,
+            "saldo_pdf": saldo_pdf,
+            "cuadra": diferencia == 0,
+            "saldo_calc": saldo_calc,
+            "diferencia": diferencia,
+            "resumenes": len(bordes),
+        }
+
+def main(argv=None):
+    from .batch import listar_pdfs
+
+    ap = argparse.ArgumentParser(prog="python -m parsers.almacen", description="Almacén local de movimientos parseados.")
+    ap.add_argument("--db", default=ALMACEN_DB, help="archivo SQLite (default: IABANCOS_ALMACEN_DB)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("cargar", help="parsea PDFs y los guarda en el almacén")
+    c.add_argument("--cuenta", required=True, help="cuenta o cliente al que pertenecen los resúmenes")
+    c.add_argument("entradas", nargs="+", help="carpetas, archivos o globs de PDFs")
+    q = sub.add_parser("consultar", help="resumen del período y operativo desde el almacén")
+    q.add_argument("--cuenta", required=True)
+    q.add_argument("--desde"); q.add_argument("--hasta")
+    args = ap.parse_args(argv)
+
+    alm = Almacen(args.db)
+    if args.cmd == "cargar":
+        from .pipeline import procesar
+        for p in listar_pdfs(args.entradas):
+            data = p.read_bytes()
+            h = hashlib.sha256(data).hexdigest()
+            if alm.contiene(h):
+                print(f"{p.name} · ya estaba", file=sys.stderr); continue
+            r = procesar(data, hasta="clasificacion")
+            alm.guardar(r["df"], r["res"], args.cuenta, r["banco"], p.name, h)
+            print(f"{p.name} · {r['banco']} · {len(r['df'])} movimientos", file=sys.stderr)
+        return 0
+
+    per = alm.resumen_periodo(args.cuenta, args.desde, args.hasta)
+    ro = alm.resumen_operativo(args.cuenta, args.desde, args.hasta)
+    print(f"{args.cuenta} · {per['resumenes']} resúmenes")
+    for k in ("saldo_inicial", "total_creditos", "total_debitos", "saldo_pdf", "saldo_calc", "diferencia"):
+        print(f"  {k:16s} $ {fmt_cents(per[k])}")
+    for k, v in ro.items():
+        print(f"  {k:16s} $ {fmt_cents(v)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# Procesamiento por lotes (sin Streamlit):
+#   python -m parsers.batch "resumenes/*.pdf" -o salida --workers 4
+import argparse, glob, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from .common import _mp_contexto, df_pesos, res_pesos
+from .perf import etapa, registrar
+from .pipeline import procesar
+
+RESUMEN_COLS = ["archivo","banco","confianza","parser","paginas","movimientos","saldo_inicial","total_creditos",
+                "total_debitos","saldo_pdf","saldo_calc","diferencia","cuadra","recalculadas","segundos","salida","error"]
+
+def listar_pdfs(entradas):
+    out = []
+    for e in entradas:
+        p = Path(e)
+        if p.is_dir():
+            out.extend(sorted(p.rglob("*.pdf")) + sorted(p.rglob("*.PDF")))
+        else:
+            out.extend(Path(x) for x in sorted(glob.glob(e)))
+    seen = set()
+    return [p for p in out if not (p in seen or seen.add(p))]
+
+def guardar(df: pd.DataFrame, destino: Path, formato: str, meta: dict | None = None) -> Path:
+    if formato == "parquet":
+        from .columnar import guardar_parquet, hay_pyarrow
+        if hay_pyarrow():
+            destino = destino.with_suffix(".parquet")
+            guardar_parquet(df, str(destino), meta)
+            return destino
+    if formato == "xlsx":
+        from .export import escribir_excel, hay_xlsxwriter
+        if hay_xlsxwriter():
+            destino = destino.with_suffix(".xlsx")
+            escribir_excel(df, str(destino))
+            return destino
+    destino = destino.with_suffix(".csv")
+    df_pesos(df).to_csv(destino, index=False, encoding="utf-8-sig")
+    return destino
+
+def procesar_archivo(path: str, out_dir: str, formato: str = "xlsx") -> dict:
+    t0 = time.perf_counter()
+    fila = {"archivo": str(path)}
+    try:
+        with registrar(Path(path).name, archivo=str(path)) as reg:
+            data = Path(path).read_bytes()
+            # pipeline por etapas con cache: una sola extracción para detectar y parsear,
+            # y al reprocesar el archivo sólo corren las etapas cuya versión cambió
+            r = procesar(data, hasta="clasificacion", workers=1)
+            banco, df, res = r["banco"], r["df"], r["res"]
+            reg.meta["banco"] = banco
+            with etapa("export", filas=len(df)):
+                salida = guardar(df, Path(out_dir) / Path(path).stem, formato,
+                                  {"banco": banco, "archivo": Path(path).name})
+            fila.update(res_pesos(res))
+            fila.update(banco=banco, confianza=r["confianza"], paginas=r["paginas"], movimientos=len(df), salida=str(salida),
+                        recalculadas=",".join(e for e, estado in r["estados"].items() if estado == "calculada"))
+    except Exception as e:
+        fila["error"] = f"{type(e).__name__}: {e}"
+    fila["segundos"] = round(time.perf_counter() - t0, 3)
+    return fila
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m parsers.batch", description="Procesa resúmenes bancarios PDF en lote.")
+    ap.add_argument("entradas", nargs="+", help="carpetas, archivos o globs de PDFs")
+    ap.add_argument("-o", "--salida", default="salida", help="carpeta de salida (default: salida)")
+    ap.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="procesos en paralelo")
+    ap.add_argument("-f", "--formato", choices=("xlsx","parquet","csv"), default="xlsx", help="formato por resumen")
+    args = ap.parse_args(argv)
+
+    pdfs = listar_pdfs(args.entradas)
+    if not pdfs:
+        print("No se encontraron PDFs.", file=sys.stderr)
+        return 1
+    out_dir = Path(args.salida); out_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter(); filas = []
+    # mismo contexto que la extracción en paralelo: sin fork desde un proceso con hilos
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), mp_context=_mp_contexto()) as ex:
+        futs = [ex.submit(procesar_archivo, str(p), str(out_dir), args.formato) for p in pdfs]
+        for fut in as_completed(futs):
+            fila = fut.result(); filas.append(fila)
+            estado = "ERROR " + fila["error"] if fila.get("error") else ("OK" if fila.get("cuadra") else "NO CUADRA")
+            print(f"[{len(filas)}/{len(pdfs)}] {fila['archivo']} · {fila.get('banco','?')} · {estado}", file=sys.stderr)
+    total = time.perf_counter() - t0
+
+    resumen = pd.DataFrame(filas).reindex(columns=RESUMEN_COLS).sort_values("archivo")
+    resumen.to_csv(out_dir / "resumen_conciliacion.csv", index=False, encoding="utf-8-sig")
+
+    ok = resumen["error"].isna()
+    paginas = int(resumen.loc[ok, "paginas"].sum()); movs = int(resumen.loc[ok, "movimientos"].sum())
+    print(f"Archivos: {len(pdfs)} ({int(ok.sum())} ok, {int((~ok).sum())} con error, "
+          f"{int(resumen['cuadra'].eq(True).sum())} conciliados)")
+    print(f"Páginas: {paginas} · Movimientos: {movs} · Tiempo: {total:.1f} s")
+    if total > 0:
+        print(f"Rendimiento: {len(pdfs)/total:.2f} archivos/s · {paginas/total:.1f} páginas/s · {movs/total:.0f} movimientos/s")
+    return 0 if ok.all() else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import hashlib, os, pickle, tempfile, threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Subir cuando cambie la extracción de líneas o el parseo de movimientos:
+# invalida todo lo cacheado (memoria y disco).
+PARSER_VERSION = "6"
+
+CACHE_DIR = Path(os.environ.get("IABANCOS_CACHE_DIR", Path.home() / ".cache" / "iabancos"))
+CACHE_MEM_ITEMS = int(os.environ.get("IABANCOS_CACHE_MEM_ITEMS", "32"))
+CACHE_DISK_MB = int(os.environ.get("IABANCOS_CACHE_DISK_MB", "512"))
+
+def content_key(data: bytes, version: str = PARSER_VERSION) -> str:
+    return f"{hashlib.sha256(data).hexdigest()}-v{version}"
+
+class ResultCache:
+    # Dos niveles: LRU en memoria (por cantidad de entradas) + disco (por tamaño total).
+    # El objeto es a nivel módulo, así que lo comparten todas las sesiones del mismo
+    # servidor; el disco además sobrevive reinicios y otros procesos.
+    # Los valores devueltos son compartidos: no mutarlos.
+
+    def __init__(self, directory=CACHE_DIR, mem_items: int = CACHE_MEM_ITEMS, disk_max_bytes: int = CACHE_DISK_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.mem_items = mem_items
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, kind: str) -> Path:
+        return self.directory / f"{key}.{kind}.pkl"
+
+    def get(self, key: str, kind: str, default=None):
+        k = (key, kind)
+        with self._lock:
+            if k in self._mem:
+                self._mem.move_to_end(k)
+                return self._mem[k]
+        path = self._path(key, kind)
+        try:
+            with open(path, "rb") as fh:
+                value = pickle.load(fh)
+            os.utime(path)  # marca de uso para el desalojo por antigüedad
+        except Exception:
+            return default
+        self._remember(k, value)
+        return value
+
+    def put(self, key: str, kind: str, value):
+        self._remember((key, kind), value)
+        if self.disk_max_bytes <= 0:
+            return
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key, kind))
+        except Exception:
+            # valor que no se puede picklear, disco lleno...: sin .tmp huérfano (el
+            # desalojo sólo mira *.pkl y no lo contaría nunca)
+            if tmp is not None:
+                try: os.unlink(tmp)
+                except OSError: pass
+            return
+        self._evict_disk()
+
+    def get_or_compute(self, key: str, kind: str, compute):
+        miss = object()
+        value = self.get(key, kind, miss)
+        if value is miss:
+            value = compute()
+            self.put(key, kind, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+        for f in self.directory.glob("*.pkl"):
+            try: f.unlink()
+            except OSError: pass
+
+    def _remember(self, k, value):
+        with self._lock:
+            self._mem[k] = value
+            self._mem.move_to_end(k)
+            while len(self._mem) > self.mem_items:
+                self._mem.popitem(last=False)
+
+    def _evict_disk(self):
+        files = []
+        for f in self.directory.glob("*.pkl"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in files)
+        for _, size, f in sorted(files, key=lambda x: x[0]):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                f.unlink(); total -= size
+            except OSError:
+                pass
+
+CACHE = ResultCache()
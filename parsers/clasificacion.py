@@ -0,0 +1,243 @@
+import functools, hashlib, os, re, sqlite3, threading, types
+import numpy as np
+import pandas as pd
+from .cache import CACHE_DIR
+from .common import LONG_INT_RE, REGLAS
+from .perf import etapa
+
+# Motor de clasificación por columnas: las descripciones se repiten mucho (IMPTRANS,
+# IVA GRAL, SIRCREB...), así que los predicados de texto se evalúan una vez por par
+# único (descripcion, desc_norm) y las condiciones de signo se aplican por columna.
+# Mismas etiquetas que clasificar(...) fila a fila: usa la misma tabla de reglas.
+
+def _codes(values) -> tuple[np.ndarray, int]:
+    codes, uniques = pd.factorize(values)
+    return codes.astype(np.int64), len(uniques)
+
+def clasificar_columnas(desc, desc_norm, deb, cre, reglas=REGLAS) -> np.ndarray:
+    d = pd.Series(desc, dtype=object).astype(str).to_numpy()
+    n = pd.Series(desc_norm, dtype=object).astype(str).to_numpy()
+    # misma "verdad" que `if cre:` en la versión escalar (NaN cuenta como distinto de cero)
+    es_cre = np.asarray(cre, dtype=float) != 0
+    es_deb = np.asarray(deb, dtype=float) != 0
+    if len(d) == 0:
+        return np.array([], dtype=object)
+
+    # códigos de texto únicos (descripcion, desc_norm)
+    cd, _ = _codes(d)
+    cn, nn = _codes(n)
+    codes, _ = pd.factorize(cd * nn + cn)
+    _, first = np.unique(codes, return_index=True)
+
+    # predicados por texto único: se recorre la cascada hasta la primera regla sin
+    # condición de signo que cumple (las siguientes no pueden ganar nunca)
+    hit = np.zeros((len(first), len(reglas)), dtype=bool)
+    for k, i in enumerate(first):
+        u, t = d[i].upper(), n[i].upper()
+        for j, (_, pred, signo) in enumerate(reglas):
+            if pred is None or pred(u, t):
+                hit[k, j] = True
+                if signo is None: break
+
+    # por fila: primera regla cuyo texto cumple y cuyo signo corresponde
+    idx = np.full(len(d), len(reglas))
+    for j in range(len(reglas) - 1, -1, -1):
+        signo = reglas[j][2]
+        c = hit[codes, j]
+        if signo == "cre": c &= es_cre
+        elif signo == "deb": c &= es_deb
+        idx[c] = j
+    etiquetas = np.array([e for e, _, _ in reglas] + ["Otros"], dtype=object)
+    return etiquetas[idx]
+
+def clasificar_df(df: pd.DataFrame, reglas=REGLAS, banco: str | None = None, cache=None) -> np.ndarray:
+    # `cache`: CacheClasificacion (SQLite) para no evaluar reglas sobre textos ya vistos
+    def col(name, default):
+        return df[name] if name in df.columns else pd.Series(default, index=df.index)
+    args = (col("descripcion", ""), col("desc_norm", ""), col("debito", 0.0), col("credito", 0.0), reglas)
+    if cache is None:
+        return clasificar_columnas(*args)
+    return cache.clasificar(*args, banco=banco)
+
+# Versión de una tabla de reglas para las claves de cache (parsers.pipeline): se
+# deriva del contenido, así que tocar un texto o un regex de una regla invalida sólo
+# la clasificación y lo que sigue, sin subir versiones a mano.
+CLASIFICACION_VERSION = "2"   # motor (clasificar_columnas) y forma de la clave del cache
+
+def _huella(obj, prof: int = 0) -> str:
+    # texto estable entre procesos: bytecode y constantes de los predicados, más los
+    # globales que usan (regex → patrón y flags; funciones → su propia huella)
+    if isinstance(obj, types.FunctionType):
+        h = _huella(obj.__code__, prof)
+        if prof < 3:
+            h += "".join(f"|{n}={_huella(obj.__globals__[n], prof + 1)}"
+                         for n in obj.__code__.co_names if n in obj.__globals__)
+        return h
+    if isinstance(obj, types.CodeType):
+        consts = ",".join(_huella(c, prof) for c in obj.co_consts)
+        return f"{obj.co_code.hex()}({consts}){obj.co_names}"
+    if isinstance(obj, re.Pattern):
+        return f"re({obj.pattern!r},{obj.flags})"
+    if isinstance(obj, (frozenset, set)):
+        return repr(sorted(_huella(x, prof) for x in obj))
+    if isinstance(obj, tuple):
+        return "(" + ",".join(_huella(x, prof) for x in obj) + ")"
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return repr(obj)
+    return type(obj).__name__
+
+def _textos(obj, prof: int = 0):
+    # literales y regex que pueden mirar los predicados (mismo recorrido que _huella)
+    if isinstance(obj, types.FunctionType):
+        yield from _textos(obj.__code__, prof)
+        for celda in obj.__closure__ or ():
+            yield from _textos(celda.cell_contents, prof + 1)
+        if prof < 3:
+            for n in obj.__code__.co_names:
+                if n in obj.__globals__: yield from _textos(obj.__globals__[n], prof + 1)
+    elif isinstance(obj, types.CodeType):
+        for c in obj.co_consts: yield from _textos(c, prof)
+    elif isinstance(obj, (re.Pattern, str)):
+        yield obj
+    elif isinstance(obj, (tuple, frozenset, set)):
+        for x in obj: yield from _textos(x, prof)
+
+# un regex que puede leer dígitos: clase \d / [0-9] o un número literal largo
+_LEE_DIGITOS = re.compile(r"\\d|\[[^\]]*0-9|\d{6,}")
+
+@functools.lru_cache(maxsize=32)
+def lee_numeros_largos(reglas=REGLAS) -> bool:
+    # True si alguna regla puede distinguir descripciones que sólo difieren en un
+    # número largo (CBU, CUIT, nro. de operación): entonces el cache de clasificación
+    # usa la descripción entera en la clave, sin normalizar
+    for _, pred, _ in reglas:
+        for t in _textos(pred):
+            if isinstance(t, re.Pattern):
+                if _LEE_DIGITOS.search(t.pattern) or t.search("123456"): return True
+            elif LONG_INT_RE.search(t):
+                return True
+    return False
+
+def sin_numeros_largos(desc: str) -> str:
+    # el número largo queda como "#": sacarlo juntaría las palabras de los costados
+    # ("IVA 123456 GRAL" no es "IVA GRAL" para una regla que busca ese texto)
+    return " ".join(LONG_INT_RE.sub("#", desc.upper()).split())
+
+def version_reglas(reglas=REGLAS) -> str:
+    h = hashlib.sha256()
+    for etiqueta, pred, signo in reglas:
+        h.update(f"{etiqueta}\0{signo}\0{_huella(pred)}\n".encode())
+    return f"{CLASIFICACION_VERSION}-{h.hexdigest()[:16]}"
+
+# Cache persistente de clasificación (SQLite): las mismas descripciones vuelven cada mes
+# en cada cliente. Clave: (banco, versión de las reglas, descripcion, desc_norm, signo);
+# las reglas miran los dos textos, así que van los dos. Los números largos de la
+# descripción (comprobantes, CUIT) se reemplazan por "#" sólo si ninguna regla puede
+# leerlos (lee_numeros_largos); si alguna puede, va la descripción entera. Se consulta en bloque antes de
+# evaluar ninguna regla y sólo los textos nuevos pasan por clasificar_columnas. Cambiar
+# las reglas cambia la versión: lo anterior de ese banco se borra al guardar.
+# IABANCOS_CLASIF_DB="" la desactiva. Es best-effort: un error de SQLite sólo la saltea.
+CLASIF_DB = os.environ.get("IABANCOS_CLASIF_DB", str(CACHE_DIR / "clasificacion.sqlite"))
+_LOTE_SQL = 500   # claves por consulta (límite de parámetros de SQLite)
+
+class CacheClasificacion:
+    def __init__(self, path=CLASIF_DB):
+        self.path = str(path)
+        self.consultas = self.aciertos = 0    # por texto único, acumulado en el proceso
+        self._lock = threading.Lock()
+        self._creada = False
+
+    def _conectar(self):
+        # una conexión por llamada: sirve igual desde hilos y procesos (WAL)
+        if not self._creada:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=30)
+        if not self._creada:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS clasificacion (clave BLOB PRIMARY KEY, banco TEXT, "
+                        "version TEXT, desc_norm TEXT, signo INTEGER, etiqueta TEXT) WITHOUT ROWID")
+            con.execute("CREATE INDEX IF NOT EXISTS clasificacion_version ON clasificacion (banco, version)")
+            self._creada = True
+        return con
+
+    def buscar(self, claves: list) -> dict:
+        out = {}
+        con = self._conectar()
+        try:
+            for i in range(0, len(claves), _LOTE_SQL):
+                parte = claves[i:i + _LOTE_SQL]
+                q = f"SELECT clave, etiqueta FROM clasificacion WHERE clave IN ({','.join('?' * len(parte))})"
+                out.update(con.execute(q, parte).fetchall())
+        finally:
+            con.close()
+        return out
+
+    def guardar(self, banco: str, version: str, filas):
+        # filas: (clave, desc_norm, signo, etiqueta); un cambio de reglas borra lo viejo del banco
+        con = self._conectar()
+        try:
+            with con:
+                con.execute("DELETE FROM clasificacion WHERE banco = ? AND version <> ?", (banco, version))
+                con.executemany("INSERT OR REPLACE INTO clasificacion VALUES (?, ?, ?, ?, ?, ?)",
+                                [(k, banco, version, t, sg, e) for k, t, sg, e in filas])
+        finally:
+            con.close()
+
+    def clasificar(self, desc, desc_norm, deb, cre, reglas=REGLAS, banco: str | None = None) -> np.ndarray:
+        d = pd.Series(desc, dtype=object).astype(str).to_numpy()
+        n = pd.Series(desc_norm, dtype=object).astype(str).to_numpy()
+        es_deb = np.asarray(deb, dtype=float) != 0
+        es_cre = np.asarray(cre, dtype=float) != 0
+        if len(d) == 0:
+            return np.array([], dtype=object)
+        banco = banco or ""
+        version = version_reglas(reglas)
+        signo = es_deb.astype(np.int64) + 2 * es_cre.astype(np.int64)
+
+        # combinaciones únicas (descripcion sin números largos, desc_norm, signo) y su clave
+        cd, ud = pd.factorize(d)
+        norm = (lambda x: x) if lee_numeros_largos(reglas) else sin_numeros_largos
+        sin_num = np.array([norm(x) for x in ud], dtype=object)
+        cs, _ = _codes(sin_num[cd]) if len(ud) else (cd, 0)
+        cn, nn = _codes(n)
+        codes, _ = pd.factorize((cs * nn + cn) * 4 + signo)
+        _, first = np.unique(codes, return_index=True)
+        pre = f"{banco}\0{version}\0"
+        claves = [hashlib.blake2b(f"{pre}{sin_num[cd[i]]}\0{n[i]}\0{signo[i]}".encode(), digest_size=16).digest()
+                  for i in first]
+
+        with etapa("clasificacion_cache", filas=len(d), unicos=len(first)) as e:
+            try:
+                vistas = self.buscar(claves)
+            except sqlite3.Error:
+                vistas = {}
+            etiquetas = np.array([vistas.get(k) for k in claves], dtype=object)
+            faltan = np.flatnonzero(pd.isna(etiquetas))
+            if len(faltan):
+                rep = first[faltan]
+                etiquetas[faltan] = clasificar_columnas(d[rep], n[rep], es_deb[rep], es_cre[rep], reglas)
+                try:
+                    self.guardar(banco, version, [(claves[k], n[first[k]], int(signo[first[k]]), etiquetas[k])
+                                                  for k in faltan])
+                except sqlite3.Error:
+                    pass
+            aciertos = len(first) - len(faltan)
+            e.update(aciertos=aciertos, tasa=round(aciertos / len(first), 4))
+        with self._lock:
+            self.consultas += len(first); self.aciertos += aciertos
+        return etiquetas[codes]
+
+    def tasa(self) -> float:
+        # proporción de textos únicos resueltos desde la base (acumulada en el proceso)
+        return self.aciertos / self.consultas if self.consultas else 0.0
+
+    def estadisticas(self) -> dict:
+        con = self._conectar()
+        try:
+            por_banco = dict(con.execute("SELECT banco, COUNT(*) FROM clasificacion GROUP BY banco").fetchall())
+        finally:
+            con.close()
+        return {"consultas": self.consultas, "aciertos": self.aciertos, "tasa": round(self.tasa(), 4),
+                "textos": por_banco}
+
+CACHE_CLASIFICACION = CacheClasificacion() if CLASIF_DB else None
@@ -0,0 +1,92 @@
+import io
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Salida columnar (Parquet / Arrow IPC) con tipos ajustados: textos repetidos como
+# categóricas (diccionario en Arrow) y contadores como enteros chicos. Parquet para
+# guardar/compartir (zstd); Arrow IPC sin compresión para memory-map al leer.
+# pyarrow es opcional: sin él estas funciones levantan ImportError.
+# Los montos se guardan como vienen, en centavos (int64); lo indica `iabancos_montos`.
+
+COLUMNAR_VERSION = "2"
+# tipos fijos (no dependen del archivo) para que varios resúmenes compartan schema
+CATEGORICAS = ("Clasificación", "signo", "desc_norm", "descripcion", "origen", "banco")
+ENTEROS = {"pagina": "int16", "orden": "int32", "mcount": "int8"}
+
+def hay_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def compactar(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for c in out.columns:
+        s = out[c]
+        if c in ENTEROS and pd.api.types.is_numeric_dtype(s) and s.notna().all():
+            info = np.iinfo(ENTEROS[c])
+            if not len(s) or (s.min() >= info.min and s.max() <= info.max):
+                out[c] = s.astype(ENTEROS[c])
+        elif c in CATEGORICAS and s.dtype == object:
+            out[c] = s.astype("category")
+    return out
+
+def _tabla(df: pd.DataFrame, meta: dict | None = None):
+    import pyarrow as pa
+    t = pa.Table.from_pandas(compactar(df), preserve_index=False)
+    # índices de diccionario siempre int32 (pandas elige int8/int16 según la cantidad)
+    for i, f in enumerate(t.schema):
+        if pa.types.is_dictionary(f.type) and f.type.index_type != pa.int32():
+            t = t.set_column(i, f.name, t.column(i).cast(pa.dictionary(pa.int32(), f.type.value_type)))
+    extra = {b"iabancos_columnar": COLUMNAR_VERSION.encode(), b"iabancos_montos": b"centavos"}
+    for k, v in (meta or {}).items():
+        extra[f"iabancos_{k}".encode()] = str(v).encode()
+    return t.replace_schema_metadata({**(t.schema.metadata or {}), **extra})
+
+def guardar_parquet(df: pd.DataFrame, destino, meta: dict | None = None, compression: str = "zstd"):
+    # destino: ruta o archivo binario; `meta` (banco, archivo, hash...) va al schema
+    import pyarrow.parquet as pq
+    pq.write_table(_tabla(df, meta), destino, compression=compression)
+    return destino
+
+def parquet_bytes(df: pd.DataFrame, meta: dict | None = None) -> bytes:
+    buf = io.BytesIO()
+    guardar_parquet(df, buf, meta)
+    return buf.getvalue()
+
+def leer_parquet(origen, columnas: list[str] | None = None) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+    mm = isinstance(origen, (str, Path))
+    return pq.read_table(origen, columns=columnas, memory_map=mm).to_pandas()
+
+def guardar_arrow(df: pd.DataFrame, destino, meta: dict | None = None):
+    # Arrow IPC (Feather v2) sin compresión: se puede mapear en memoria sin copiar
+    import pyarrow as pa
+    t = _tabla(df, meta)
+    with pa.OSFile(str(destino), "wb") as f, pa.ipc.new_file(f, t.schema) as w:
+        w.write_table(t)
+    return destino
+
+def leer_arrow(origen, columnas: list[str] | None = None, pandas: bool = True):
+    # pandas=False devuelve la pyarrow.Table mapeada (cero copia hasta convertir)
+    import pyarrow as pa
+    t = pa.ipc.open_file(pa.memory_map(str(origen), "r")).read_all()
+    if columnas: t = t.select(columnas)
+    return t.to_pandas() if pandas else t
+
+def metadatos(origen) -> dict:
+    # metadatos iabancos_* del schema (Parquet o Arrow IPC)
+    import pyarrow as pa, pyarrow.parquet as pq
+    p = str(origen)
+    schema = pa.ipc.open_file(pa.memory_map(p, "r")).schema if p.endswith((".arrow", ".feather")) else pq.read_schema(p)
+    return {k.decode()[len("iabancos_"):]: v.decode() for k, v in (schema.metadata or {}).items()
+            if k.startswith(b"iabancos_")}
+
+def leer_carpeta(carpeta, columnas: list[str] | None = None, filtro=None) -> pd.DataFrame:
+    # todos los .parquet de una carpeta (p. ej. años de resúmenes) como un solo df;
+    # `filtro`: expresión de pyarrow.dataset (sólo lee los row groups necesarios)
+    import pyarrow.dataset as ds
+    d = ds.dataset(str(carpeta), format="parquet")
+    return d.to_table(columns=columnas, filter=filtro).to_pandas()
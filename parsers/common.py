@@ -1,7 +1,7 @@
-import re, io
+import re, io, os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
-import pdfplumber
 
 # Regex
 DATE_RE  = re.compile(r"\b\d{1,2}/\d{2}/\d{2,4}\b")  # dd/mm/aa o dd/mm/aaaa
@@ -15,12 +15,18 @@ SF_SALDO_ULT_RE = re.compile(r"SALDO\s+U?LTIMO\s+RESUMEN", re.IGNORECASE)
 HEADER_ROW_PAT = re.compile(r"^(FECHA\s+DESCRIPC(?:I[ÓO]N|ION)|FECHA\s+CONCEPTO|FECHA\s+DETALLE).*(SALDO|D[ÉE]BITO|CR[ÉE]DITO)", re.IGNORECASE)
 NON_MOV_PAT    = re.compile(r"(INFORMACI[ÓO]N\s+DE\s+SU/S\s+CUENTA/S|TOTAL\s+RESUMEN\s+OPERATIVO|RESUMEN\s+DEL\s+PER[IÍ]ODO)", re.IGNORECASE)
 
+# Extracción en paralelo (procesos): cantidad de workers por defecto y mínimo de páginas
+EXTRACT_WORKERS = int(os.environ.get("IABANCOS_EXTRACT_WORKERS", "1"))
+PARALLEL_MIN_PAGES = 8
+# Subir cuando cambie el armado de líneas (page_lines/iter_lines): clave de la etapa de extracción
+EXTRACCION_VERSION = "1"
+
 def upper_safe(s: str) -> str:
     return (s or "").upper()
 
 def normalize_money(tok: str) -> float:
     if not tok: return np.nan
-    tok = tok.strip()
+    tok = tok.strip().replace("−", "-")
     neg = tok.endswith("-") or tok.startswith("-")
     tok = tok.lstrip("-").rstrip("-")
     if "," not in tok: return np.nan
@@ -32,13 +38,56 @@ def normalize_money(tok: str) -> float:
     except Exception:
         return np.nan
 
+# Montos en centavos (int64): exactos, las sumas no derivan y conciliar es comparar
+# por igualdad. Se pasa a pesos / texto sólo en los bordes (pantalla, Excel, CSV).
+def normalize_money_cents_arr(tokens) -> np.ndarray:
+    # tokens de MONEY_RE (siempre con 2 decimales): los dígitos ya son los centavos
+    s = pd.Series(tokens, dtype=object).fillna("").astype(str).str.strip().str.replace("−", "-", regex=False)
+    if not len(s): return np.zeros(0, dtype=np.int64)
+    neg = (s.str.startswith("-") | s.str.endswith("-")).to_numpy()
+    digits = s.str.replace(r"\D", "", regex=True)
+    val = pd.to_numeric(digits.where(digits != "", "0")).to_numpy(dtype=np.int64)
+    return np.where(neg, -val, val)
+
+def fmt_cents(c) -> str:
+    # centavos → "1.234,56" sin pasar por float
+    if c is None or pd.isna(c): return "—"
+    c = int(c)
+    p, r = divmod(abs(c), 100)
+    return ("-" if c < 0 else "") + f"{p:,}".replace(",", ".") + f",{r:02d}"
+
+def cents_a_pesos(c):
+    # escalar o array de centavos → pesos (float), para exportar
+    if c is None: return None
+    return c / 100
+
+def parse_dates_ar(tokens) -> pd.Series:
+    # dd/mm/aaaa y dd/mm/aa con formato explícito (sin inferencia por fila)
+    s = pd.Series(tokens, dtype=object).fillna("").astype(str)
+    year_len = s.str.rsplit("/", n=1).str[-1].str.len()
+    out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    for n, fmt in ((4, "%d/%m/%Y"), (2, "%d/%m/%y")):
+        m = year_len == n
+        if m.any(): out[m] = pd.to_datetime(s[m], format=fmt, errors="coerce")
+    return out
+
+def map_unique(fn, values) -> list:
+    # aplica fn una vez por valor distinto (descripciones muy repetidas)
+    cache = {v: fn(v) for v in set(values)}
+    return [cache[v] for v in values]
+
 def fmt_ar(n) -> str:
     if n is None or (isinstance(n, float) and np.isnan(n)): return "—"
     return f"{n:,.2f}".replace(",", "§").replace(".", ",").replace("§", ".")
 
+def open_pdf(file_like, **kw):
+    # pdfplumber se importa recién al abrir el primer PDF (arranque en frío más liviano)
+    import pdfplumber
+    return pdfplumber.open(file_like, **kw)
+
 def text_from_pdf(file_like) -> str:
     try:
-        with pdfplumber.open(file_like) as pdf:
+        with open_pdf(file_like) as pdf:
             return "\n".join((p.extract_text() or "") for p in pdf.pages)
     except Exception:
         return ""
@@ -62,72 +111,136 @@ def lines_from_words(page, ytol=2.0):
     if cur: lines.append(" ".join(x["text"] for x in cur))
     return [" ".join(l.split()) for l in lines]
 
-def extract_all_lines(file_like):
+def lines_from_chars(page, ytol=3.0, xtol=3.0):
+    # Una sola pasada sobre page.chars: bandas por "top" (tolerancia ytol desde el
+    # primer char de la banda), orden por x y espacio cuando el hueco supera xtol.
+    chars = [c for c in page.chars if c.get("upright", True)]
+    if not chars: return []
+    chars.sort(key=lambda c: (c["top"], c["x0"]))
+    bands, cur, top0 = [], [], None
+    for c in chars:
+        if top0 is not None and c["top"] - top0 > ytol:
+            bands.append(cur); cur = []; top0 = None
+        if top0 is None: top0 = c["top"]
+        cur.append(c)
+    if cur: bands.append(cur)
+    lines = []
+    for band in bands:
+        band.sort(key=lambda c: c["x0"])
+        parts, prev = [], None
+        for c in band:
+            if prev is not None:
+                # chars duplicados (negrita simulada por sobreimpresión)
+                if c["text"] == prev["text"] and abs(c["x0"] - prev["x0"]) < 1: continue
+                if c["x0"] - prev["x1"] > xtol: parts.append(" ")
+            parts.append(c["text"]); prev = c
+        lines.append(" ".join("".join(parts).split()))
+    return lines
+
+def page_lines(p, engine="chars"):
+    if engine == "chars":
+        return [l for l in lines_from_chars(p) if l]
+    # "legacy": extract_text + extract_words combinados
+    lt = lines_from_text(p)
+    lw = lines_from_words(p, ytol=2.0)
+    seen = set(lt)
+    combined = lt + [l for l in lw if l not in seen]
+    return [l for l in combined if l and l.strip()]
+
+def pdf_bytes(file_like) -> bytes:
+    if isinstance(file_like, (bytes, bytearray)): return bytes(file_like)
+    if isinstance(file_like, (str, os.PathLike)):
+        with open(file_like, "rb") as fh: return fh.read()
+    if hasattr(file_like, "seek"): file_like.seek(0)
+    return file_like.read()
+
+# Estado por proceso worker: los bytes del PDF se mandan una sola vez (initializer)
+_WORKER_PDF = None
+
+def _mp_contexto():
+    # Los workers no se crean con fork: la extracción corre en hilos (script de Streamlit,
+    # pool de tareas) y un fork desde un proceso con hilos puede heredar locks tomados.
+    # forkserver arranca cada worker desde un proceso limpio que ya importó este módulo
+    # (pandas, pdfplumber); donde no existe (Windows), spawn.
+    import multiprocessing as mp
+    if "forkserver" not in mp.get_all_start_methods():
+        return mp.get_context("spawn")
+    ctx = mp.get_context("forkserver")
+    ctx.set_forkserver_preload([__name__])
+    return ctx
+
+def _init_worker(data: bytes):
+    global _WORKER_PDF
+    _WORKER_PDF = data
+
+def _lineas(p, engine, plantilla):
+    # (líneas, fin) de una página; con plantilla (parsers.plantillas) sólo la región de movimientos
+    if plantilla is None: return page_lines(p, engine), False
+    from .plantillas import lineas_pagina
+    lines, _, fin = lineas_pagina(p, plantilla, engine)
+    return lines, fin
+
+def _extract_page_range(start: int, stop: int, engine: str = "chars", plantilla: dict | None = None):
     out = []
-    with pdfplumber.open(file_like) as pdf:
-        for pi, p in enumerate(pdf.pages, start=1):
-            lt = lines_from_text(p)
-            lw = lines_from_words(p, ytol=2.0)
-            seen = set(lt)
-            combined = lt + [l for l in lw if l not in seen]
-            out.extend([(pi, l) for l in combined if l and l.strip()])
-    return out
+    with open_pdf(io.BytesIO(_WORKER_PDF), pages=list(range(start, stop + 1))) as pdf:
+        for p in pdf.pages:
+            lines, fin = _lineas(p, engine, plantilla)
+            out.extend([(p.page_number, l) for l in lines])
+            p.close()
+            if fin: return out, True
+    return out, False
+
+def _page_ranges(n_pages: int, n_chunks: int):
+    step, extra = divmod(n_pages, n_chunks)
+    ranges, start = [], 1
+    for i in range(n_chunks):
+        stop = start + step + (1 if i < extra else 0) - 1
+        if stop >= start: ranges.append((start, stop))
+        start = stop + 1
+    return ranges
 
-def _only_one_amount(line: str) -> bool:
-    return len(list(MONEY_RE.finditer(line))) == 1
-
-def _first_amount_value(line: str) -> float:
-    m = MONEY_RE.search(line)
-    return normalize_money(m.group(0)) if m else np.nan
-
-def find_saldo_final_from_lines(lines):
-    for ln in reversed(lines):
-        if SALDO_FINAL_PREFIX.match(ln):
-            d = DATE_RE.search(ln)
-            if d and _only_one_amount(ln):
-                fecha = pd.to_datetime(d.group(0), dayfirst=True, errors="coerce")
-                saldo = _first_amount_value(ln)
-                if pd.notna(fecha) and not np.isnan(saldo): 
-                    return fecha, saldo
-    for ln in reversed(lines):
-        if "SALDO FINAL" in upper_safe(ln) and _only_one_amount(ln):
-            saldo = _first_amount_value(ln)
-            if not np.isnan(saldo): 
-                return pd.NaT, saldo
-    return pd.NaT, np.nan
-
-def find_saldo_anterior_from_lines(lines):
-    for ln in lines:
-        if SALDO_ANT_PREFIX.match(ln):
-            d = DATE_RE.search(ln)
-            if d and _only_one_amount(ln):
-                saldo = _first_amount_value(ln)
-                if not np.isnan(saldo): return saldo
-    for ln in lines:
-        U = upper_safe(ln)
-        if "SALDO ANTERIOR" in U and _only_one_amount(ln):
-            saldo = _first_amount_value(ln)
-            if not np.isnan(saldo): return saldo
-    for ln in lines:
-        U = upper_safe(ln)
-        if "SALDO ULTIMO EXTRACTO" in U or "SALDO ÚLTIMO EXTRACTO" in U:
-            d = DATE_RE.search(ln)
-            if d and _only_one_amount(ln):
-                saldo = _first_amount_value(ln)
-                if not np.isnan(saldo): return saldo
-    for i, ln in enumerate(lines):
-        if SF_SALDO_ULT_RE.search(ln):
-            if _only_one_amount(ln):
-                v = _first_amount_value(ln)
-                if not np.isnan(v): return v
-            for j in (i+1, i+2):
-                if 0 <= j < len(lines):
-                    ln2 = lines[j]
-                    if _only_one_amount(ln2):
-                        v2 = _first_amount_value(ln2)
-                        if not np.isnan(v2): return v2
-            break
-    return np.nan
+def extract_all_lines(file_like, workers: int | None = None, engine: str = "chars", plantilla: dict | None = None,
+                      progreso=None):
+    # `progreso(pagina, paginas)`: se llama al terminar cada página (en paralelo, cada rango)
+    workers = EXTRACT_WORKERS if workers is None else workers
+    if workers > 1:
+        data = pdf_bytes(file_like)
+        with open_pdf(io.BytesIO(data)) as pdf:
+            n_pages = len(pdf.pages)
+        if n_pages >= PARALLEL_MIN_PAGES:
+            # Rangos contiguos (2 por worker para balancear); se concatenan en orden
+            ranges = _page_ranges(n_pages, min(n_pages, workers * 2))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_contexto(),
+                                     initializer=_init_worker, initargs=(data,)) as ex:
+                futs = [ex.submit(_extract_page_range, a, b, engine, plantilla) for a, b in ranges]
+                if progreso:
+                    largo, hechas = {f: b - a + 1 for f, (a, b) in zip(futs, ranges)}, 0
+                    for f in as_completed(futs):
+                        hechas += largo[f]
+                        progreso(hechas, n_pages)
+                parts = [f.result() for f in futs]
+            out = []
+            for part, fin in parts:   # hasta el primer rango que encontró la marca de fin
+                out.extend(part)
+                if fin: break
+            return out
+        file_like = io.BytesIO(data)
+    return list(iter_lines(file_like, engine, plantilla, progreso))
+
+def iter_lines(file_like, engine: str = "chars", plantilla: dict | None = None, progreso=None):
+    # Generador (página, línea): cada página libera su cache de objetos/layout
+    # apenas se leen sus líneas, así la memoria no crece con la cantidad de páginas.
+    # `plantilla`: recorta cada página a la región de movimientos del banco (con
+    # página completa si no coincide) y termina en la marca de fin de la tabla.
+    with open_pdf(file_like) as pdf:
+        n_pages = len(pdf.pages)
+        for pi, p in enumerate(pdf.pages, start=1):
+            lines, fin = _lineas(p, engine, plantilla)
+            p.close()
+            if progreso: progreso(pi, n_pages)
+            for l in lines:
+                yield pi, l
+            if fin: break
 
 def normalize_desc(desc: str) -> str:
     if not desc: return ""
@@ -147,22 +260,74 @@ RE_PERCEP_IVA = _re.compile(r"(IVA\s*PERC|IVA\s*PERCEP|RG\.?\s*3337|RG\.?\s*2408
 RE_IVA_21 = _re.compile(r"(I\.?V\.?A\.?\s*BASE|IVA\s*GRAL|DEBITO\s*FISCAL\s*IVA\s*BASICO)", _re.I)
 RE_IVA_105 = _re.compile(r"(IVA\s*10[,\.]5|IVA\s*REDUC|IVA\s*RINS)", _re.I)
 
-def clasificar(desc: str, desc_norm: str, deb: float, cre: float) -> str:
-    u = upper_safe(desc); n = upper_safe(desc_norm)
-    if "SALDO ANTERIOR" in u or "SALDO ANTERIOR" in n: return "SALDO ANTERIOR"
-    if RE_SIRCREB.search(u) or RE_SIRCREB.search(n):  return "SIRCREB"
-    if RE_LEY25413.search(u) or RE_LEY25413.search(n):return "LEY 25.413"
-    if RE_PERCEP_IVA.search(u) or RE_PERCEP_IVA.search(n): return "Percepciones de IVA"
-    if RE_IVA_105.search(u) or RE_IVA_105.search(n): return "IVA 10,5% (sobre comisiones)"
-    if RE_IVA_21.search(u) or RE_IVA_21.search(n):   return "IVA 21% (sobre comisiones)"
+# Reglas como datos: (etiqueta, predicado(u, n) sobre descripción/desc_norm en mayúsculas,
+# signo requerido: None | "cre" | "deb"). Gana la primera que cumple; si ninguna, "Otros".
+# La misma tabla la usan clasificar (fila a fila) y clasificacion.clasificar_df (columnas).
+REGLAS = (
+    ("SALDO ANTERIOR", lambda u, n: "SALDO ANTERIOR" in u or "SALDO ANTERIOR" in n, None),
+    ("SIRCREB", lambda u, n: bool(RE_SIRCREB.search(u) or RE_SIRCREB.search(n)), None),
+    ("LEY 25.413", lambda u, n: bool(RE_LEY25413.search(u) or RE_LEY25413.search(n)), None),
+    ("Percepciones de IVA", lambda u, n: bool(RE_PERCEP_IVA.search(u) or RE_PERCEP_IVA.search(n)), None),
+    ("IVA 10,5% (sobre comisiones)", lambda u, n: bool(RE_IVA_105.search(u) or RE_IVA_105.search(n)), None),
+    ("IVA 21% (sobre comisiones)", lambda u, n: bool(RE_IVA_21.search(u) or RE_IVA_21.search(n)), None),
 
     # Transferencias / préstamos / otros (resumen)
-    if ("TRANSFERENCIA DE TERCEROS" in u or "TRANSF RECIB" in n or "CR-TRSFE" in n or "TRANLINK" in n) and cre: return "Transferencia de terceros recibida"
-    if ("DB-TRSFE" in n or "TRSFE-ET" in n or "TRSFE-IT" in n) and deb: return "Transferencia a terceros realizada"
-    if ("DTNCTAPR" in n or "ENTRE CTA" in n or "CTA PROPIA" in n): return "Transferencia entre cuentas propias"
-    if ("CUOTA PRÉSTAMO" in u or "CUOTA PRESTAMO" in u or "DEB.CUOTA PRESTAMO" in n): return "Cuota de préstamo"
-    if ("CR.PREST" in n or "CREDITO PRESTAMOS" in n): return "Acreditación Préstamos"
-
-    if cre and cre != 0: return "Crédito"
-    if deb and deb != 0: return "Débito"
+    ("Transferencia de terceros recibida", lambda u, n: "TRANSFERENCIA DE TERCEROS" in u or "TRANSF RECIB" in n or "CR-TRSFE" in n or "TRANLINK" in n, "cre"),
+    ("Transferencia a terceros realizada", lambda u, n: "DB-TRSFE" in n or "TRSFE-ET" in n or "TRSFE-IT" in n, "deb"),
+    ("Transferencia entre cuentas propias", lambda u, n: "DTNCTAPR" in n or "ENTRE CTA" in n or "CTA PROPIA" in n, None),
+    ("Cuota de préstamo", lambda u, n: "CUOTA PRÉSTAMO" in u or "CUOTA PRESTAMO" in u or "DEB.CUOTA PRESTAMO" in n, None),
+    ("Acreditación Préstamos", lambda u, n: "CR.PREST" in n or "CREDITO PRESTAMOS" in n, None),
+
+    ("Crédito", None, "cre"),
+    ("Débito", None, "deb"),
+)
+
+def aplicar_reglas(reglas, u: str, n: str, deb, cre) -> str:
+    for etiqueta, pred, signo in reglas:
+        if signo == "cre" and not cre: continue
+        if signo == "deb" and not deb: continue
+        if pred is None or pred(u, n): return etiqueta
     return "Otros"
+
+def clasificar(desc: str, desc_norm: str, deb: float, cre: float) -> str:
+    return aplicar_reglas(REGLAS, upper_safe(desc), upper_safe(desc_norm), deb, cre)
+
+def render_summary(df: pd.DataFrame, res: dict, titulo: str = ""):
+    # Vista Streamlit mínima para los render(...) por banco (streamlit se importa al usarse)
+    import streamlit as st
+    if titulo: st.subheader(titulo)
+    c1, c2, c3 = st.columns(3)
+    with c1: st.metric("Saldo inicial", f"$ {fmt_cents(res['saldo_inicial'])}")
+    with c2: st.metric("Créditos (+)", f"$ {fmt_cents(res['total_creditos'])}")
+    with c3: st.metric("Débitos (–)", f"$ {fmt_cents(res['total_debitos'])}")
+    c4, c5, c6 = st.columns(3)
+    with c4: st.metric("Saldo final (PDF)", f"$ {fmt_cents(res['saldo_pdf'])}")
+    with c5: st.metric("Saldo final calculado", f"$ {fmt_cents(res['saldo_calc'])}")
+    with c6: st.metric("Diferencia", f"$ {fmt_cents(res['diferencia'])}")
+    if res["cuadra"]: st.success("Conciliado.")
+    else: st.error("No cuadra la conciliación (revisar signos/clasificación).")
+    view = vista_pesos(df)
+    st.dataframe(view, use_container_width=True)
+
+MONEY_COLS = ("debito", "credito", "saldo", "importe", "importe_raw", "saldo_pdf", "monto_pdf")
+MONEY_KEYS = ("saldo_inicial", "total_creditos", "total_debitos", "saldo_pdf", "saldo_calc", "diferencia")
+
+def df_pesos(df: pd.DataFrame) -> pd.DataFrame:
+    # copia con las columnas de montos en pesos (float), para CSV y planillas
+    out = df.copy()
+    for c in MONEY_COLS:
+        if c in out.columns: out[c] = out[c].to_numpy(dtype=float, na_value=np.nan) / 100
+    return out
+
+def res_pesos(res: dict) -> dict:
+    # resumen de conciliación con los montos en pesos
+    return {k: (cents_a_pesos(v) if k in MONEY_KEYS else v) for k, v in res.items()}
+
+def vista_pesos(df: pd.DataFrame) -> pd.DataFrame:
+    # copia para mostrar: débito/crédito/saldo como texto AR, el resto de montos en pesos
+    view = df.copy()
+    for c in MONEY_COLS:
+        if c not in view.columns: continue
+        if c in ("debito", "credito", "saldo"): view[c] = view[c].map(fmt_cents)
+        else: view[c] = view[c].to_numpy(dtype=float, na_value=np.nan) / 100
+    return view
@@ -0,0 +1,189 @@
+# Consolidación de varios resúmenes de una misma cuenta en un solo libro:
+#   python -m parsers.consolidar libro.parquet "2024/*.pdf"
+# Resúmenes consecutivos suelen repetir movimientos del borde y las filas de SALDO
+# ANTERIOR / SALDO FINAL. Cada movimiento tiene una clave hash de
+# (fecha, importe, saldo, desc_norm); el libro guarda el conjunto de claves y un
+# resumen nuevo se compara contra ese conjunto (O(filas nuevas), sin pares).
+# Incremental: el libro se guarda en Parquet con sus claves, y sumar el mes 13 sólo
+# procesa el resumen nuevo.
+import argparse, json, sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .common import fmt_cents, normalize_desc
+
+SALDO_RE = r"^SALDO (?:ANTERIOR|FINAL|AL\b)"
+CONSOLIDAR_VERSION = "1"
+
+def _desc_norm(df: pd.DataFrame) -> pd.Series:
+    # desc_norm del parser; los que no la traen (Galicia) → descripcion normalizada,
+    # una vez por texto distinto
+    if "desc_norm" in df.columns:
+        return df["desc_norm"].fillna("").astype(str)
+    d = df["descripcion"].fillna("").astype(str)
+    return d.map({u: normalize_desc(u) for u in d.unique()})
+
+def _importe(df: pd.DataFrame) -> np.ndarray:
+    # crédito − débito (Santa Fe no trae columna importe), centavos
+    return df["credito"].to_numpy(dtype=np.int64) - df["debito"].to_numpy(dtype=np.int64)
+
+def claves(df: pd.DataFrame) -> np.ndarray:
+    # hash uint64 por fila de (fecha, importe, saldo, desc_norm), montos en centavos;
+    # saldo sin dato (NA) cuenta como 0, igual que los extractos sin saldo por línea
+    k = pd.DataFrame({
+        "fecha": df["fecha"],
+        "importe": _importe(df),
+        "saldo": df["saldo"].to_numpy(dtype=np.int64, na_value=0),
+        "desc_norm": _desc_norm(df),
+    })
+    return pd.util.hash_pandas_object(k, index=False).to_numpy()
+
+def _es_saldo(df: pd.DataFrame) -> np.ndarray:
+    return _desc_norm(df).str.upper().str.contains(SALDO_RE).to_numpy(dtype=bool)
+
+def _entero(v):
+    return None if v is None or pd.isna(v) else int(v)
+
+def _primera_fecha(df: pd.DataFrame):
+    f = df.loc[~_es_saldo(df), "fecha"].dropna()
+    return f.min() if len(f) else pd.NaT
+
+class Libro:
+    def __init__(self):
+        self.df = None               # movimientos consolidados (+ columnas resumen, clave)
+        self.vistas = set()          # claves de todos los movimientos del libro
+        self.resumenes = []          # un dict por resumen agregado (corte de continuidad)
+        self.saldo_final = None      # centavos, saldo final del último resumen
+
+    def __len__(self):
+        return 0 if self.df is None else len(self.df)
+
+    def contiene(self, resumen: str) -> bool:
+        return any(r["resumen"] == resumen for r in self.resumenes)
+
+    def agregar(self, df: pd.DataFrame, res: dict, resumen: str) -> dict:
+        # `df`, `res`: salida de un parser (montos en centavos); `resumen`: nombre o hash
+        # del archivo. Devuelve el corte: duplicados descartados y continuidad del saldo.
+        k = claves(df)
+        saldo = _es_saldo(df)
+        primero = self.df is None
+        # sólo el primer resumen aporta su fila SALDO ANTERIOR; SALDO FINAL/AL nunca
+        apertura = saldo & (_desc_norm(df).str.upper() == "SALDO ANTERIOR").to_numpy()
+        fuera = saldo & ~(apertura & primero)
+        # duplicados contra el libro (no dentro del mismo resumen: dos comisiones iguales
+        # el mismo día tienen distinto saldo, pero si no lo tienen son legítimas)
+        dup = np.fromiter((x in self.vistas for x in k), dtype=bool, count=len(k)) & ~fuera
+        nuevo = ~(fuera | dup)
+
+        out = df.loc[nuevo].copy()
+        out["resumen"] = resumen
+        out["clave"] = k[nuevo]
+
+        # continuidad: saldo previo al primer movimiento nuevo vs saldo final del libro.
+        # Es el saldo inicial que informa el resumen más los movimientos anteriores a ese
+        # (los repetidos del borde); no usa el saldo por línea, que Galicia no trae.
+        # Sin saldo inicial o sin saldo final del libro la diferencia queda en None.
+        movs = out.loc[~_es_saldo(out)] if len(out) else out
+        primer = np.flatnonzero(nuevo & ~saldo)
+        hasta = primer[0] if len(primer) else len(df)
+        previos = int(_importe(df)[:hasta][~saldo[:hasta]].sum())
+        saldo_inicial = _entero(res["saldo_inicial"])
+        saldo_previo = None if saldo_inicial is None else saldo_inicial + previos
+        fin = self.saldo_final
+        diferencia = None if primero or saldo_previo is None or fin is None else saldo_previo - int(fin)
+        corte = {
+            "resumen": resumen,
+            "desde": _primera_fecha(df),
+            "movimientos": int(len(movs)),
+            "duplicados": int(dup.sum()),
+            "saldo_previo": saldo_previo,
+            "saldo_final_libro": self.saldo_final,
+            "diferencia": diferencia,
+            "continuo": primero or diferencia == 0,
+            "saldo_final": _entero(res["saldo_pdf"]),
+        }
+
+        self.df = out.reset_index(drop=True) if primero else pd.concat([self.df, out], ignore_index=True)
+        self.vistas.update(out["clave"].tolist())
+        self.saldo_final = corte["saldo_final"]
+        self.resumenes.append(corte)
+        return corte
+
+    def cortes(self) -> pd.DataFrame:
+        return pd.DataFrame(self.resumenes)
+
+    def continuo(self) -> bool:
+        return all(r["continuo"] for r in self.resumenes)
+
+    def guardar(self, destino):
+        # Parquet con las claves como columna: al recargar no se vuelve a hashear
+        from .columnar import guardar_parquet
+        cortes = [{**r, "desde": None if pd.isna(r["desde"]) else r["desde"].isoformat()} for r in self.resumenes]
+        guardar_parquet(self.df, str(destino), {"consolidado": CONSOLIDAR_VERSION,
+                                                "resumenes": json.dumps(cortes, ensure_ascii=False),
+                                                "saldo_final": self.saldo_final})
+        return destino
+
+    @classmethod
+    def cargar(cls, origen) -> "Libro":
+        from .columnar import leer_parquet, metadatos
+        libro = cls()
+        libro.df = leer_parquet(origen)
+        for c in ("resumen", "desc_norm", "descripcion"):   # categóricas en el Parquet
+            if c in libro.df.columns: libro.df[c] = libro.df[c].astype(object)
+        meta = metadatos(origen)
+        libro.vistas = set(libro.df["clave"].tolist())
+        libro.resumenes = [{**r, "desde": pd.Timestamp(r["desde"]) if r["desde"] else pd.NaT}
+                           for r in json.loads(meta.get("resumenes", "[]"))]
+        libro.saldo_final = int(meta["saldo_final"]) if meta.get("saldo_final") not in (None, "None") else None
+        return libro
+
+def consolidar(resumenes, libro: Libro | None = None) -> Libro:
+    # resumenes: iterable de (df, res, nombre), en cualquier orden; se agregan por fecha
+    # del primer movimiento. Con `libro` se agregan a uno existente (incremental).
+    libro = Libro() if libro is None else libro
+    for df, res, nombre in sorted(resumenes, key=lambda t: (pd.isna(_primera_fecha(t[0])), _primera_fecha(t[0]))):
+        if not libro.contiene(nombre):
+            libro.agregar(df, res, nombre)
+    return libro
+
+def main(argv=None):
+    from .batch import listar_pdfs
+    from .cache import content_key
+    from .pipeline import procesar
+
+    ap = argparse.ArgumentParser(prog="python -m parsers.consolidar",
+                                 description="Consolida resúmenes de una cuenta en un solo libro (Parquet).")
+    ap.add_argument("libro", help="archivo .parquet del libro (se crea o se amplía)")
+    ap.add_argument("entradas", nargs="+", help="carpetas, archivos o globs de PDFs")
+    ap.add_argument("--cortes", help="CSV con el detalle por resumen (duplicados, continuidad)")
+    args = ap.parse_args(argv)
+
+    destino = Path(args.libro)
+    libro = Libro.cargar(destino) if destino.exists() else Libro()
+    nuevos = []
+    for p in listar_pdfs(args.entradas):
+        data = p.read_bytes()
+        nombre = f"{p.name}:{content_key(data)[:12]}"
+        if libro.contiene(nombre):
+            continue   # ya consolidado: no se vuelve a extraer
+        r = procesar(data, hasta="clasificacion")
+        nuevos.append((r["df"], r["res"], nombre))
+
+    antes = len(libro.resumenes)
+    consolidar(nuevos, libro)
+    for r in libro.resumenes[antes:]:
+        estado = "OK" if r["continuo"] else f"SALTO $ {fmt_cents(r['diferencia'])}"
+        print(f"{r['resumen']} · {r['movimientos']} movimientos · {r['duplicados']} duplicados · {estado}", file=sys.stderr)
+    if len(libro):
+        libro.guardar(destino)
+    if args.cortes:
+        libro.cortes().to_csv(args.cortes, index=False, encoding="utf-8-sig")
+    print(f"Libro: {len(libro)} movimientos de {len(libro.resumenes)} resúmenes "
+          f"({len(libro.resumenes) - antes} nuevos) · {'continuo' if libro.continuo() else 'con saltos de saldo'}")
+    return 0 if libro.continuo() else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
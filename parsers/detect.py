@@ -1,4 +1,5 @@
-from .common import upper_safe
+import hashlib, re
+from itertools import groupby
 
 BANK_SLUG = {
     "Banco de la Nación Argentina": "nacion",
@@ -7,6 +8,7 @@ BANK_SLUG = {
     "Banco Santander": "santander",
     "Banco Galicia": "galicia",
 }
+NO_IDENTIFICADO = "Banco no identificado"
 
 # Hints
 BNA_NAME_HINT = "BANCO DE LA NACION ARGENTINA"
@@ -14,15 +16,96 @@ BANK_MACRO_HINTS   = ("BANCO MACRO","CUENTA CORRIENTE BANCARIA","SALDO ULTIMO EX
 BANK_SANTAFE_HINTS = ("BANCO DE SANTA FE","NUEVO BANCO DE SANTA FE","SALDO ANTERIOR","IMPTRANS","IVA GRAL")
 BANK_NACION_HINTS  = (BNA_NAME_HINT, "SALDO ANTERIOR", "SALDO FINAL", "I.V.A. BASE", "COMIS.")
 BANK_GALICIA_HINTS = ("BANCO GALICIA","RESUMEN DE CUENTA","SIRCREB","IMP. DEB./CRE. LEY 25413","TRANSFERENCIA DE TERCEROS")
+BANK_SANTANDER_HINTS = ("SANTANDER","DETALLE IMPOSITIVO")
+
+# Nombre del banco (pesa más que las leyendas de movimientos, que se repiten entre bancos).
+# Regex: tolera acentos y espacios de más.
+BANK_NAME_PATS = {
+    "Banco Macro": r"BANCO\s+MACRO",
+    "Banco de Santa Fe": r"(?:NUEVO\s+)?BANCO\s+DE\s+SANTA\s*FE",
+    "Banco de la Nación Argentina": r"BANCO\s+(?:DE\s+LA\s+)?NACI[OÓ]N(?:\s+ARGENTINA)?",
+    "Banco Galicia": r"BANCO\s+(?:DE\s+)?GALICIA",
+    "Banco Santander": r"SANTANDER",
+}
+PESO_NOMBRE = 5
+PESO_HINT = 1
+# corte temprano: el mejor supera al segundo por este margen (un nombre sin competencia)
+MARGEN_CORTE = PESO_NOMBRE - 2
+
+def _tabla_hints():
+    # (patrón, peso, bancos): un hint compartido (SALDO ANTERIOR) suma a todos sus bancos
+    hints = {}
+    for banco, pat in BANK_NAME_PATS.items():
+        hints[pat] = [PESO_NOMBRE, [banco]]
+    nombres = {BNA_NAME_HINT, "BANCO MACRO", "BANCO DE SANTA FE", "NUEVO BANCO DE SANTA FE", "BANCO GALICIA", "SANTANDER"}
+    for banco, hs in (("Banco Macro", BANK_MACRO_HINTS), ("Banco de Santa Fe", BANK_SANTAFE_HINTS),
+                      ("Banco de la Nación Argentina", BANK_NACION_HINTS), ("Banco Galicia", BANK_GALICIA_HINTS),
+                      ("Banco Santander", BANK_SANTANDER_HINTS)):
+        for h in hs:
+            if h in nombres: continue
+            hints.setdefault(re.escape(h), [PESO_HINT, []])[1].append(banco)
+    return [(pat, peso, tuple(bancos)) for pat, (peso, bancos) in hints.items()]
+
+HINTS = _tabla_hints()
+# una sola pasada por texto: alternancia con un grupo por hint, cada uno dentro de un
+# lookahead. El match tiene ancho cero, así que el scan avanza de a un carácter y un
+# hint contenido en otro más largo (que empieza más adelante) también se cuenta, igual
+# que contar hint por hint. Dos hints no deben poder empezar en la misma posición
+# (sólo se reportaría el primero); lo verifica tests/test_detect.py.
+HINTS_RE = re.compile("|".join(f"(?=(?P<h{i}>{pat}))" for i, (pat, _, _) in enumerate(HINTS)), re.I)
+
+def version() -> str:
+    # entra en la clave de cache de la detección (parsers.pipeline): cambia con los
+    # hints, los pesos o el margen de corte
+    return hashlib.sha256(repr((HINTS, PESO_NOMBRE, PESO_HINT, MARGEN_CORTE)).encode()).hexdigest()[:12]
+
+def _puntajes(vistos: set) -> dict:
+    scores = dict.fromkeys(BANK_SLUG, 0)
+    for i in vistos:
+        _, peso, bancos = HINTS[i]
+        for b in bancos: scores[b] += peso
+    return scores
+
+def _resultado(scores: dict, paginas: int) -> dict:
+    orden = sorted(BANK_SLUG, key=lambda b: -scores[b])   # estable: empate → orden de BANK_SLUG
+    best, second = scores[orden[0]], scores[orden[1]]
+    banco = orden[0] if best > 0 else NO_IDENTIFICADO
+    return {"banco": banco, "slug": BANK_SLUG.get(banco),
+            "confianza": round((best - second) / best, 3) if best > 0 else 0.0,
+            "puntajes": scores, "paginas_leidas": paginas}
+
+def detectar_banco(textos, margen: int = MARGEN_CORTE) -> dict:
+    # `textos`: iterable de textos por página (puede ser un generador perezoso).
+    # Se corta en cuanto un banco saca `margen` de ventaja (casi siempre en la página 1).
+    vistos, n = set(), 0
+    for txt in textos:
+        n += 1
+        for m in HINTS_RE.finditer(txt or ""):
+            vistos.add(int(m.lastgroup[1:]))
+        scores = _puntajes(vistos)
+        a, b = sorted(scores.values(), reverse=True)[:2]
+        if a - b >= margen:
+            break
+    return _resultado(_puntajes(vistos), n)
+
+def paginas_de_lineas(lines):
+    # (página, línea) → texto por página, de a una página
+    for _, grupo in groupby(lines, key=lambda x: x[0]):
+        yield "\n".join(l for _, l in grupo)
+
+def detectar_banco_pdf(file_like, max_paginas: int | None = None, margen: int = MARGEN_CORTE) -> dict:
+    # Extrae página por página sólo hasta decidir
+    from .common import open_pdf, page_lines
+
+    def textos(pdf):
+        for p in pdf.pages[:max_paginas]:
+            lines = page_lines(p)
+            p.close()
+            yield "\n".join(lines)
+
+    if hasattr(file_like, "seek"): file_like.seek(0)
+    with open_pdf(file_like) as pdf:
+        return {**detectar_banco(textos(pdf), margen), "paginas": len(pdf.pages)}
 
 def detect_bank_from_text(txt: str) -> str:
-    U = upper_safe(txt)
-    scores = {
-        "Banco Macro": sum(1 for k in BANK_MACRO_HINTS if k in U),
-        "Banco de Santa Fe": sum(1 for k in BANK_SANTAFE_HINTS if k in U),
-        "Banco de la Nación Argentina": sum(1 for k in BANK_NACION_HINTS if k in U),
-        "Banco Galicia": sum(1 for k in BANK_GALICIA_HINTS if k in U),
-        "Banco Santander": (1 if "SANTANDER" in U else 0) + (1 if "DETALLE IMPOSITIVO" in U else 0),
-    }
-    best = max(scores.items(), key=lambda x: x[1])
-    return best[0] if best[1] > 0 else "Banco no identificado"
+    return detectar_banco([txt], margen=float("inf"))["banco"]
@@ -1,25 +1,39 @@
+import importlib
+from .detect import detectar_banco
 
-import re
-from .parser_galicia import parse_galicia
-from .parser_generico import parse_generico
-
-BANK_PATTERNS = {
-    "galicia": re.compile(r"galicia", re.I),
-    "nacion": re.compile(r"naci[oó]n", re.I),
-    "santafe": re.compile(r"santa\s*fe", re.I),
-    "macro": re.compile(r"macro", re.I),
-    "santander": re.compile(r"santander", re.I),
+# Registro de parsers por slug. El módulo se importa recién cuando se detecta ese banco.
+# Cada módulo expone parsear(lines) -> (df, resumen) sobre (página, línea) ya extraídas
+# y render(data, full_text) para Streamlit.
+PARSERS = {
+    "santafe": ".santafe",
+    "nacion": ".nacion",
+    "macro": ".macro",
+    "santander": ".santander",
+    "galicia": ".galicia",
 }
+PARSER_DEFAULT = ".generico"
+
+def registrar_parser(slug: str, modulo: str):
+    PARSERS[slug] = modulo
+
+def cargar(slug: str):
+    return importlib.import_module(PARSERS.get(slug, PARSER_DEFAULT), __package__)
+
+def get_parser(slug: str):
+    return cargar(slug).parsear
+
+def parsear(slug: str, lines):
+    return get_parser(slug)(lines)
+
+def render(slug: str, data: bytes, full_text: str = ""):
+    return cargar(slug).render(data, full_text)
 
 def detect_bank(all_text: str) -> str:
-    t = all_text.lower()
-    for slug, pat in BANK_PATTERNS.items():
-        if pat.search(t):
-            return slug
-    return "desconocido"
+    # mismo motor que detect.detectar_banco (una sola pasada, con puntaje)
+    return detectar_banco([all_text], margen=float("inf"))["slug"] or "desconocido"
 
 def run_parser_for(slug: str, pages_text: list[str]):
-    if slug == "galicia":
-        return parse_galicia(pages_text)
-    # resto
-    return parse_generico(pages_text)
+    # compat: textos por página → (resumen, df)
+    lines = [(pi, l) for pi, t in enumerate(pages_text, start=1) for l in (t or "").splitlines()]
+    df, res = parsear(slug, lines)
+    return res, df
@@ -0,0 +1,93 @@
+import io
+import numpy as np
+import pandas as pd
+from .common import MONEY_COLS
+
+# Exportación Excel fila por fila con xlsxwriter en modo constant_memory: cada fila se
+# vuelca a disco al pasar a la siguiente, el libro no queda entero en memoria.
+# Anchos de columna con largos vectorizados sobre una muestra acotada de filas.
+# Los montos vienen en centavos (int64) y se pasan a pesos recién al escribir.
+
+EXPORT_VERSION = "2"   # entra en la clave de cache de los archivos generados
+DATE_COLS = ("fecha",)
+MAX_ANCHO = 40
+MUESTRA_ANCHOS = 5000
+
+def anchos_columnas(df: pd.DataFrame, muestra: int = MUESTRA_ANCHOS) -> list[int]:
+    # mismo criterio que antes (largo de astype(str) + 2, tope 40) sobre una muestra
+    # repartida en todo el df (incluye primera y última fila)
+    if len(df) > muestra:
+        df = df.iloc[np.unique(np.linspace(0, len(df) - 1, muestra).astype(np.int64))]
+    out = []
+    for col in df.columns:
+        largo = int(df[col].astype(str).str.len().max()) if len(df) else 0
+        out.append(min(max(len(str(col)), largo) + 2, MAX_ANCHO))
+    return out
+
+def _columna(s: pd.Series, escala: int = 1):
+    # valores como objetos Python, None = celda vacía; y el tipo de escritura.
+    # `escala`: divisor de los numéricos (100 para montos en centavos)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        v = s.dt.tz_localize(None) if getattr(s.dt, "tz", None) is not None else s
+        vals = v.astype(object).to_numpy()   # Timestamp es un datetime
+        vals[v.isna().to_numpy()] = None
+        return vals.tolist(), "fecha"
+    if pd.api.types.is_bool_dtype(s):
+        return s.tolist(), "bool"
+    if pd.api.types.is_numeric_dtype(s):
+        arr = s.to_numpy(dtype=float, na_value=np.nan) / escala
+        vals = arr.astype(object)
+        vals[~np.isfinite(arr)] = None
+        return vals.tolist(), "num"
+    vals = s.astype(object).where(s.notna(), None).tolist()
+    return [v if v is None or isinstance(v, str) else str(v) for v in vals], "str"
+
+def escribir_excel(df: pd.DataFrame, destino, sheet_name: str = "Movimientos"):
+    # destino: ruta o archivo binario (BytesIO)
+    import xlsxwriter
+    wb = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    try:
+        ws = wb.add_worksheet(sheet_name)
+        header_fmt = wb.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        money_fmt = wb.add_format({"num_format": "#,##0.00"})
+        date_fmt = wb.add_format({"num_format": "dd/mm/yyyy"})
+
+        cols = list(df.columns)
+        for j, ancho in enumerate(anchos_columnas(df)):
+            c = cols[j]
+            if c in MONEY_COLS: ws.set_column(j, j, 16, money_fmt)
+            elif c in DATE_COLS: ws.set_column(j, j, 14, date_fmt)
+            else: ws.set_column(j, j, ancho)
+        for j, c in enumerate(cols):
+            ws.write_string(0, j, str(c), header_fmt)
+
+        # escritores por columna (sin despacho por tipo en cada celda)
+        columnas = []
+        for j, c in enumerate(cols):
+            vals, tipo = _columna(df[c], 100 if c in MONEY_COLS else 1)
+            if tipo == "fecha": w, fmt = ws.write_datetime, date_fmt
+            elif tipo == "num": w, fmt = ws.write_number, (money_fmt if c in MONEY_COLS else None)
+            elif tipo == "bool": w, fmt = ws.write_boolean, None
+            else: w, fmt = ws.write_string, None
+            columnas.append((j, vals, w, fmt))
+
+        for r in range(len(df)):
+            fila = r + 1
+            for j, vals, w, fmt in columnas:
+                v = vals[r]
+                if v is not None: w(fila, j, v, fmt)
+    finally:
+        wb.close()
+    return destino
+
+def excel_bytes(df: pd.DataFrame, sheet_name: str = "Movimientos") -> bytes:
+    buf = io.BytesIO()
+    escribir_excel(df, buf, sheet_name)
+    return buf.getvalue()
+
+def hay_xlsxwriter() -> bool:
+    try:
+        import xlsxwriter  # noqa: F401
+        return True
+    except ImportError:
+        return False
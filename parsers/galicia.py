@@ -1,45 +1,82 @@
-
 import re
-from .utils import ar_to_float, normalize_whitespace, concilia, build_df
+import numpy as np
+import pandas as pd
+from .utils import ar_to_cents, concilia
+from .perf import etapa
 
-def parse_galicia(pages_text: list[str]):
-    # Galicia: débitos como negativos a la izquierda en el propio extracto
-    # Heurística: líneas con monto con "-" van a débito; resto a crédito si hay "+" o sin signo en columna crédito.
-    rows = []
-    total_debitos = 0.0
-    total_creditos = 0.0
-    saldo_inicial = 0.0
-    saldo_pdf = 0.0
-
-    full = "\n".join(pages_text)
-
-    # saldo inicial / final (heurísticas simples)
-    m0 = re.search(r"Saldo\s+inicial.*?\$?\s*([-\d\.\,]+)", full, re.I)
-    if m0: saldo_inicial = ar_to_float(m0.group(1))
-    m1 = re.search(r"Saldo\s+final.*?\$?\s*([-\d\.\,]+)", full, re.I)
-    if m1: saldo_pdf = ar_to_float(m1.group(1))
-
-    for page in pages_text:
-        for raw in page.splitlines():
-            s = normalize_whitespace(raw)
-            # fecha dd/mm
-            if not re.search(r"\b\d{2}/\d{2}\b", s):
-                continue
-            # montos al final
-            mm = re.findall(r"[-]?\$?\s*\d{1,3}(?:\.\d{3})*(?:,\d{2})", s)
-            if not mm: 
-                continue
-            monto_str = mm[-1]
-            monto = ar_to_float(monto_str)
-            is_debito = "-" in monto_str
-            debito = abs(monto) if is_debito else 0.0
-            credito = 0.0 if is_debito else abs(monto)
-            total_debitos += debito
-            total_creditos += credito
-            rows.append([s[:5], s, debito, credito, credito-debito, monto, None])
+# Galicia: débitos como negativos a la izquierda en el propio extracto; fecha dd/mm
+# (el año sale del período de la cabecera). Motor por columnas sobre el arreglo de
+# líneas: patrones precompilados, extracción con .str y totales con sumas vectorizadas.
+# Montos en centavos (int).
+# movimiento: fecha dd/mm (en cualquier lugar, la primera) y el último monto de la
+# línea; un solo patrón por línea, grupos día, mes, texto previo, enteros, centavos. El `.*` codicioso llega al
+# último monto (el lookbehind evita empezar a mitad de un número) y el signo es un
+# "-" pegado antes del monto ("-58.075,10", "-$ 58.075,10"). Los enteros van con o
+# sin separador de miles ("1.234,56" y "1234,56").
+MOVIMIENTO_RE = re.compile(r"^(?=.*?\b(\d{2})/(\d{2})\b)(.*)(?<![\d.,])(\d+(?:\.\d{3})*),(\d{2})")
+DEBITO_RE = re.compile(r"-\$?\s*$")
+SALDO_INICIAL_RE = re.compile(r"Saldo\s+inicial.*?\$?\s*([-\d\.\,]+)", re.I)
+SALDO_FINAL_RE = re.compile(r"Saldo\s+final.*?\$?\s*([-\d\.\,]+)", re.I)
+PERIODO_RE = re.compile(r"Per[ií]odo\b.*?(\d{2})/(\d{2})/(\d{4})\D+(\d{2})/(\d{2})/(\d{4})", re.I)
+FECHA_ANIO_RE = re.compile(r"\b\d{2}/(\d{2})/(\d{4})\b")
+
+def _primero(textos, pat):
+    # primera coincidencia del documento (cabecera / saldos: corta apenas aparece)
+    return next((m for t in textos if (m := pat.search(t))), None)
+
+def _saldo(textos, pat) -> int:
+    # como en el PDF: primera coincidencia del documento; sin ella, 0
+    m = _primero(textos, pat)
+    return ar_to_cents(m.group(1)) if m else 0
+
+def periodo(textos):
+    # → ((mes, año) desde, (mes, año) hasta) del período de la cabecera; sin período,
+    # la primera fecha con año del documento para ambos; si tampoco hay, None
+    m = _primero(textos, PERIODO_RE)
+    if m:
+        return (int(m.group(2)), int(m.group(3))), (int(m.group(5)), int(m.group(6)))
+    m = _primero(textos, FECHA_ANIO_RE)
+    if m:
+        return (int(m.group(1)), int(m.group(2))), (int(m.group(1)), int(m.group(2)))
+    return None
+
+def fechas(dia: np.ndarray, mes: np.ndarray, per) -> np.ndarray:
+    # dd/mm + período → datetime64. Si el período cruza de año (dic → ene), los meses
+    # anteriores al de inicio son del año siguiente. Días inexistentes → NaT.
+    if per is None:
+        return np.full(len(dia), np.datetime64("NaT"), dtype="datetime64[ns]")
+    (mes0, anio0), (_, anio1) = per
+    anio = np.where((anio1 > anio0) & (mes < mes0), anio1, anio0)
+    m = ((anio - 1970) * 12 + mes - 1).astype("datetime64[M]")
+    f = m.astype("datetime64[D]") + (dia - 1).astype("timedelta64[D]")
+    f[(f.astype("datetime64[M]") != m) | (dia < 1)] = np.datetime64("NaT")
+    return f.astype("datetime64[ns]")
 
+def parse_lineas_galicia(textos) -> tuple[dict, pd.DataFrame]:
+    # `textos`: arreglo de líneas del documento (en orden) → (resumen, df)
+    textos = list(textos)
+    saldo_inicial = _saldo(textos, SALDO_INICIAL_RE)
+    saldo_pdf = _saldo(textos, SALDO_FINAL_RE)
+
+    # una pasada de extracción por columna; sólo quedan las líneas de movimientos
+    g = pd.Series(textos, dtype=object).str.extract(MOVIMIENTO_RE).dropna()
+    lineas = [" ".join(str(textos[i]).split()) for i in g.index]
+    dm = g[[0, 1]].to_numpy(dtype=np.int64)
+    monto = pd.to_numeric(g[3].str.replace(".", "", regex=False) + g[4]).to_numpy(dtype=np.int64)
+    es_debito = g[2].str.contains(DEBITO_RE).to_numpy(dtype=bool)
+    monto = np.where(es_debito, -monto, monto)
+    debito = np.where(es_debito, -monto, 0)
+    credito = np.where(es_debito, 0, monto)
+    total_debitos, total_creditos = int(debito.sum()), int(credito.sum())
+
+    df = pd.DataFrame({
+        "fecha": fechas(dm[:, 0], dm[:, 1], periodo(textos)),
+        "descripcion": pd.Series(lineas, dtype=object),
+        "debito": debito, "credito": credito, "importe": credito - debito,
+        "monto_pdf": monto,
+        "saldo": np.zeros(len(lineas), dtype=np.int64),   # el extracto no trae saldo por línea
+    })
     ok, calculado, diff = concilia(saldo_inicial, total_creditos, total_debitos, saldo_pdf)
-    df = build_df(rows)
     resumen = {
         "saldo_inicial": saldo_inicial,
         "total_creditos": total_creditos,
@@ -51,3 +88,20 @@ def parse_galicia(pages_text: list[str]):
         "parser": "galicia",
     }
     return resumen, df
+
+def parse_galicia(pages_text: list[str]):
+    # texto por página (como extract_text) → (resumen, df)
+    return parse_lineas_galicia(l for page in pages_text for l in page.splitlines())
+
+def parsear(lines):
+    # Entrada del registro (dispatch): (página, línea) ya extraídas → (df, resumen)
+    with etapa("parseo") as e:
+        res, df = parse_lineas_galicia(l for _, l in lines)
+        e["filas"] = len(df)
+    return df, res
+
+def render(data: bytes, full_text: str = ""):
+    import io
+    from . import common as C
+    df, res = parsear(C.iter_lines(io.BytesIO(data)))
+    C.render_summary(df, res, titulo="Cuenta (Galicia) · Nro s/n")
@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
-from .common import (
-    MONEY_RE, DATE_RE, extract_all_lines, normalize_money, normalize_desc,
-    find_saldo_final_from_lines, find_saldo_anterior_from_lines, clasificar
-)
+from .utils import concilia
+from .common import iter_lines, parse_dates_ar, map_unique, normalize_desc, REGLAS as REGLAS_COMUNES
+from .tokens import LineIndex, as_index, find_saldo_final_from_lines, find_saldo_anterior_from_lines
+from .clasificacion import CACHE_CLASIFICACION, clasificar_df
+from .detect import BANK_SLUG
+from .perf import etapa
 
 def santander_cut_before_detalle(all_lines: list[str]) -> list[str]:
     cut = len(all_lines)
@@ -14,93 +16,155 @@ def santander_cut_before_detalle(all_lines: list[str]) -> list[str]:
     return all_lines[:cut]
 
 def parse_lines_generic(lines) -> pd.DataFrame:
-    rows = []; seq = 0
-    for ln in lines:
-        s = (ln or "").strip()
-        if not s: 
+    # `lines`: LineIndex o iterable de líneas. Camino columnar sobre el índice de tokens:
+    # sin regex acá, se juntan spans/posiciones y se convierte en bloque al final.
+    idx = as_index(lines)
+    fechas, descs, k_monto, k_saldo = [], [], [], []
+    for i, s in enumerate(idx.texts):
+        a, b = idx.mptr[i], idx.mptr[i + 1]
+        if b - a < 2:
             continue
-        # Excluir headers comunes
-        if ("FECHA" in s.upper() and ("SALDO" in s.upper() or "DÉBITO" in s.upper() or "DEBITO" in s.upper())):
-            pass  # no return; dejar pasar si tiene montos
-        am = list(MONEY_RE.finditer(s))
-        if len(am) < 2:
-            continue
-        d = DATE_RE.search(s)
-        if not d or d.end() >= am[0].start():
+        d = idx.first_date(i)
+        if d is None or d[1] >= idx.mspan[a][0]:
             continue
 
-        saldo = normalize_money(am[-1].group(0))
-        monto = normalize_money(am[-2].group(0))
-        desc  = s[d.end(): am[0].start()].strip()
-        seq += 1
-        rows.append({
-            "fecha": pd.to_datetime(d.group(0), dayfirst=True, errors="coerce"),
-            "descripcion": desc,
-            "origen": None,
-            "desc_norm": normalize_desc(desc),
-            "debito": 0.0, "credito": 0.0,
-            "importe": 0.0, "monto_pdf": monto, "saldo": saldo, "orden": seq
-        })
-    return pd.DataFrame(rows)
-
-def parse_pdf_generico(bank_name: str, file_like, maybe_lines: list[str] | None = None):
-    if maybe_lines is None:
-        lines = [l for _, l in extract_all_lines(file_like)]
-    else:
-        lines = maybe_lines
+        fechas.append(s[d[0]:d[1]])
+        descs.append(s[d[1]: idx.mspan[a][0]].strip())
+        k_monto.append(b - 2)
+        k_saldo.append(b - 1)
 
-    df = parse_lines_generic(lines).sort_values(["fecha","orden"]).reset_index(drop=True)
+    n = len(fechas)
+    cents = idx.money_cents()
+    k_monto = np.asarray(k_monto, dtype=np.int64); k_saldo = np.asarray(k_saldo, dtype=np.int64)
+    return pd.DataFrame({
+        "fecha": parse_dates_ar(fechas),
+        "descripcion": pd.Series(descs, dtype=object),
+        "origen": pd.Series([None] * n, dtype=object),
+        "desc_norm": pd.Series(map_unique(normalize_desc, descs), dtype=object),
+        "debito": np.zeros(n, dtype=np.int64), "credito": np.zeros(n, dtype=np.int64),
+        "importe": np.zeros(n, dtype=np.int64), "monto_pdf": cents[k_monto],
+        "saldo": cents[k_saldo], "orden": np.arange(1, n + 1),
+    })
 
-    # saldo final e inicial
-    fecha_cierre, saldo_final_pdf = find_saldo_final_from_lines(lines)
-    saldo_anterior = find_saldo_anterior_from_lines(lines)
+APERTURA = "SALDO ANTERIOR"   # descripción de la fila que agrega reconstruir_generico
 
-    # reconstrucción débito/crédito por delta de saldo
+def conciliar_generico(df: pd.DataFrame, saldo_final_pdf: int | None) -> dict:
+    # montos en centavos; saldo_final_pdf None = no figura en el PDF
+    if df.empty:
+        saldo_inicial = total_creditos = total_debitos = 0
+        saldo_pdf = 0 if saldo_final_pdf is None else int(saldo_final_pdf)
+    else:
+        # saldo de la fila SALDO ANTERIOR (por su marca, no por su posición), o saldo
+        # previo al primer movimiento
+        apertura = df.index[df["descripcion"].eq(APERTURA) & df["importe"].eq(0)]
+        if len(apertura):
+            saldo_inicial = int(df.at[apertura[0], "saldo"])
+        else:
+            saldo_inicial = int(df["saldo"].iloc[0] - df["importe"].iloc[0])
+        total_creditos = int(df["credito"].sum())
+        total_debitos = int(df["debito"].sum())
+        saldo_pdf = int(saldo_final_pdf) if saldo_final_pdf is not None else int(df["saldo"].iloc[-1])
+    ok, calculado, diff = concilia(saldo_inicial, total_creditos, total_debitos, saldo_pdf)
+    return {
+        "saldo_inicial": saldo_inicial,
+        "total_creditos": total_creditos,
+        "total_debitos": total_debitos,
+        "saldo_pdf": saldo_pdf,
+        "cuadra": ok,
+        "saldo_calc": calculado,
+        "diferencia": diff,
+        "parser": "generico",
+    }
+
+def reconstruir_generico(df_raw: pd.DataFrame, saldo_anterior: int | None) -> pd.DataFrame:
+    # débito/crédito por delta de saldo (centavos, enteros); no modifica df_raw
+    df = df_raw.copy()
     if not df.empty:
+        saldo = df["saldo"].to_numpy(dtype=np.int64)
+        delta = np.empty(len(df), dtype=np.int64)
+        # la primera fila no tiene saldo previo en la tabla: sin saldo inicial conocido
+        # se toma monto_pdf como delta y que el signo determine
+        delta[0] = df["monto_pdf"].iloc[0]
+        delta[1:] = np.diff(saldo)
+        df["delta_saldo"] = delta
+
+        df["debito"]  = np.where(delta < 0, -delta, 0)
+        df["credito"] = np.where(delta > 0,  delta, 0)
+        df["importe"] = delta
+
         # Insertar SALDO ANTERIOR si existe
-        saldo_inicial = np.nan
-        if not np.isnan(saldo_anterior):
-            saldo_inicial = float(saldo_anterior)
-        elif pd.notna(df.loc[0, "saldo"]) and len(df) > 1:
-            # usar delta del primer movimiento para estimar saldo inicial si no hay etiqueta
-            # saldo_inicial = saldo(primera fila) - delta_saldo(primera fila)
-            pass
-
-        # delta y asignación
-        df["delta_saldo"] = df["saldo"].diff()
-        # Si la primer fila no tiene delta, intentar inferir con monto_pdf (si el banco la provee)
-        if pd.isna(df.loc[0, "delta_saldo"]):
-            m0 = float(df.loc[0, "monto_pdf"])
-            # si el banco no separa débito/crédito, usar regla: saldo nuevo = saldo_inicial + (cr) - (db)
-            # No conocemos saldo_inicial: dejamos delta como m0 y que el signo determine
-            df.loc[0, "delta_saldo"] = m0
-
-        df["debito"]  = np.where(df["delta_saldo"] < 0, -df["delta_saldo"], 0.0)
-        df["credito"] = np.where(df["delta_saldo"] > 0,  df["delta_saldo"], 0.0)
-        df["importe"] = df["credito"] - df["debito"]
-
-        if not np.isnan(saldo_inicial):
+        if saldo_anterior is not None:
+            saldo_inicial = int(saldo_anterior)
             first_date = df["fecha"].dropna().min()
             apertura = pd.DataFrame([{
                 "fecha": (first_date - pd.Timedelta(days=1)) if pd.notna(first_date) else pd.NaT,
-                "descripcion": "SALDO ANTERIOR",
+                "descripcion": APERTURA,
                 "origen": None,
-                "desc_norm": "SALDO ANTERIOR",
-                "debito": 0.0, "credito": 0.0,
-                "importe": 0.0, "monto_pdf": 0.0,
-                "saldo": float(saldo_inicial),
-                "orden": 0, "delta_saldo": np.nan
+                "desc_norm": APERTURA,
+                "debito": 0, "credito": 0,
+                "importe": 0, "monto_pdf": 0,
+                "saldo": saldo_inicial,
+                "orden": 0, "delta_saldo": 0
             }])
-            df = pd.concat([apertura, df], ignore_index=True).sort_values(["fecha","orden"]).reset_index(drop=True)
+            # primera aunque no haya fechas (NaT ordena al final): df_raw ya viene ordenado
+            df = pd.concat([apertura, df], ignore_index=True)
 
-    # Clasificación
-    df["Clasificación"] = df.apply(
-        lambda r: clasificar(str(r.get("descripcion","")), str(r.get("desc_norm","")), r.get("debito",0.0), r.get("credito",0.0)),
-        axis=1
-    )
+    # Quitar columnas internas
+    return df.drop(columns=[c for c in ("orden","monto_pdf","delta_saldo") if c in df.columns])
+
+# Etapas para parsers.pipeline (cada una cacheable por separado); las versiones
+# entran en la clave de cache de su etapa y de las siguientes
+VERSIONES = {"tokenizado": "1", "parseo": "1", "reconstruccion": "2"}
+REGLAS = REGLAS_COMUNES
+
+def tokenizar(lines):
+    with etapa("tokenizado") as e:
+        idx = as_index(lines)
+        e["lineas"] = idx.n_lines
+    return idx
 
+def parsear_movimientos(idx):
+    with etapa("parseo") as e:
+        df = parse_lines_generic(idx).sort_values(["fecha","orden"]).reset_index(drop=True)
+        e["filas"] = len(df)
+    return df
+
+def _reconstruir(df_raw, idx):
+    # saldo final e inicial, reconstrucción y conciliación → (df, resumen, fecha de cierre)
+    with etapa("saldos"):
+        fecha_cierre, saldo_final_pdf = find_saldo_final_from_lines(idx)
+        saldo_anterior = find_saldo_anterior_from_lines(idx)
+    with etapa("reconstruccion") as e:
+        df = reconstruir_generico(df_raw, saldo_anterior)
+        e["filas"] = len(df)
     fecha_cierre_str = fecha_cierre.strftime('%d/%m/%Y') if pd.notna(fecha_cierre) else None
-    # Quitar columnas internas
-    for c in ("orden","monto_pdf","delta_saldo"):
-        if c in df.columns: df = df.drop(columns=[c])
+    return df, conciliar_generico(df, saldo_final_pdf), fecha_cierre_str
+
+def reconstruir(df_raw, idx):
+    df, res, _ = _reconstruir(df_raw, idx)
+    return df, res
+
+def parse_pdf_generico(bank_name: str, file_like, maybe_lines: list[str] | None = None, resumen: bool = False):
+    # Un solo índice de tokens por documento (en streaming si viene el PDF): lo usan
+    # el parser y los dos buscadores de saldo
+    if maybe_lines is None:
+        with etapa("extraccion") as e:
+            idx = LineIndex.from_lines(iter_lines(file_like))
+            e.update(paginas=max(idx.pages, default=0), lineas=idx.n_lines)
+    else:
+        idx = tokenizar(maybe_lines)
+
+    df, res, fecha_cierre_str = _reconstruir(parsear_movimientos(idx), idx)
+
+    # Clasificación
+    with etapa("clasificacion", filas=len(df)):
+        df["Clasificación"] = clasificar_df(df, REGLAS, BANK_SLUG.get(bank_name, bank_name), CACHE_CLASIFICACION)
+
+    if resumen:
+        return df, fecha_cierre_str, res
     return df, fecha_cierre_str
+
+def parsear(lines, bank_name: str = "Banco no identificado"):
+    # Entrada del registro (dispatch): (página, línea) ya extraídas → (df, resumen)
+    df, _, res = parse_pdf_generico(bank_name, None, lines, resumen=True)
+    return df, res
@@ -1,6 +1,17 @@
+import io
 from . import common as C
+from .generico import parsear as parsear_generico
+from .generico import tokenizar, parsear_movimientos, reconstruir, REGLAS, VERSIONES
 
-def render(data: bytes, full_text: str):
-    lines = C.extract_all_lines(data)
-    df = C.parse_generic_table(lines)
-    C.render_summary(df, titulo="CUENTA (BNA) · Nro s/n")
+# interfaz del módulo: parsear/render (dispatch) y las etapas que usa parsers.pipeline,
+# reexportadas de generico
+__all__ = ["BANCO", "parsear", "render", "tokenizar", "parsear_movimientos", "reconstruir", "REGLAS", "VERSIONES"]
+
+BANCO = "Banco de la Nación Argentina"
+
+def parsear(lines):
+    return parsear_generico(lines, BANCO)
+
+def render(data: bytes, full_text: str = ""):
+    df, res = parsear(C.iter_lines(io.BytesIO(data)))
+    C.render_summary(df, res, titulo="CUENTA (BNA) · Nro s/n")
@@ -0,0 +1,136 @@
+# Instrumentación liviana por etapa: tiempo de pared, CPU, memoria y conteos
+# (páginas/líneas/filas). Los parsers marcan etapas con `etapa(...)`; sólo se registra
+# si hay un Registro activo en el contexto (app, batch), si no es un no-op.
+import json, os, sys, threading, time, tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+
+PERF_LOG = os.environ.get("IABANCOS_PERF_LOG", "")           # JSON por línea; vacío = sin log
+PERF_MEM = os.environ.get("IABANCOS_PERF_MEM", "0") == "1"   # pico con tracemalloc (más lento)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_ACTUAL = ContextVar("iabancos_perf", default=None)
+_LOG_LOCK = threading.Lock()
+# tracemalloc es global al proceso: una sola etapa lo usa a la vez (_MEM_LOCK) y sólo
+# si no hay otro registro abierto (otro hilo: tareas, sesiones de Streamlit), porque
+# sus asignaciones entrarían en el pico. Registros abiertos y cuántos se abrieron:
+_REG_LOCK = threading.Lock()
+_MEM_LOCK = threading.Lock()
+_abiertos = _iniciados = 0
+
+def _tomar_memoria():
+    # → marca de _iniciados si esta etapa mide memoria, None si no (anidada, otro hilo
+    # midiendo u otro registro abierto)
+    if tracemalloc.is_tracing() or not _MEM_LOCK.acquire(blocking=False): return None
+    with _REG_LOCK:
+        if _abiertos <= 1: return _iniciados
+    _MEM_LOCK.release()
+    return None
+
+def _soltar_memoria(marca) -> float | None:
+    # pico en MB, o None si mientras tanto se abrió otro registro
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    with _REG_LOCK:
+        solo = _abiertos <= 1 and _iniciados == marca
+    _MEM_LOCK.release()
+    return round(pico / 1e6, 3) if solo else None
+
+def rss_max_mb():
+    # pico de RSS de toda la vida del proceso (KB en Linux, bytes en macOS): no baja
+    # nunca, así que por etapa sólo tiene sentido lo que creció durante la etapa
+    if resource is None: return None
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / 1e6 if sys.platform == "darwin" else r / 1024
+
+class Registro:
+    def __init__(self, nombre: str = "", memoria: bool = PERF_MEM, **meta):
+        self.nombre = nombre
+        self.memoria = memoria
+        self.meta = dict(meta)
+        self.etapas = []
+        self.fecha = datetime.now().isoformat(timespec="seconds")
+        self._t0 = time.perf_counter()
+        self._token = None
+
+    @contextmanager
+    def etapa(self, nombre: str, **conteos):
+        # el bloque puede completar conteos: `with etapa("parseo") as e: ...; e["filas"] = len(df)`
+        info = {"etapa": nombre, **conteos}
+        # etapas anidadas: mide la externa
+        marca = _tomar_memoria() if self.memoria else None
+        if marca is not None: tracemalloc.start()
+        w0, c0, rss0 = time.perf_counter(), time.thread_time(), rss_max_mb()
+        try:
+            yield info
+        finally:
+            info["wall_s"] = round(time.perf_counter() - w0, 6)
+            info["cpu_s"] = round(time.thread_time() - c0, 6)
+            if marca is not None:
+                pico = _soltar_memoria(marca)
+                if pico is not None: info["mem_pico_mb"] = pico
+            # cuánto subió el pico de RSS del proceso en esta etapa (0: no superó el pico previo)
+            if rss0 is not None: info["rss_crec_mb"] = round(rss_max_mb() - rss0, 1)
+            self.etapas.append(info)
+
+    def total_s(self) -> float:
+        return round(time.perf_counter() - self._t0, 6)
+
+    def to_dict(self) -> dict:
+        return {"fecha": self.fecha, "nombre": self.nombre, **self.meta,
+                "total_s": self.total_s(), "etapas": self.etapas}
+
+    def como_df(self):
+        import pandas as pd
+        cols = ["etapa", "wall_s", "cpu_s", "mem_pico_mb", "rss_crec_mb", "paginas", "lineas", "filas"]
+        df = pd.DataFrame(self.etapas)
+        return df.reindex(columns=[c for c in cols if c in df.columns] + [c for c in df.columns if c not in cols])
+
+    def guardar(self, path: str = PERF_LOG):
+        if not path: return
+        linea = json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+        with _LOG_LOCK, open(path, "a", encoding="utf-8") as f:
+            f.write(linea + "\n")
+
+    def cerrar(self, log: str = PERF_LOG):
+        # desactiva el registro en este contexto y lo agrega al log JSON (si hay)
+        global _abiertos
+        rss = rss_max_mb()
+        if rss is not None: self.meta["rss_pico_proceso_mb"] = round(rss, 1)
+        if self._token is not None:
+            _ACTUAL.reset(self._token); self._token = None
+            with _REG_LOCK: _abiertos -= 1
+        self.guardar(log)
+        return self
+
+def iniciar(nombre: str = "", **kw) -> Registro:
+    # activa un Registro para el contexto actual (el hilo de la sesión en Streamlit)
+    global _abiertos, _iniciados
+    reg = Registro(nombre, **kw)
+    reg._token = _ACTUAL.set(reg)
+    with _REG_LOCK:
+        _abiertos += 1; _iniciados += 1
+    return reg
+
+@contextmanager
+def registrar(nombre: str = "", log: str = PERF_LOG, **kw):
+    reg = iniciar(nombre, **kw)
+    try:
+        yield reg
+    except Exception as e:
+        reg.meta["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        reg.cerrar(log)
+
+def actual() -> Registro | None:
+    return _ACTUAL.get()
+
+def etapa(nombre: str, **conteos):
+    reg = _ACTUAL.get()
+    return reg.etapa(nombre, **conteos) if reg is not None else nullcontext({"etapa": nombre, **conteos})
@@ -0,0 +1,155 @@
+# Pipeline por etapas con cache por etapa:
+#   extraccion → tokenizado → parseo → reconstruccion → clasificacion → agregados → export
+# La clave de cada etapa es hash(clave de la etapa anterior, etapa, versión de la etapa),
+# empezando por el SHA-256 del PDF. Cambiar la versión de una etapa cambia su clave y la
+# de las siguientes: sólo esas se recalculan y las anteriores salen del cache. La versión
+# de la clasificación se deriva de las reglas (clasificacion.version_reglas), así que
+# tocar un regex de common.REGLAS rehace clasificación/agregados/export pero no la
+# extracción (lo caro). Las etapas se evalúan a demanda: si la clasificación está en
+# cache no se lee ni el PDF.
+import hashlib, io
+
+from .cache import CACHE, PARSER_VERSION
+from .perf import etapa
+
+ETAPAS = ("extraccion", "tokenizado", "parseo", "reconstruccion", "clasificacion", "agregados", "export")
+
+def _clave(previa: str, nombre: str, version: str) -> str:
+    return hashlib.sha256(f"{previa}|{nombre}|{version}".encode()).hexdigest()
+
+def versiones(slug: str | None) -> dict:
+    # versión de cada etapa para el parser del banco. Los módulos por etapas exponen
+    # tokenizar/parsear_movimientos/reconstruir, VERSIONES y REGLAS; los demás (Galicia)
+    # corren parsear(lines) como una sola etapa "parseo".
+    from . import dispatch, plantillas
+    from .agregados import AGREGADOS_VERSION
+    from .clasificacion import version_reglas
+    from .common import EXTRACCION_VERSION
+    from .export import EXPORT_VERSION
+    mod = dispatch.cargar(slug)
+    # la extracción depende de la plantilla de región del banco (o página completa)
+    v = {"extraccion": f"{EXTRACCION_VERSION}-{plantillas.version(plantillas.cargar(slug))}"}
+    if hasattr(mod, "tokenizar"):
+        for e in ("tokenizado", "parseo", "reconstruccion"):
+            v[e] = f"{slug}-{mod.VERSIONES[e]}"
+    else:
+        v["parseo"] = f"{slug}-{PARSER_VERSION}"
+    if hasattr(mod, "REGLAS"):
+        v["clasificacion"] = version_reglas(mod.REGLAS)
+    v["agregados"] = AGREGADOS_VERSION
+    v["export"] = EXPORT_VERSION
+    return v
+
+def claves(data_hash: str, slug: str | None) -> dict:
+    previa, out = data_hash, {}
+    for nombre, version in versiones(slug).items():
+        previa = out[nombre] = _clave(previa, nombre, version)
+    return out
+
+def procesar(data: bytes, slug: str | None = None, hasta: str = "agregados",
+             cache=CACHE, workers: int | None = None, progreso=None) -> dict:
+    # PDF → {banco, slug, confianza, paginas, df, res, agregados, rollup, xlsx, estados}.
+    # `hasta`: última etapa a correr ("clasificacion", "agregados" o "export").
+    # `estados`: por etapa, "cache" o "calculada" (las no necesarias no figuran).
+    # `progreso(etapa, pagina=0, paginas=0)`: al empezar cada etapa que se calcula y,
+    # en la extracción, por página leída (para mostrar avance; se llama desde este hilo).
+    from . import dispatch, plantillas
+    from .common import EXTRACCION_VERSION, extract_all_lines
+    from .detect import detectar_banco, detectar_banco_pdf, paginas_de_lineas, version as version_deteccion
+
+    estados, hechos = {}, {}
+
+    def correr(nombre, clave, calcular):
+        if nombre in hechos: return hechos[nombre]
+        miss = object()
+        v = cache.get(clave, nombre, miss)
+        if v is miss:
+            if progreso: progreso(nombre)
+            v = calcular()
+            cache.put(clave, nombre, v)
+            estados[nombre] = "calculada"
+        else:
+            estados[nombre] = "cache"
+        hechos[nombre] = v
+        return v
+
+    data_hash = hashlib.sha256(data).hexdigest()
+
+    def extraer(plantilla):
+        with etapa("extraccion") as e:
+            lines = extract_all_lines(io.BytesIO(data), workers=workers, plantilla=plantilla,
+                                      progreso=progreso and (lambda p, n: progreso("extraccion", p, n)))
+            e.update(paginas=max((pi for pi, _ in lines), default=0), lineas=len(lines))
+        return lines
+
+    def detectar():
+        # Con plantillas la extracción depende del banco: se detecta leyendo páginas
+        # completas sólo hasta decidir. Sin plantillas, la extracción completa (que
+        # igual hace falta) sirve para detectar.
+        if plantillas.hay():
+            with etapa("deteccion") as e:
+                det = detectar_banco_pdf(io.BytesIO(data))
+                e["paginas"] = det["paginas_leidas"]
+            return det
+        ls = correr("extraccion", _clave(data_hash, "extraccion", f"{EXTRACCION_VERSION}-{plantillas.version(None)}"),
+                    lambda: extraer(None))
+        with etapa("deteccion") as e:
+            det = detectar_banco(paginas_de_lineas(ls))
+            e["paginas"] = det["paginas_leidas"]
+        return {**det, "paginas": max((pi for pi, _ in ls), default=0)}
+
+    # la detección no depende de ninguna versión de parser: se rehace si cambia la
+    # extracción o la tabla de hints/pesos/margen (detect.version)
+    det = correr("deteccion", _clave(data_hash, "deteccion", f"{EXTRACCION_VERSION}-{version_deteccion()}"), detectar)
+    slug = slug or det["slug"]
+    mod = dispatch.cargar(slug)
+    k = claves(data_hash, slug)
+    plantilla = plantillas.cargar(slug)
+
+    def lineas():
+        return correr("extraccion", k["extraccion"], lambda: extraer(plantilla))
+
+    def tokenizado():
+        return correr("tokenizado", k["tokenizado"], lambda: mod.tokenizar(lineas()))
+
+    def parseo():
+        if "tokenizado" in k:
+            return correr("parseo", k["parseo"], lambda: mod.parsear_movimientos(tokenizado()))
+        return correr("parseo", k["parseo"], lambda: mod.parsear(lineas()))   # (df, res)
+
+    def reconstruccion():
+        if "reconstruccion" not in k: return parseo()
+        return correr("reconstruccion", k["reconstruccion"], lambda: mod.reconstruir(parseo(), tokenizado()))
+
+    def clasificar():
+        from .clasificacion import CACHE_CLASIFICACION, clasificar_df
+        df, res = reconstruccion()
+        with etapa("clasificacion", filas=len(df)):
+            df = df.copy()   # lo cacheado es compartido: no mutar
+            df["Clasificación"] = clasificar_df(df, mod.REGLAS, slug, CACHE_CLASIFICACION)
+        return df, res
+
+    def clasificacion():
+        if "clasificacion" not in k: return reconstruccion()
+        return correr("clasificacion", k["clasificacion"], clasificar)
+
+    def agregados():
+        # resumen operativo + rollup mensual (para informes de varios meses/resúmenes)
+        from .agregados import resumen_operativo, rollup
+        def calcular():
+            df = clasificacion()[0]
+            with etapa("agregados", filas=len(df)):
+                return resumen_operativo(df), rollup(df)
+        return correr("agregados", k["agregados"], calcular)
+
+    def export():
+        from .export import excel_bytes
+        return correr("export", k["export"], lambda: excel_bytes(clasificacion()[0]))
+
+    hasta_i = ETAPAS.index(hasta)
+    df, res = clasificacion()
+    out = {"banco": det["banco"], "slug": slug, "confianza": det["confianza"], "paginas": det["paginas"],
+           "df": df, "res": res, "estados": estados}
+    if hasta_i >= ETAPAS.index("agregados"): out["agregados"], out["rollup"] = agregados()
+    if hasta_i >= ETAPAS.index("export"): out["xlsx"] = export()
+    return out
@@ -0,0 +1,253 @@
+# Plantillas de región por banco: rectángulo de la tabla de movimientos y rangos x de
+# sus columnas (fechas, montos), por banco y versión de layout. Con plantilla, la
+# extracción arma líneas sólo con los chars de `page.crop(bbox)` (sin membretes ni pies
+# legales) y corta el documento en la marca de fin (Santander: DETALLE IMPOSITIVO, sin
+# extraer las páginas siguientes). Un banco puede tener varias versiones: cada página
+# usa la primera (la más nueva) cuyo tamaño y ancla coinciden; si ninguna, página completa.
+# Ancla: el encabezado de la tabla (en cada página si la muestra lo repetía en todas, si
+# no sólo en la primera); en las páginas sin encabezado, alguna fecha y algún monto en
+# las columnas aprendidas. Además nunca se recorta una página con montos fuera del
+# rectángulo: sería otro layout y se perderían movimientos.
+#   python -m parsers.plantillas aprender santander muestra.pdf [--version 2024-01]
+#   python -m parsers.plantillas probar santander otro.pdf
+# Las plantillas son JSON en IABANCOS_PLANTILLAS_DIR (default: plantillas/ del repo), una
+# por versión en <banco>/<versión>.json; se pueden aprender de un resumen de muestra o
+# escribir a mano.
+import argparse, hashlib, io, json, os, re, sys
+from pathlib import Path
+
+PLANTILLAS_DIR = Path(os.environ.get("IABANCOS_PLANTILLAS_DIR", Path(__file__).resolve().parent.parent / "plantillas"))
+
+ENCABEZADO_RE = r"^FECHA\s+(?:DESCRIPC|CONCEPTO|DETALLE|MOVIMIENTO)"
+FIN_RE = {"santander": r"DETALLE\s+IMPOSITIVO"}
+# líneas sin fecha que igual tienen que quedar dentro del recorte (saldos, período)
+CONSERVAR_RE = re.compile(r"SALDO|PER[IÍ]ODO", re.I)
+FECHA_RE = re.compile(r"\d{1,2}/\d{2}(?:/\d{2,4})?")   # también dd/mm (Galicia)
+TOL_PAGINA = 2.0      # pt de diferencia aceptados en el tamaño de página
+MARGEN = 2.0          # pt alrededor de lo aprendido
+PAGINAS_APRENDER = 20
+
+def ruta(slug: str, version: str = "1") -> Path:
+    # la versión es parte del nombre del archivo: sin separadores de ruta
+    nombre = re.sub(r"[^\w.-]", "_", str(version))
+    return PLANTILLAS_DIR / slug / f"{nombre}.json"
+
+def _leer(p: Path) -> dict | None:
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def cargar(slug: str | None) -> list[dict] | None:
+    # todas las versiones del banco, la más nueva primero (o None si no hay ninguna);
+    # también lee el <banco>.json de una sola versión de antes
+    if not slug: return None
+    pls = [pl for p in [*(PLANTILLAS_DIR / slug).glob("*.json"), PLANTILLAS_DIR / f"{slug}.json"]
+           if p.is_file() and (pl := _leer(p)) is not None]
+    return sorted(pls, key=lambda pl: str(pl.get("version", "1")), reverse=True) or None
+
+def hay() -> bool:
+    return any(PLANTILLAS_DIR.glob("*.json")) or any(PLANTILLAS_DIR.glob("*/*.json"))
+
+def guardar(plantilla: dict) -> Path:
+    p = ruta(plantilla["banco"], plantilla.get("version", "1"))
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(plantilla, ensure_ascii=False, indent=2), encoding="utf-8")
+    return p
+
+def _lista(plantilla) -> list[dict]:
+    # una plantilla, la lista de versiones de `cargar` o None
+    if plantilla is None: return []
+    return [plantilla] if isinstance(plantilla, dict) else list(plantilla)
+
+def version(plantilla) -> str:
+    # para las claves de cache de la extracción: cambia si cambia cualquier campo de
+    # cualquier versión
+    pls = _lista(plantilla)
+    if not pls: return "completa"
+    h = hashlib.sha256(json.dumps(pls, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{'+'.join(str(pl.get('version', '1')) for pl in pls)}-{h}"
+
+def _coincide(page, plantilla) -> bool:
+    return (abs(page.width - plantilla["ancho"]) <= TOL_PAGINA
+            and abs(page.height - plantilla["alto"]) <= TOL_PAGINA)
+
+def _caja(page, bbox):
+    x0, top, x1, bottom = bbox
+    return (max(0, x0), max(0, top), min(page.width, x1), min(page.height, bottom))
+
+def _en_columnas(page, caja, columnas, pat) -> bool:
+    # algún token `pat` dentro de las columnas (con el alto de la tabla)
+    from .common import lines_from_chars
+    for c in columnas:
+        r = _caja(page, (c["x0"] - MARGEN, caja[1], c["x1"] + MARGEN, caja[3]))
+        if any(pat.search(l) for l in lines_from_chars(page.crop(r))): return True
+    return False
+
+def _anclada(page, caja, lines, plantilla) -> bool:
+    from .common import MONEY_RE, lines_from_chars
+    enc = plantilla.get("encabezado")
+    if enc and (plantilla.get("encabezado_por_pagina") or page.page_number == 1):
+        pat = re.compile(enc, re.I)
+        ok = any(pat.search(l) for l in lines)
+    else:
+        cols = plantilla.get("columnas") or []
+        fechas = [c for c in cols if c["tipo"] == "fecha"]
+        montos = [c for c in cols if c["tipo"] == "monto"]
+        if fechas and montos:
+            ok = _en_columnas(page, caja, fechas, FECHA_RE) and _en_columnas(page, caja, montos, MONEY_RE)
+        else:   # plantilla sin columnas (escrita a mano): algún movimiento en el recorte
+            ok = any(FECHA_RE.search(l) and MONEY_RE.search(l) for l in lines)
+    # montos fuera del rectángulo: otro layout, recortar perdería movimientos
+    return ok and not any(MONEY_RE.search(l) for l in lines_from_chars(page.outside_bbox(caja)))
+
+def lineas_pagina(page, plantilla, engine: str = "chars"):
+    # `plantilla`: una, la lista de versiones de `cargar` o None.
+    # → (líneas, plantilla usada o None = página completa, fin): `fin` = apareció la
+    # marca de fin (no seguir leyendo)
+    from .common import page_lines
+    pls = _lista(plantilla)
+    lines = usada = None
+    for pl in pls:
+        if not _coincide(page, pl): continue
+        caja = _caja(page, pl["bbox"])
+        recorte = page_lines(page.crop(caja), engine)
+        if _anclada(page, caja, recorte, pl):
+            lines, usada = recorte, pl
+            break
+    if lines is None:
+        lines = page_lines(page, engine)
+    fin = (usada or (pls[0] if pls else {})).get("fin")
+    if fin:
+        pat = re.compile(fin, re.I)
+        for i, l in enumerate(lines):
+            if pat.search(l):
+                return lines[:i], usada, True
+    return lines, usada, False
+
+def _bandas(words, ytol: float = 3.0):
+    # palabras → renglones (misma tolerancia vertical que lines_from_chars)
+    words = sorted(words, key=lambda w: (w["top"], w["x0"]))
+    bandas, cur, top0 = [], [], None
+    for w in words:
+        if top0 is not None and w["top"] - top0 > ytol:
+            bandas.append(cur); cur = []; top0 = None
+        if top0 is None: top0 = w["top"]
+        cur.append(w)
+    if cur: bandas.append(cur)
+    return [sorted(b, key=lambda w: w["x0"]) for b in bandas]
+
+def _columnas(xs, tipo: str, gap: float = 8.0, minimo: int = 3):
+    # agrupa rangos (x0, x1) por cercanía del borde de alineación: fechas a la
+    # izquierda, montos a la derecha
+    borde = 1 if tipo == "monto" else 0
+    out, cur = [], []
+    for r in sorted(xs, key=lambda r: r[borde]):
+        if cur and r[borde] - cur[-1][borde] > gap:
+            out.append(cur); cur = []
+        cur.append(r)
+    if cur: out.append(cur)
+    return [{"tipo": tipo, "x0": round(min(a for a, _ in g), 1), "x1": round(max(b for _, b in g), 1)}
+            for g in out if len(g) >= minimo]
+
+def aprender(data: bytes, slug: str, version: str = "1", encabezado: str | None = ENCABEZADO_RE,
+             fin: str | None = None, paginas: int = PAGINAS_APRENDER) -> dict:
+    # Recorre un resumen de muestra (página completa) y se queda con el rectángulo que
+    # cubre encabezado de tabla, movimientos (fecha + monto) y líneas de saldo/período,
+    # y con los rangos x de las columnas de fechas y montos de los movimientos.
+    from .common import MONEY_RE, open_pdf
+    fin = fin if fin is not None else FIN_RE.get(slug)
+    enc_re = re.compile(encabezado, re.I) if encabezado else None
+    fin_re = re.compile(fin, re.I) if fin else None
+    caja, fechas, montos = None, [], []
+    con_encabezado = leidas = 0
+    ancho = alto = None
+    with open_pdf(io.BytesIO(data)) as pdf:
+        for p in pdf.pages[:paginas]:
+            if ancho is None: ancho, alto = float(p.width), float(p.height)
+            leidas += 1
+            hay_enc = terminado = False
+            for banda in _bandas(p.extract_words()):
+                texto = " ".join(w["text"] for w in banda)
+                if fin_re and fin_re.search(texto):
+                    terminado = True; break
+                es_enc = bool(enc_re and enc_re.search(texto))
+                hay_enc |= es_enc
+                m = [(w["x0"], w["x1"]) for w in banda if MONEY_RE.fullmatch(w["text"])]
+                d = [(w["x0"], w["x1"]) for w in banda if FECHA_RE.fullmatch(w["text"])]
+                if m and d:
+                    montos += m; fechas += d
+                elif not (es_enc or CONSERVAR_RE.search(texto)):
+                    continue
+                b = (min(w["x0"] for w in banda), min(w["top"] for w in banda),
+                     max(w["x1"] for w in banda), max(w["bottom"] for w in banda))
+                caja = b if caja is None else (min(caja[0], b[0]), min(caja[1], b[1]), max(caja[2], b[2]), max(caja[3], b[3]))
+            con_encabezado += hay_enc
+            p.close()
+            if terminado: break
+    if caja is None:
+        raise ValueError("no se encontraron movimientos en la muestra")
+    x0, top, x1, bottom = caja
+    return {
+        "banco": slug, "version": version,
+        "ancho": ancho, "alto": alto,
+        "bbox": [round(max(0.0, x0 - MARGEN), 1), round(max(0.0, top - MARGEN), 1),
+                 round(min(ancho, x1 + MARGEN), 1), round(min(alto, bottom + MARGEN), 1)],
+        "columnas": _columnas(fechas, "fecha") + _columnas(montos, "monto"),
+        "encabezado": encabezado if con_encabezado else None,
+        "encabezado_por_pagina": bool(enc_re) and con_encabezado == leidas,
+        "fin": fin,
+    }
+
+def probar(data: bytes, plantilla, engine: str = "chars") -> dict:
+    # compara recorte vs página completa: páginas recortadas (por versión), líneas y
+    # chars ahorrados
+    from .common import open_pdf, page_lines
+    out = {"paginas": 0, "recortadas": 0, "versiones": {}, "lineas": 0, "lineas_completas": 0, "chars": 0, "chars_completos": 0}
+    with open_pdf(io.BytesIO(data)) as pdf:
+        for p in pdf.pages:
+            lines, usada, fin = lineas_pagina(p, plantilla, engine)
+            out["paginas"] += 1
+            out["lineas"] += len(lines); out["lineas_completas"] += len(page_lines(p, engine))
+            out["chars_completos"] += len(p.chars)
+            if usada is None:
+                out["chars"] += len(p.chars)
+            else:
+                v = str(usada.get("version", "1"))
+                out["recortadas"] += 1; out["versiones"][v] = out["versiones"].get(v, 0) + 1
+                out["chars"] += len(p.crop(_caja(p, usada["bbox"])).chars)
+            p.close()
+            if fin: break
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m parsers.plantillas", description="Plantillas de región de movimientos por banco.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("aprender", help="aprende la plantilla de un banco desde un PDF de muestra")
+    a.add_argument("banco", help="slug del banco (santafe, nacion, macro, santander, galicia)")
+    a.add_argument("pdf")
+    a.add_argument("--version", default="1", help="versión del layout")
+    a.add_argument("--encabezado", default=ENCABEZADO_RE, help="regex del encabezado de la tabla ('' = sin encabezado)")
+    a.add_argument("--fin", default=None, help="regex de fin de la tabla (default según banco)")
+    t = sub.add_parser("probar", help="compara la extracción recortada contra la página completa")
+    t.add_argument("banco"); t.add_argument("pdf")
+    args = ap.parse_args(argv)
+
+    data = Path(args.pdf).read_bytes()
+    if args.cmd == "aprender":
+        pl = aprender(data, args.banco, args.version, args.encabezado or None, args.fin)
+        print(f"Plantilla guardada en {guardar(pl)}")
+        print(json.dumps(pl, ensure_ascii=False, indent=2))
+        return 0
+    pl = cargar(args.banco)
+    if pl is None:
+        print(f"No hay plantilla para {args.banco} en {PLANTILLAS_DIR}", file=sys.stderr)
+        return 1
+    r = probar(data, pl)
+    versiones = ", ".join(f"{v}: {n}" for v, n in r["versiones"].items())
+    print(f"Páginas: {r['paginas']} ({r['recortadas']} recortadas{' · ' + versiones if versiones else ''}) · líneas {r['lineas']} de {r['lineas_completas']} · "
+          f"chars {r['chars']} de {r['chars_completos']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
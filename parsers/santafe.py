@@ -1,7 +1,224 @@
+import io, re
+import numpy as np
+import pandas as pd
 from . import common as C
+from . import tokens as T
+from .common import LONG_INT_RE
+from .clasificacion import CACHE_CLASIFICACION, clasificar_df
+from .perf import etapa
 
-def render(data: bytes, full_text: str):
-    lines = C.extract_all_lines(data)
-    df = C.parse_generic_table(lines)
-    # Fallback Santa Fe: si el encabezado trae "SALDO ANTERIOR" en la tabla, el genérico igual concilia con la reconstrucción
-    C.render_summary(df, titulo="CUENTA (Santa Fe) · Nro s/n")
+# Santa Fe: fechas siempre dd/mm/aaaa
+DATE_RE = re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}\b")
+
+def normalize_desc(desc):
+    return " ".join(LONG_INT_RE.sub("", (desc or "").upper()).split())
+
+# Buscadores de saldo Santa Fe: aceptan un LineIndex o las (página, línea).
+# Devuelven centavos (int) o None.
+def find_saldo_anterior(lines):
+    idx=T.as_index(lines,DATE_RE)
+    for i in idx.flagged(T.F_SALDO_ANTERIOR|T.F_SALDO_ULT_RESUMEN):
+        if idx.money_count(i): return idx.cents(i,-1)
+    return None
+
+def find_saldo_final_pdf(lines):
+    idx=T.as_index(lines,DATE_RE)
+    for i in reversed(idx.flagged(T.F_SALDO_AL|T.F_SALDO_FINAL)):
+        if idx.money_count(i): return idx.cents(i,-1)
+    return None
+
+# Créditos claros + depósito de cheque propio; todo lo demás → débito
+SF_CREDITO_KEYS = ("DTNPROVE", "DEP EFEC", "DEPOSITO EFECTIVO", "TRANLINK", "DEP CH PROPIO", "D CH PRO")
+SF_CREDITO_RE = re.compile("|".join(re.escape(k) for k in SF_CREDITO_KEYS))
+
+def detectar_signo_santafe(desc_norm: str) -> str:
+    u = (desc_norm or "").upper()
+    return "credito" if any(k in u for k in SF_CREDITO_KEYS) else "debito"
+
+def es_credito_santafe(desc_norm: pd.Series) -> np.ndarray:
+    # versión por columna de detectar_signo_santafe
+    return desc_norm.fillna("").astype(str).str.upper().str.contains(SF_CREDITO_RE).to_numpy(dtype=bool)
+
+# Reglas Santa Fe (sólo miran la descripción original); ver common.REGLAS
+REGLAS_SANTAFE = (
+    ("IVA 21% (sobre comisiones)", lambda u, n: "IVA GRAL" in u, None),
+    ("IVA 10,5% (sobre comisiones)", lambda u, n: "IVA RINS" in u, None),
+    ("LEY 25.413", lambda u, n: "IMPTRANS" in u or "LEY 25413" in u, None),
+    ("SIRCREB", lambda u, n: "SIRCREB" in u, None),
+    ("Gastos por comisiones", lambda u, n: "COM" in u, None),
+    ("Débito automático", lambda u, n: "DEBITO INMEDIATO" in u, None),
+    ("Crédito", None, "cre"),
+    ("Débito", None, "deb"),
+)
+
+def clasificar(desc,desc_norm,deb,cre):
+    return C.aplicar_reglas(REGLAS_SANTAFE, (desc or "").upper(), (desc_norm or "").upper(), deb, cre)
+
+def parse_movimientos_santafe(lines):
+    # `lines`: LineIndex o iterable de (página, línea). Columnar sobre el índice de
+    # tokens: posiciones de fecha/montos ya calculadas, conversión en bloque al final.
+    idx=T.as_index(lines,DATE_RE)
+    skip=T.F_SF_HEADER|T.F_SALDO_ANTERIOR|T.F_SALDO_ULT_RESUMEN
+    filas=[]; fechas=[]; descs=[]; k_imp=[]; k_saldo=[]
+    for i,ln in enumerate(idx.texts):
+        if idx.flags[i] & skip: continue
+        d=idx.first_date(i)
+        if d is None: continue
+        a,b=idx.mptr[i],idx.mptr[i+1]
+        if b==a: continue
+        k_imp.append(b-2 if b-a>=2 else b-1); k_saldo.append(b-1 if b-a>=2 else -1)
+        fechas.append(ln[d[0]:d[1]]); descs.append(ln[d[1]:idx.mspan[a][0]].strip())
+        filas.append(i)
+    n=len(filas)
+    cents=idx.money_cents()
+    k_saldo=np.asarray(k_saldo,dtype=np.int64)
+    filas=np.asarray(filas,dtype=np.int64)
+    mptr=np.asarray(idx.mptr,dtype=np.int64)
+    # montos en centavos; saldo_pdf nullable (-1 → sin saldo por línea)
+    saldo_pdf=pd.array(cents[k_saldo],dtype="Int64")
+    saldo_pdf[k_saldo<0]=pd.NA
+    return pd.DataFrame({"fecha":C.parse_dates_ar(fechas),
+                         "descripcion":pd.Series(descs,dtype=object),
+                         "desc_norm":pd.Series(C.map_unique(normalize_desc,descs),dtype=object),
+                         "importe_raw":np.abs(cents[np.asarray(k_imp,dtype=np.int64)]),
+                         "saldo_pdf":saldo_pdf,
+                         "mcount":mptr[filas+1]-mptr[filas],
+                         "pagina":np.asarray(idx.pages,dtype=np.int64)[filas],
+                         "orden":np.arange(1,n+1)})
+
+def reconstruir_santafe(df_raw, saldo_anterior):
+    # montos en centavos (int64); saldo_anterior: centavos o None
+    df=df_raw.sort_values(["fecha","pagina","orden"]).reset_index(drop=True)
+    tiene_saldo_por_linea=df_raw["mcount"].max()>=2
+
+    # Insertar saldo anterior
+    if saldo_anterior is not None:
+        apertura={
+            "fecha":df["fecha"].min()-pd.Timedelta(days=1),
+            "descripcion":"SALDO ANTERIOR",
+            "desc_norm":"SALDO ANTERIOR",
+            "importe_raw":0,
+            "saldo_pdf":saldo_anterior,
+            "mcount":0,
+            "pagina":0,
+            "orden":0
+        }
+        df=pd.concat([pd.DataFrame([apertura]).astype({"importe_raw":"int64","saldo_pdf":"Int64"}),df],ignore_index=True)
+
+    # Signo por columna y débito/crédito/saldo con arrays (sin iterrows)
+    importe=df["importe_raw"].to_numpy(dtype=np.int64)
+    cred=es_credito_santafe(df["desc_norm"])
+    apertura_mask=(df["desc_norm"]=="SALDO ANTERIOR").to_numpy()
+
+    # ---------- Caso 1: PDF con SALDO por línea ----------
+    if tiene_saldo_por_linea:
+        mov=~apertura_mask
+        df["debito"]=np.where(mov&~cred,importe,0)
+        df["credito"]=np.where(mov&cred,importe,0)
+        if saldo_anterior is None:
+            # sin SALDO ANTERIOR no hay saldo corrido: queda vacío (NA, "—" en pantalla)
+            df["saldo"]=pd.array([pd.NA]*len(df),dtype="Int64")
+        else:
+            df["saldo"]=int(saldo_anterior)+np.cumsum(df["credito"].to_numpy()-df["debito"].to_numpy())
+        df["signo"]=np.where(df["credito"]>0,"credito",np.where(df["debito"]>0,"debito",""))
+
+    # ---------- Caso 2: PDF SIN saldo por línea ----------
+    else:
+        # sin SALDO ANTERIOR el saldo corrido arranca en 0 (como siempre en este caso)
+        saldo0=int(saldo_anterior) if saldo_anterior is not None else 0
+        mov=np.ones(len(df),dtype=bool)
+        if len(df) and apertura_mask[0]: mov[0]=False  # sólo la apertura insertada arriba
+        deb=np.where(mov&~cred,importe,0)
+        cre=np.where(mov&cred,importe,0)
+        # saldo corrido en enteros: exacto, no depende del orden de las sumas
+        df["debito"]=deb
+        df["credito"]=cre
+        df["saldo"]=saldo0+np.cumsum(cre-deb)
+        df["signo"]=np.where(mov,np.where(cred,"credito","debito"),"saldo")
+
+    # Excluir saldo final como movimiento
+    df = df[~df["desc_norm"].str.upper().str.contains("SALDO AL|SALDO FINAL")]
+    df = df[~((df["desc_norm"] == "") & (df["debito"] > 0) & (df["orden"] > df["orden"].max() - 2))]
+    return df.reset_index(drop=True)
+
+def clasificar_movimientos(df):
+    # etapa aparte de la reconstrucción: un cambio de reglas no rehace lo anterior
+    with etapa("clasificacion",filas=len(df)):
+        df["Clasificación"]=clasificar_df(df, REGLAS_SANTAFE, "santafe", CACHE_CLASIFICACION)
+    return df
+
+def _entero(v):
+    return None if v is None or pd.isna(v) else int(v)
+
+def conciliar_santafe(df, saldo_final_pdf):
+    # todo en centavos (int): cuadra por igualdad. Sin saldo inicial (saldo corrido NA)
+    # el saldo calculado y la diferencia quedan en None y no cuadra.
+    saldo_inicial = _entero(df["saldo"].iloc[0]) if len(df) else None
+    total_debitos = int(df["debito"].sum())
+    total_creditos = int(df["credito"].sum())
+    saldo_pdf = _entero(saldo_final_pdf if saldo_final_pdf is not None else (df["saldo"].iloc[-1] if len(df) else None))
+    saldo_calc = None if saldo_inicial is None else saldo_inicial + total_creditos - total_debitos
+    diferencia = None if saldo_calc is None or saldo_pdf is None else saldo_calc - saldo_pdf
+    return {
+        "saldo_inicial": saldo_inicial,
+        "total_creditos": total_creditos,
+        "total_debitos": total_debitos,
+        "saldo_pdf": saldo_pdf,
+        "cuadra": diferencia == 0,
+        "saldo_calc": saldo_calc,
+        "diferencia": diferencia,
+        "parser": "santafe",
+    }
+
+def reconstruir(df_raw, saldo_lines):
+    # saldos + signo/saldo corrido + conciliación, sin clasificar → (df, resumen)
+    # saldo_lines: LineIndex del documento o sus (página, línea)
+    with etapa("saldos"):
+        saldo_anterior, saldo_final = find_saldo_anterior(saldo_lines), find_saldo_final_pdf(saldo_lines)
+    with etapa("reconstruccion") as e:
+        df = reconstruir_santafe(df_raw, saldo_anterior)
+        e["filas"] = len(df)
+    return df, conciliar_santafe(df, saldo_final)
+
+def procesar_santafe(df_raw, saldo_lines):
+    df, res = reconstruir(df_raw, saldo_lines)
+    return clasificar_movimientos(df), res
+
+def leer_santafe(file_like, plantilla=None):
+    # Extracción en streaming a un índice de tokens (sólo líneas con montos o marcas);
+    # devuelve los movimientos crudos y el índice para los buscadores de saldo.
+    # `plantilla`: región de la tabla (parsers.plantillas) o None = página completa
+    with etapa("extraccion") as e:
+        idx = T.LineIndex.from_lines(C.iter_lines(file_like, plantilla=plantilla), DATE_RE)
+        e.update(paginas=max(idx.pages, default=0), lineas=idx.n_lines)
+    with etapa("parseo") as e:
+        df_raw = parse_movimientos_santafe(idx)
+        e["filas"] = len(df_raw)
+    return df_raw, idx
+
+# Etapas para parsers.pipeline (cada una cacheable por separado); las versiones
+# entran en la clave de cache de su etapa y de las siguientes
+VERSIONES = {"tokenizado": "1", "parseo": "1", "reconstruccion": "2"}
+REGLAS = REGLAS_SANTAFE
+
+def tokenizar(lines):
+    with etapa("tokenizado") as e:
+        idx = T.LineIndex.from_lines(lines, DATE_RE)
+        e["lineas"] = idx.n_lines
+    return idx
+
+def parsear_movimientos(idx):
+    with etapa("parseo") as e:
+        df_raw = parse_movimientos_santafe(idx)
+        e["filas"] = len(df_raw)
+    return df_raw
+
+def parsear(lines):
+    # Entrada del registro (dispatch): (página, línea) ya extraídas → (df, resumen)
+    idx = tokenizar(lines)
+    return procesar_santafe(parsear_movimientos(idx), idx)
+
+def render(data: bytes, full_text: str = ""):
+    df_raw, idx = leer_santafe(io.BytesIO(data))
+    df, res = procesar_santafe(df_raw, idx)
+    C.render_summary(df, res, titulo="CUENTA (Santa Fe) · Nro s/n")
@@ -1,6 +1,26 @@
+import io
 from . import common as C
+from .generico import parsear as parsear_generico, santander_cut_before_detalle
+from .generico import tokenizar as tokenizar_generico, parsear_movimientos, reconstruir, REGLAS
 
-def render(data: bytes, full_text: str):
-    lines = C.extract_all_lines(data)
-    df = C.parse_generic_table(lines)
-    C.render_summary(df, titulo="Cuenta Corriente (Santander) · Nro s/n")
+# interfaz del módulo: parsear/render (dispatch) y las etapas que usa parsers.pipeline
+# (tokenizar corta el DETALLE IMPOSITIVO; las demás son las de generico)
+__all__ = ["BANCO", "parsear", "render", "tokenizar", "parsear_movimientos", "reconstruir", "REGLAS", "VERSIONES", "cortar_detalle"]
+
+BANCO = "Banco Santander"
+VERSIONES = {"tokenizado": "1", "parseo": "1", "reconstruccion": "2"}
+
+def cortar_detalle(lines):
+    # El bloque DETALLE IMPOSITIVO (fecha + base + impuesto) no son movimientos
+    lines = list(lines)
+    return lines[:len(santander_cut_before_detalle([l for _, l in lines]))]
+
+def tokenizar(lines):
+    return tokenizar_generico(cortar_detalle(lines))
+
+def parsear(lines):
+    return parsear_generico(cortar_detalle(lines), BANCO)
+
+def render(data: bytes, full_text: str = ""):
+    df, res = parsear(C.iter_lines(io.BytesIO(data)))
+    C.render_summary(df, res, titulo="Cuenta Corriente (Santander) · Nro s/n")
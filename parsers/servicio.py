@@ -0,0 +1,265 @@
+# Servicio HTTP local de parseo (sin Streamlit), para scripts de importación y otras
+# herramientas internas:
+#   python -m parsers.servicio --port 8765 --workers 4 --cola 16
+#   curl -F pdf=@enero.pdf -F pdf=@febrero.pdf "http://127.0.0.1:8765/procesar?formato=json"
+# Los procesos del pool arrancan al levantar el servicio y ya tienen importados pandas,
+# pdfplumber y los parsers: cada PDF paga sólo su parseo (pipeline con detección y cache).
+# Contrapresión: a lo sumo workers + cola PDFs en curso; si una solicitud no entra se
+# rechaza entera con 503 (Retry-After) en lugar de encolar sin límite. Si un proceso del
+# pool muere (memoria, segfault de un PDF) el pool se rehace y esa solicitud recibe 503.
+#   POST /procesar   multipart/form-data (uno o más PDFs) o el PDF como cuerpo (application/pdf)
+#                    ?formato=json|parquet  ?banco=slug (saltea la detección)
+#   GET  /metrics    solicitudes, rechazos, en curso y percentiles de latencia
+#   GET  /salud
+# JSON: montos en centavos (enteros), fechas ISO. Parquet: un solo archivo con los
+# movimientos de todos los PDFs (columna `archivo`) y los resúmenes en los metadatos.
+import argparse, json, os, sys, threading, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SERVICIO_WORKERS = int(os.environ.get("IABANCOS_SERVICIO_WORKERS", os.cpu_count() or 1))
+SERVICIO_COLA = int(os.environ.get("IABANCOS_SERVICIO_COLA", "16"))
+MAX_MB = 50
+MUESTRAS = 2000     # latencias que se guardan para los percentiles
+
+def _calentar():
+    # initializer de cada proceso: imports pesados y módulos de todos los bancos
+    import pandas, pdfplumber  # noqa: F401
+    from . import dispatch, pipeline  # noqa: F401
+    for slug in dispatch.PARSERS:
+        dispatch.cargar(slug)
+
+def _listo(_=None):
+    return os.getpid()
+
+def procesar_pdf(data: bytes, nombre: str, slug: str | None = None, formato: str = "json") -> dict:
+    # corre en el pool: PDF → resultado serializable (registros JSON o df para Parquet)
+    from .pipeline import procesar
+    t0 = time.perf_counter()
+    out = {"archivo": nombre}
+    try:
+        r = procesar(data, slug=slug, hasta="agregados", workers=1)
+        out.update(banco=r["banco"], slug=r["slug"], confianza=r["confianza"], paginas=r["paginas"],
+                   conciliacion=r["res"], agregados=r["agregados"])
+        if formato == "parquet":
+            out["df"] = r["df"]
+        else:
+            out["movimientos"] = json.loads(r["df"].to_json(orient="records", date_format="iso", force_ascii=False))
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    out["segundos"] = round(time.perf_counter() - t0, 3)
+    return out
+
+def _percentiles(xs) -> dict:
+    if not xs: return {"n": 0}
+    s = sorted(xs)
+    def q(p):
+        return round(s[min(len(s) - 1, int(p * len(s)))], 4)
+    return {"n": len(s), "p50": q(0.50), "p90": q(0.90), "p99": q(0.99), "max": round(s[-1], 4)}
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+        self.solicitudes = self.rechazadas = self.errores = self.pdfs = self.reinicios = 0
+        self.lat_solicitud = deque(maxlen=MUESTRAS)
+        self.lat_pdf = deque(maxlen=MUESTRAS)
+
+    def sumar(self, **kw):
+        with self._lock:
+            for k, v in kw.items(): setattr(self, k, getattr(self, k) + v)
+
+    def registrar(self, segundos: float, por_pdf):
+        with self._lock:
+            self.solicitudes += 1
+            self.lat_solicitud.append(segundos)
+            self.lat_pdf.extend(por_pdf)
+            self.pdfs += len(por_pdf)
+
+    def como_dict(self) -> dict:
+        with self._lock:
+            return {"uptime_s": round(time.time() - self.inicio, 1), "solicitudes": self.solicitudes,
+                    "rechazadas": self.rechazadas, "errores": self.errores, "pdfs": self.pdfs,
+                    "reinicios_pool": self.reinicios,
+                    "latencia_solicitud_s": _percentiles(self.lat_solicitud),
+                    "latencia_pdf_s": _percentiles(self.lat_pdf)}
+
+class Servicio:
+    # pool de procesos tibio + cupo de PDFs en curso (workers + cola)
+    def __init__(self, workers: int = SERVICIO_WORKERS, cola: int = SERVICIO_COLA):
+        self.workers, self.cola = max(1, workers), max(0, cola)
+        self.pool = self._crear_pool()
+        self.metricas = Metricas()
+        self._lock = threading.Lock()
+        self._lock_pool = threading.Lock()
+        self.en_curso = 0
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        # mismo contexto que la extracción (forkserver): el pool se rehace desde un hilo
+        # del servidor y no conviene hacer fork de un proceso con hilos
+        from .common import _mp_contexto
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_contexto(), initializer=_calentar)
+        # levanta todos los procesos ya (no con la primera solicitud)
+        list(pool.map(_listo, range(self.workers)))
+        return pool
+
+    def _rehacer(self, roto: ProcessPoolExecutor):
+        # varias solicitudes pueden ver el mismo pool roto: se rehace una sola vez
+        with self._lock_pool:
+            if self.pool is not roto: return
+            roto.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._crear_pool()
+            self.metricas.sumar(reinicios=1)
+
+    def reservar(self, n: int) -> bool:
+        with self._lock:
+            if self.en_curso + n > self.workers + self.cola: return False
+            self.en_curso += n
+            return True
+
+    def liberar(self, n: int):
+        with self._lock:
+            self.en_curso -= n
+
+    def procesar(self, archivos, slug=None, formato="json"):
+        # → resultados por PDF, o None si el pool se rompió (ya rehecho: responder 503)
+        pool = self.pool
+        try:
+            futs = [pool.submit(procesar_pdf, data, nombre, slug, formato) for nombre, data in archivos]
+            return [f.result() for f in futs]
+        except BrokenProcessPool:
+            self._rehacer(pool)
+            return None
+
+    def cerrar(self):
+        self.pool.shutdown(cancel_futures=True)
+
+def leer_pdfs(content_type: str, body: bytes):
+    # → [(nombre, bytes)]: partes con archivo de un multipart o el cuerpo entero
+    if content_type.startswith("multipart/form-data"):
+        msg = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+        return [(p.get_filename() or f"archivo{i}.pdf", p.get_payload(decode=True) or b"")
+                for i, p in enumerate(msg.iter_parts(), start=1) if p.get_filename() is not None]
+    return [("documento.pdf", body)] if body else []
+
+def respuesta_parquet(resultados) -> bytes:
+    import pandas as pd
+    from .columnar import parquet_bytes
+    dfs = [r.pop("df").assign(archivo=r["archivo"], banco=r["banco"]) for r in resultados if "df" in r]
+    df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    return parquet_bytes(df, {"resumenes": json.dumps(resultados, ensure_ascii=False, default=_json_default)})
+
+def _json_default(o):
+    return o.item() if hasattr(o, "item") else str(o)   # escalares numpy, fechas
+
+class Handler(BaseHTTPRequestHandler):
+    servicio: Servicio = None
+    max_bytes = MAX_MB * 1024 * 1024
+    protocol_version = "HTTP/1.1"
+
+    def _enviar(self, codigo: int, cuerpo: bytes, tipo: str = "application/json", extra: dict | None = None):
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for k, v in (extra or {}).items(): self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _json(self, codigo: int, obj, extra: dict | None = None):
+        self._enviar(codigo, json.dumps(obj, ensure_ascii=False, default=_json_default).encode("utf-8"),
+                     "application/json; charset=utf-8", extra)
+
+    def do_GET(self):
+        ruta = urlparse(self.path).path
+        if ruta == "/metrics":
+            s = self.servicio
+            self._json(200, {**s.metricas.como_dict(), "en_curso": s.en_curso,
+                             "capacidad": s.workers + s.cola, "workers": s.workers})
+        elif ruta == "/salud":
+            self._json(200, {"ok": True})
+        else:
+            self._json(404, {"error": "ruta desconocida"})
+
+    def do_POST(self):
+        t0 = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != "/procesar":
+            return self._json(404, {"error": "ruta desconocida"})
+        q = parse_qs(url.query)
+        formato = q.get("formato", ["json"])[0]
+        slug = q.get("banco", [None])[0]
+        largo = int(self.headers.get("Content-Length") or 0)
+        if formato not in ("json", "parquet"):
+            return self._json(400, {"error": "formato: json o parquet"})
+        if largo > self.max_bytes:
+            self.close_connection = True
+            return self._json(413, {"error": f"cuerpo mayor a {self.max_bytes // (1024 * 1024)} MB"})
+        archivos = leer_pdfs(self.headers.get("Content-Type", ""), self.rfile.read(largo))
+        if not archivos:
+            return self._json(400, {"error": "no se recibió ningún PDF"})
+
+        s = self.servicio
+        if len(archivos) > s.workers + s.cola:   # no entraría nunca: no tiene sentido reintentar
+            return self._json(413, {"error": f"a lo sumo {s.workers + s.cola} PDFs por solicitud"})
+        if not s.reservar(len(archivos)):
+            s.metricas.sumar(rechazadas=1)
+            return self._json(503, {"error": "servicio saturado, reintentar"}, {"Retry-After": "1"})
+        try:
+            resultados = s.procesar(archivos, slug, formato)
+        finally:
+            s.liberar(len(archivos))
+        if resultados is None:
+            s.metricas.sumar(errores=1)
+            return self._json(503, {"error": "se reinició el pool de procesos, reintentar"}, {"Retry-After": "1"})
+        errores = sum("error" in r for r in resultados)
+        s.metricas.sumar(errores=errores)
+        s.metricas.registrar(time.perf_counter() - t0, [r["segundos"] for r in resultados])
+
+        if formato == "parquet":
+            return self._enviar(200, respuesta_parquet(resultados), "application/vnd.apache.parquet")
+        self._json(200, {"montos": "centavos", "resultados": resultados})
+
+    def log_message(self, fmt, *args):
+        print(f"{self.address_string()} · {fmt % args}", file=sys.stderr)
+
+class Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # el cliente cortó la conexión (keep-alive): no es un error del servicio
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)): return
+        super().handle_error(request, client_address)
+
+def crear(host: str = "127.0.0.1", port: int = 8765, workers: int = SERVICIO_WORKERS,
+          cola: int = SERVICIO_COLA) -> Servidor:
+    handler = type("IABancosHandler", (Handler,), {"servicio": Servicio(workers, cola)})
+    return Servidor((host, port), handler)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m parsers.servicio", description="Servicio HTTP local de parseo de resúmenes.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("-w", "--workers", type=int, default=SERVICIO_WORKERS, help="procesos del pool")
+    ap.add_argument("--cola", type=int, default=SERVICIO_COLA, help="PDFs en espera además de los que se procesan")
+    args = ap.parse_args(argv)
+
+    httpd = crear(args.host, args.port, args.workers, args.cola)
+    s = httpd.RequestHandlerClass.servicio
+    print(f"Escuchando en http://{args.host}:{httpd.server_address[1]} · {s.workers} workers · cola {s.cola}", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        s.cerrar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# Procesamiento de varios PDFs en segundo plano (modo "varios archivos" de la app).
+# Cada PDF es una Tarea que corre parsers.pipeline.procesar en un pool de hilos
+# compartido por todas las sesiones (acota el CPU del servidor) y va actualizando su
+# estado: en cola → detectando → extrayendo (página N/M) → parseando → listo / error.
+# La UI sólo lee las tareas (nunca llama a Streamlit desde los hilos) y muestra cada
+# resultado apenas termina. La extracción de cada PDF usa además su propio pool de
+# procesos (a partir de PARALLEL_MIN_PAGES páginas), que es lo que escala con los núcleos;
+# esos procesos salen de un forkserver (common._mp_contexto), no de un fork de estos hilos.
+import os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import content_key
+
+LOTE_WORKERS = int(os.environ.get("IABANCOS_LOTE_WORKERS", "2"))
+
+# etapa del pipeline → estado que se muestra
+ESTADO_ETAPA = {
+    "deteccion": "detectando",
+    "extraccion": "extrayendo",
+    "tokenizado": "parseando", "parseo": "parseando", "reconstruccion": "parseando",
+    "clasificacion": "clasificando", "agregados": "clasificando",
+}
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=LOTE_WORKERS, thread_name_prefix="iabancos-lote")
+        return _POOL
+
+def _workers_extraccion() -> int:
+    # los núcleos se reparten entre los PDFs que corren a la vez
+    return max(1, (os.cpu_count() or 1) // LOTE_WORKERS)
+
+class Tarea:
+    # Los atributos los escribe sólo el hilo del pool; la UI los lee (asignaciones atómicas)
+    def __init__(self, nombre: str, data: bytes):
+        self.nombre = nombre
+        self.clave = content_key(data)
+        self.data = data             # se suelta al terminar
+        self.estado = "en cola"
+        self.pagina = self.paginas = 0
+        self.banco = ""
+        self.resultado = None        # salida de pipeline.procesar
+        self.error = None
+        self.inicio = self.fin = None
+
+    def terminada(self) -> bool:
+        return self.estado in ("listo", "error")
+
+    def _progreso(self, etapa: str, pagina: int = 0, paginas: int = 0):
+        self.estado = ESTADO_ETAPA.get(etapa, self.estado)
+        if paginas: self.pagina, self.paginas = pagina, paginas
+
+    def correr(self, hasta: str = "agregados", workers: int | None = None):
+        from . import perf
+        from .pipeline import procesar
+        self.inicio = time.perf_counter()
+        self.estado = "detectando"
+        try:
+            with perf.registrar("lote_app", archivo=self.nombre, bytes=len(self.data)):
+                r = procesar(self.data, hasta=hasta, progreso=self._progreso,
+                             workers=_workers_extraccion() if workers is None else workers)
+            self.banco, self.paginas = r["banco"], r["paginas"]
+            self.pagina = self.paginas
+            self.resultado = r
+            self.estado = "listo"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.estado = "error"
+        finally:
+            self.data = None
+            self.fin = time.perf_counter()
+        return self
+
+    def fila(self) -> dict:
+        # fila de la tabla de avance
+        res = self.resultado["res"] if self.resultado else None
+        if self.estado == "extrayendo" and self.paginas:
+            avance = f"página {self.pagina}/{self.paginas}"
+        elif self.paginas:
+            avance = f"{self.paginas} páginas"
+        else:
+            avance = ""
+        fin = self.fin if self.fin is not None else time.perf_counter()
+        return {
+            "archivo": self.nombre,
+            "banco": self.banco,
+            "estado": self.estado,
+            "avance": avance,
+            "movimientos": len(self.resultado["df"]) if self.resultado else None,
+            "conciliado": ("Sí" if res["cuadra"] else "No") if res else "",
+            "segundos": round(fin - self.inicio, 1) if self.inicio is not None else None,
+            "error": self.error or "",
+        }
+
+def enviar(nombre: str, data: bytes, hasta: str = "agregados") -> Tarea:
+    t = Tarea(nombre, data)
+    pool().submit(t.correr, hasta)
+    return t
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from .common import (
+    DATE_RE, MONEY_RE, SALDO_ANT_PREFIX, SALDO_FINAL_PREFIX, SF_SALDO_ULT_RE,
+    HEADER_ROW_PAT, NON_MOV_PAT, normalize_money_cents_arr,
+)
+
+# Índice de tokens por documento: una sola pasada de DATE_RE / MONEY_RE por línea.
+# Parsers y buscadores de saldo consultan el índice en vez de volver a correr regex.
+
+# Marcas por línea (bits)
+F_SALDO_ANT_PREFIX   = 1 << 0   # ^SALDO ULTIMO EXTRACTO AL
+F_SALDO_ANTERIOR     = 1 << 1   # "SALDO ANTERIOR"
+F_SALDO_ULT_EXTRACTO = 1 << 2   # "SALDO ULTIMO/ÚLTIMO EXTRACTO"
+F_SF_SALDO_ULT       = 1 << 3   # SALDO (U)LTIMO RESUMEN (regex)
+F_SALDO_ULT_RESUMEN  = 1 << 4   # "SALDO ULTIMO RESUMEN" (literal)
+F_SALDO_FINAL_PREFIX = 1 << 5   # ^SALDO FINAL AL DIA
+F_SALDO_FINAL        = 1 << 6   # "SALDO FINAL"
+F_SALDO_AL           = 1 << 7   # "SALDO AL"
+F_HEADER             = 1 << 8   # encabezado de tabla (HEADER_ROW_PAT)
+F_SF_HEADER          = 1 << 9   # "FECHA MOVIMIENTO" / "CONCEPTO" (Santa Fe)
+F_NON_MOV            = 1 << 10  # bloques que no son movimientos (NON_MOV_PAT)
+
+def line_flags(s: str) -> int:
+    U = s.upper(); f = 0
+    if "SALDO" in U:
+        if SALDO_ANT_PREFIX.match(s): f |= F_SALDO_ANT_PREFIX
+        if "SALDO ANTERIOR" in U: f |= F_SALDO_ANTERIOR
+        if "SALDO ULTIMO EXTRACTO" in U or "SALDO ÚLTIMO EXTRACTO" in U: f |= F_SALDO_ULT_EXTRACTO
+        if SF_SALDO_ULT_RE.search(s): f |= F_SF_SALDO_ULT
+        if "SALDO ULTIMO RESUMEN" in U: f |= F_SALDO_ULT_RESUMEN
+        if SALDO_FINAL_PREFIX.match(s): f |= F_SALDO_FINAL_PREFIX
+        if "SALDO FINAL" in U: f |= F_SALDO_FINAL
+        if "SALDO AL" in U: f |= F_SALDO_AL
+    if U.startswith("FECHA") and HEADER_ROW_PAT.match(s): f |= F_HEADER
+    if "FECHA MOVIMIENTO" in U or "CONCEPTO" in U: f |= F_SF_HEADER
+    if ("INFORMACI" in U or "TOTAL" in U or "RESUMEN" in U) and NON_MOV_PAT.search(s): f |= F_NON_MOV
+    return f
+
+class LineIndex:
+    # Sólo guarda las líneas que pueden usar los consumidores: las que tienen montos o
+    # alguna marca. `linenos` conserva la posición original (para mirar "las 2 siguientes").
+    # Fechas y montos en formato CSR: spans de la línea i en [ptr[i], ptr[i+1]).
+
+    def __init__(self, date_re=DATE_RE):
+        self.date_re = date_re
+        self.pages, self.linenos, self.texts, self.flags = [], [], [], []
+        self.dptr, self.dspan = [0], []
+        self.mptr, self.mspan, self.mtok = [0], [], []
+        self.n_lines = 0
+        self._values = None
+
+    @classmethod
+    def from_lines(cls, lines, date_re=DATE_RE):
+        # `lines`: iterable de (página, línea) o de líneas sueltas (página 0)
+        idx = cls(date_re)
+        for item in lines:
+            if isinstance(item, tuple): idx.add(item[0], item[1])
+            else: idx.add(0, item)
+        return idx
+
+    def add(self, page, text):
+        lineno = self.n_lines; self.n_lines += 1
+        s = (text or "").strip()
+        if not s: return
+        ms = [(m.start(), m.end()) for m in MONEY_RE.finditer(s)]
+        fl = line_flags(s)
+        if not ms and not fl: return
+        self.pages.append(page); self.linenos.append(lineno); self.texts.append(s); self.flags.append(fl)
+        self.dspan.extend((m.start(), m.end()) for m in self.date_re.finditer(s))
+        self.dptr.append(len(self.dspan))
+        self.mspan.extend(ms); self.mtok.extend(s[a:b] for a, b in ms)
+        self.mptr.append(len(self.mspan))
+        self._values = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def money_cents(self) -> np.ndarray:
+        # todos los montos del documento en centavos (int64), convertidos en bloque una vez
+        if self._values is None:
+            self._values = normalize_money_cents_arr(self.mtok)
+        return self._values
+
+    def money_count(self, i: int) -> int:
+        return self.mptr[i + 1] - self.mptr[i]
+
+    def cents(self, i: int, k: int = 0) -> int:
+        a, b = self.mptr[i], self.mptr[i + 1]
+        return int(self.money_cents()[(b if k < 0 else a) + k])
+
+    def date_count(self, i: int) -> int:
+        return self.dptr[i + 1] - self.dptr[i]
+
+    def first_date(self, i: int):
+        a, b = self.dptr[i], self.dptr[i + 1]
+        return self.dspan[a] if b > a else None
+
+    def date_token(self, i: int, k: int = 0) -> str:
+        a, b = self.dspan[self.dptr[i] + k]
+        return self.texts[i][a:b]
+
+    def flagged(self, flag: int) -> list[int]:
+        return [i for i, f in enumerate(self.flags) if f & flag]
+
+def as_index(lines, date_re=DATE_RE) -> LineIndex:
+    return lines if isinstance(lines, LineIndex) else LineIndex.from_lines(lines, date_re)
+
+# Buscadores de saldo (genérico): aceptan un LineIndex o la lista de líneas.
+# Devuelven centavos (int) o None si no hay saldo.
+def find_saldo_final_from_lines(lines):
+    idx = as_index(lines)
+    for i in reversed(idx.flagged(F_SALDO_FINAL_PREFIX)):
+        if idx.date_count(i) and idx.money_count(i) == 1:
+            fecha = pd.to_datetime(idx.date_token(i), dayfirst=True, errors="coerce")
+            if pd.notna(fecha):
+                return fecha, idx.cents(i)
+    for i in reversed(idx.flagged(F_SALDO_FINAL)):
+        if idx.money_count(i) == 1:
+            return pd.NaT, idx.cents(i)
+    return pd.NaT, None
+
+def find_saldo_anterior_from_lines(lines):
+    idx = as_index(lines)
+    for flag, need_date in ((F_SALDO_ANT_PREFIX, True), (F_SALDO_ANTERIOR, False), (F_SALDO_ULT_EXTRACTO, True)):
+        for i in idx.flagged(flag):
+            if (not need_date or idx.date_count(i)) and idx.money_count(i) == 1:
+                return idx.cents(i)
+    sf = idx.flagged(F_SF_SALDO_ULT)
+    if sf:
+        i = sf[0]
+        if idx.money_count(i) == 1:
+            return idx.cents(i)
+        # las 2 líneas siguientes del documento (las que no están en el índice no tienen montos)
+        j = i + 1
+        while j < len(idx) and idx.linenos[j] <= idx.linenos[i] + 2:
+            if idx.money_count(j) == 1:
+                return idx.cents(j)
+            j += 1
+    return None
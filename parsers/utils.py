@@ -22,17 +22,32 @@ def ar_to_float(x: str) -> float:
         v = 0.0
     return -v if neg else v
 
+def ar_to_cents(x: str) -> int:
+    # como ar_to_float pero exacto, en centavos ("1.234,5" → 123450; sin coma = pesos)
+    if x is None:
+        return 0
+    s = str(x).strip().replace("$", "").replace(" ", "").replace("−", "-")
+    neg = s.startswith("-")
+    s = s.replace("-", "").replace(".", "")
+    main, _, frac = s.partition(",")
+    try:
+        v = int(main or "0") * 100 + int((frac + "00")[:2])
+    except Exception:
+        v = 0
+    return -v if neg else v
+
 def normalize_whitespace(line: str) -> str:
     return " ".join(str(line).split())
 
-def concilia(saldo_inicial: float, total_creditos: float, total_debitos: float, saldo_pdf: float, tol: float = 0.01):
+def concilia(saldo_inicial: int, total_creditos: int, total_debitos: int, saldo_pdf: int, tol: int = 0):
+    # montos en centavos: cuadra por igualdad exacta (tol en centavos)
     calculado = saldo_inicial + total_creditos - total_debitos
-    diff = round(calculado - saldo_pdf, 2)
+    diff = calculado - saldo_pdf
     return abs(diff) <= tol, calculado, diff
 
 def build_df(rows):
     df = pd.DataFrame(rows, columns=["fecha","descripcion","debito","credito","importe","monto_pdf","saldo"])
     for col in ["debito","credito","importe","monto_pdf","saldo"]:
         if col in df.columns:
-            df[col] = df[col].fillna(0)
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
     return df
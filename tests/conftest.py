@@ -0,0 +1,31 @@
+# Los tests corren sin tocar ~/.cache/iabancos ni las plantillas del repo: caches,
+# bases SQLite y plantillas van a un directorio temporal (antes de importar parsers).
+import functools, os, sys, tempfile
+from pathlib import Path
+
+import pytest
+
+_TMP = Path(tempfile.mkdtemp(prefix="iabancos-tests-"))
+os.environ["IABANCOS_CACHE_DIR"] = str(_TMP / "cache")
+os.environ["IABANCOS_PLANTILLAS_DIR"] = str(_TMP / "plantillas")
+os.environ["IABANCOS_PERF_LOG"] = ""
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+@functools.lru_cache(maxsize=None)
+def sintetico(banco: str, paginas: int = 2, seed: int = 0) -> bytes:
+    # PDF sintético del banco (bench.sinteticos), generado una vez por sesión
+    from bench.sinteticos import generar
+    return generar(banco, paginas, seed)
+
+@functools.lru_cache(maxsize=None)
+def lineas(banco: str, paginas: int = 2, seed: int = 0):
+    import io
+    from parsers.common import extract_all_lines
+    return tuple(extract_all_lines(io.BytesIO(sintetico(banco, paginas, seed)), workers=1))
+
+@pytest.fixture
+def cache_vacio(tmp_path):
+    # ResultCache propio del test (memoria + disco en tmp_path)
+    from parsers.cache import ResultCache
+    return ResultCache(tmp_path / "cache")
@@ -0,0 +1,92 @@
+# Generado por tests/regenerar_originales.py: no editar a mano.
+# Resultados del código original (commit 14909d8) sobre bench.sinteticos, 2 páginas, semilla 0; montos en centavos.
+
+# (saldo anterior, fecha del saldo final, saldo final) de common.find_saldo_*_from_lines
+SALDOS = {'santafe': (28643285, None, None),
+ 'nacion': (12397181, None, -153131299),
+ 'macro': (29074104, '2024-03-03', -105827423),
+ 'santander': (27809881, None, -131608820),
+ 'galicia': (None, None, -147645268)}
+
+# parse_pdf_generico; Santander cortado antes de DETALLE IMPOSITIVO. ponderado: Σ (fila × monto) de débito, crédito y saldo (detecta filas cambiadas de lugar o de signo)
+GENERICO = {'nacion': {'filas': 85,
+            'debitos': 238208061,
+            'creditos': 74887221,
+            'saldo_inicial': 12397181,
+            'saldo_final': -153131299,
+            'ponderado': (10019237820, 3516288458, -374731647079),
+            'clasif': {'SIRCREB': 19,
+                       'LEY 25.413': 13,
+                       'Crédito': 12,
+                       'Transferencia de terceros recibida': 12,
+                       'Transferencia a terceros realizada': 9,
+                       'Débito': 8,
+                       'IVA 21% (sobre comisiones)': 6,
+                       'Percepciones de IVA': 5,
+                       'SALDO ANTERIOR': 1}},
+ 'macro': {'filas': 85,
+           'debitos': 233320233,
+           'creditos': 114095566,
+           'saldo_inicial': 29074104,
+           'saldo_final': -105827423,
+           'ponderado': (10325600319, 3684101362, -181355029963),
+           'clasif': {'IVA 21% (sobre comisiones)': 18,
+                      'Débito': 17,
+                      'Acreditación Préstamos': 13,
+                      'Transferencia a terceros realizada': 12,
+                      'Transferencia de terceros recibida': 10,
+                      'Cuota de préstamo': 7,
+                      'LEY 25.413': 6,
+                      'SALDO ANTERIOR': 1,
+                      'Crédito': 1}},
+ 'santander': {'filas': 85,
+               'debitos': 240603558,
+               'creditos': 91780853,
+               'saldo_inicial': 27809881,
+               'saldo_final': -131608820,
+               'ponderado': (10458223116, 3228233413, -270734236828),
+               'clasif': {'Débito': 31,
+                          'Crédito': 17,
+                          'SIRCREB': 15,
+                          'LEY 25.413': 14,
+                          'IVA 10,5% (sobre comisiones)': 7,
+                          'SALDO ANTERIOR': 1}}}
+
+# parse_galicia sobre el texto de cada página
+GALICIA = {'saldo_inicial': 5681345,
+ 'total_creditos': 72076558,
+ 'total_debitos': 225403171,
+ 'saldo_pdf': -147645268,
+ 'filas': 84}
+
+# app.py: paneles Resumen del período y Detalle de movimientos
+SANTAFE = {'saldo_inicial': 28643285,
+ 'total_creditos': 143580904,
+ 'total_debitos': 240659888,
+ 'saldo_pdf': -68435699,
+ 'filas': 85,
+ 'ponderado': (11327681998, 5508774016, -61143028810),
+ 'signos': {'debito': 55, 'credito': 29, '': 1}}
+
+# app.py: etiquetas del df.apply fila a fila
+SANTAFE_CLASIFICACION = {'Crédito': 29,
+ 'Gastos por comisiones': 12,
+ 'IVA 21% (sobre comisiones)': 10,
+ 'IVA 10,5% (sobre comisiones)': 8,
+ 'LEY 25.413': 8,
+ 'Débito': 7,
+ 'SIRCREB': 6,
+ 'Débito automático': 4,
+ 'Otros': 1}
+
+# app.py: panel Resumen Operativo
+SANTAFE_OPERATIVO = {'net21': 222471800,
+ 'iva21': 46719078,
+ 'bruto21': 269190878,
+ 'net105': 471236752,
+ 'iva105': 49479859,
+ 'bruto105': 520716611,
+ 'percep_iva': 0,
+ 'ley_25413': 31369454,
+ 'sircreb': 27232216,
+ 'total_gastos': 213336228}
@@ -0,0 +1,149 @@
+# Regenera tests/originales.py: corre el código original (el primer commit del repo, sacado
+# con git archive) sobre los mismos sintéticos que usan los tests y guarda sus resultados en
+# centavos. Santa Fe sale del app.py original (AppTest, panel por panel); Nación, Macro y
+# Santander de parsers/generico.py; Galicia de parsers/galicia.py; saldos de parsers/common.py.
+#   python tests/regenerar_originales.py              # reescribe tests/originales.py
+#   python tests/regenerar_originales.py --comprobar  # sale con 1 si no coincide
+import argparse, ast, io, os, pprint, subprocess, sys, tarfile, tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+DESTINO = Path(__file__).resolve().parent / "originales.py"
+PAGINAS, SEMILLA = 2, 0
+
+# corre dentro del árbol original (cwd y primero en sys.path); imprime un dict con repr()
+_ORIGINAL = r'''
+import io, sys
+import numpy as np, pandas as pd
+from parsers import common as C, generico as G, galicia as GA
+from parsers.utils import ar_to_float
+
+pdfs = dict(a.split("=", 1) for a in sys.argv[1:])
+
+def cents(v):
+    return None if v is None or (isinstance(v, float) and np.isnan(v)) else int(round(float(v) * 100))
+
+def ponderado(valores):
+    return int((np.arange(1, len(valores) + 1) * np.asarray(valores, dtype=np.int64)).sum())
+
+def texto_a_cents(s):
+    # "$ -1.234,56" / "1.234,56" (fmt_ar del app original) -> centavos
+    s = str(s).replace("$", "").strip()
+    return None if s == "—" else cents(ar_to_float(s))
+
+lineas = {b: C.extract_all_lines(p) for b, p in pdfs.items()}
+out = {"SALDOS": {}, "GENERICO": {}}
+
+for b, ls in lineas.items():
+    textos = [l for _, l in ls]
+    fecha, fin = C.find_saldo_final_from_lines(textos)
+    out["SALDOS"][b] = (cents(C.find_saldo_anterior_from_lines(textos)),
+                        None if pd.isna(fecha) else fecha.strftime("%Y-%m-%d"), cents(fin))
+
+for b in ("nacion", "macro", "santander"):
+    textos = [l for _, l in lineas[b]]
+    if b == "santander":
+        textos = G.santander_cut_before_detalle(textos)
+    df, _ = G.parse_pdf_generico(b, None, textos)
+    _, fin = C.find_saldo_final_from_lines(textos)
+    out["GENERICO"][b] = {
+        "filas": len(df), "debitos": cents(df["debito"].sum()), "creditos": cents(df["credito"].sum()),
+        "saldo_inicial": cents(df["saldo"].iloc[0]),
+        "saldo_final": cents(fin if not np.isnan(fin) else df["saldo"].iloc[-1]),
+        "ponderado": tuple(ponderado([cents(v) for v in df[c]]) for c in ("debito", "credito", "saldo")),
+        "clasif": {k: int(v) for k, v in df["Clasificación"].value_counts().items()}}
+
+paginas = {}
+for pi, l in lineas["galicia"]:
+    paginas.setdefault(pi, []).append(l)
+res, df = GA.parse_galicia(["\n".join(v) for _, v in sorted(paginas.items())])
+out["GALICIA"] = {k: cents(res[k]) for k in ("saldo_inicial", "total_creditos", "total_debitos", "saldo_pdf")}
+out["GALICIA"]["filas"] = len(df)
+
+# Santa Fe: el app.py original es un script de Streamlit sin funciones importables
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+class _Subido(io.BytesIO):
+    name = "santafe.pdf"
+
+datos = open(pdfs["santafe"], "rb").read()
+st.file_uploader = lambda *a, **k: _Subido(datos)
+at = AppTest.from_file("app.py", default_timeout=600)
+at.run()
+assert not at.exception, at.exception
+m = {x.label: texto_a_cents(x.value) for x in at.metric}
+d = at.dataframe[0].value
+out["SANTAFE"] = {
+    "saldo_inicial": m["Saldo inicial"], "total_creditos": m["Créditos (+)"], "total_debitos": m["Débitos (–)"],
+    "saldo_pdf": m["Saldo final (PDF)"], "filas": len(d),
+    "ponderado": tuple(ponderado([texto_a_cents(v) for v in d[c]]) for c in ("debito", "credito", "saldo")),
+    "signos": {k: int(v) for k, v in d["signo"].value_counts().items()}}
+out["SANTAFE_CLASIFICACION"] = {k: int(v) for k, v in d["Clasificación"].value_counts().items()}
+out["SANTAFE_OPERATIVO"] = {
+    "net21": m["Neto Comisiones 21%"], "iva21": m["IVA 21%"], "bruto21": m["Bruto 21%"],
+    "net105": m["Neto Comisiones 10,5%"], "iva105": m["IVA 10,5%"], "bruto105": m["Bruto 10,5%"],
+    "percep_iva": m["Percepciones de IVA"], "ley_25413": m["Ley 25.413"], "sircreb": m["SIRCREB"],
+    "total_gastos": m["Total Gastos Bancarios"]}
+print(repr(out))
+'''
+
+_COMENTARIOS = {
+    "SALDOS": "(saldo anterior, fecha del saldo final, saldo final) de common.find_saldo_*_from_lines",
+    "GENERICO": "parse_pdf_generico; Santander cortado antes de DETALLE IMPOSITIVO. ponderado: Σ (fila × monto) "
+                "de débito, crédito y saldo (detecta filas cambiadas de lugar o de signo)",
+    "GALICIA": "parse_galicia sobre el texto de cada página",
+    "SANTAFE": "app.py: paneles Resumen del período y Detalle de movimientos",
+    "SANTAFE_CLASIFICACION": "app.py: etiquetas del df.apply fila a fila",
+    "SANTAFE_OPERATIVO": "app.py: panel Resumen Operativo",
+}
+
+def _commit_original() -> str:
+    return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=RAIZ, check=True,
+                          capture_output=True, text=True).stdout.split()[-1]
+
+def calcular(commit: str) -> dict:
+    sys.path.insert(0, str(RAIZ))
+    from bench.sinteticos import BANCOS, generar
+    with tempfile.TemporaryDirectory(prefix="iabancos-original-") as tmp:
+        base = Path(tmp) / "original"
+        base.mkdir()
+        tar = subprocess.run(["git", "archive", commit], cwd=RAIZ, check=True, capture_output=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(tar)) as t:
+            t.extractall(base, filter="data")
+        pdfs = []
+        for b in BANCOS:
+            p = Path(tmp) / f"{b}.pdf"
+            p.write_bytes(generar(b, PAGINAS, SEMILLA))
+            pdfs.append(f"{b}={p}")
+        env = dict(os.environ, PYTHONPATH=str(base))
+        r = subprocess.run([sys.executable, "-c", _ORIGINAL, *pdfs], cwd=base, env=env,
+                           capture_output=True, text=True)
+        if r.returncode:
+            sys.exit(r.stderr)
+        return ast.literal_eval(r.stdout.strip().splitlines()[-1])
+
+def modulo(valores: dict, commit: str) -> str:
+    partes = [f"# Generado por tests/regenerar_originales.py: no editar a mano.\n"
+              f"# Resultados del código original (commit {commit[:7]}) sobre bench.sinteticos, "
+              f"{PAGINAS} páginas, semilla {SEMILLA}; montos en centavos.\n"]
+    for nombre in _COMENTARIOS:
+        partes.append(f"\n# {_COMENTARIOS[nombre]}\n{nombre} = {pprint.pformat(valores[nombre], width=110, sort_dicts=False)}\n")
+    return "".join(partes)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Regenera los valores de referencia del código original.")
+    ap.add_argument("--comprobar", action="store_true", help="no escribe; sale con 1 si el archivo no coincide")
+    args = ap.parse_args(argv)
+    commit = _commit_original()
+    texto = modulo(calcular(commit), commit)
+    if args.comprobar:
+        ok = DESTINO.exists() and DESTINO.read_text(encoding="utf-8") == texto
+        print("originales.py al día" if ok else "originales.py no coincide con el código original")
+        return 0 if ok else 1
+    DESTINO.write_text(texto, encoding="utf-8")
+    print(f"escrito {DESTINO}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
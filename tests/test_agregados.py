@@ -0,0 +1,36 @@
+# Resumen operativo agrupado: mismas métricas que el app.py original (máscara por
+# métrica, en float) y rollups por mes que combinan sin volver a los movimientos.
+import pandas as pd
+
+from conftest import lineas
+from originales import SANTAFE_OPERATIVO as ORIGINAL
+from parsers import agregados, santafe
+
+def _df():
+    return santafe.parsear(list(lineas("santafe")))[0]
+
+def test_como_el_original():
+    r = agregados.resumen_operativo(_df())
+    assert r == ORIGINAL and all(isinstance(v, int) for v in r.values())
+
+def test_sin_clasificacion():
+    df = pd.DataFrame({"debito": [100], "fecha": [pd.Timestamp("2024-01-05")]})
+    assert set(agregados.resumen_operativo(df).values()) == {0}
+    assert agregados.rollup(df).empty and list(agregados.rollup(df).columns) == ["cuenta", "mes", "Clasificación", "debito"]
+
+def test_meses():
+    m = agregados.meses([pd.Timestamp("2024-01-31"), None, "2024-02-01", pd.Timestamp("2023-12-01")])
+    assert m.tolist() == ["2024-01", agregados.SIN_FECHA, "2024-02", "2023-12"]
+
+def test_rollup_por_mes_y_cuenta():
+    df = _df()
+    # el mismo resumen partido en dos "meses" y dos cuentas
+    a = df.assign(fecha=df["fecha"].where(df.index % 2 == 0, pd.Timestamp("2024-04-10")))
+    r = agregados.combinar([agregados.rollup(a, "X"), agregados.rollup(df, "Y")])
+    por_mes = agregados.operativo_por(r[r["cuenta"] == "X"], ("mes",))
+    for mes, grupo in a.groupby(agregados.meses(a["fecha"]).to_numpy()):
+        assert por_mes.loc[mes].to_dict() == agregados.resumen_operativo(grupo)
+    por_cuenta = agregados.operativo_por(r, ("cuenta",))
+    assert por_cuenta.loc["X"].to_dict() == por_cuenta.loc["Y"].to_dict() == ORIGINAL
+    total = agregados.operativo_por(r, ())
+    assert total.iloc[0]["iva21"] == 2 * ORIGINAL["iva21"]
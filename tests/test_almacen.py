@@ -0,0 +1,69 @@
+# Almacén SQLite: lo guardado devuelve los mismos resúmenes que la app (período y
+# operativo) para cualquier rango, sin volver a parsear.
+import pandas as pd
+import pytest
+
+from conftest import lineas
+from parsers import agregados, galicia, santafe
+from parsers.almacen import Almacen
+
+@pytest.fixture
+def almacen(tmp_path):
+    a = Almacen(tmp_path / "mov.sqlite")
+    yield a
+    a.cerrar()
+
+def _santafe(ls=None):
+    return santafe.parsear(list(ls if ls is not None else lineas("santafe")))
+
+def test_mismo_resumen_que_la_app(almacen):
+    df, res = _santafe()
+    almacen.guardar(df, res, "Cliente", "Banco de Santa Fe", "sf.pdf", hash="h1")
+    p = almacen.resumen_periodo("Cliente")
+    assert {k: p[k] for k in res if k in p} == {k: res[k] for k in p if k in res}
+    assert p["resumenes"] == 1
+    assert almacen.resumen_operativo("Cliente") == agregados.resumen_operativo(df)
+    movs = almacen.movimientos("Cliente")
+    assert len(movs) == len(df)
+    assert movs["debito"].tolist() == df["debito"].tolist() and movs["saldo"].tolist() == df["saldo"].tolist()
+    assert movs["Clasificación"].tolist() == df["Clasificación"].tolist()
+
+def test_volver_a_guardar_reemplaza(almacen):
+    df, res = _santafe()
+    almacen.guardar(df, res, "Cliente", hash="h1")
+    almacen.guardar(df, res, "Cliente", hash="h1")
+    assert almacen.contiene("h1") and len(almacen.resumenes()) == 1
+    assert len(almacen.movimientos()) == len(df)
+
+def test_rango_de_fechas(almacen):
+    df, res = _santafe()
+    almacen.guardar(df, res, "Cliente", hash="h1")
+    desde, hasta = "2024-03-02", "2024-03-02"
+    en = df[(df["fecha"] >= desde) & (df["fecha"] <= hasta)]
+    p = almacen.resumen_periodo("Cliente", desde, hasta)
+    assert (p["total_debitos"], p["total_creditos"]) == (int(en["debito"].sum()), int(en["credito"].sum()))
+    assert len(almacen.movimientos("Cliente", desde, hasta)) == len(en)
+    assert almacen.resumen_operativo("Cliente", desde, hasta) == agregados.resumen_operativo(en)
+    assert almacen.movimientos("Cliente", "2030-01-01").empty
+
+def test_cuentas_y_rollup(almacen):
+    (ds, rs), (dg, rg) = _santafe(), galicia.parsear(lineas("galicia"))
+    dg = dg.assign(**{"Clasificación": "Otros"})
+    almacen.guardar(ds, rs, "A", hash="sf")
+    almacen.guardar(dg, rg, "B", hash="gal")
+    assert almacen.cuentas() == ["A", "B"]
+    assert almacen.resumen_periodo("B")["total_debitos"] == rg["total_debitos"]
+    esperado = agregados.combinar([agregados.rollup(ds, "A"), agregados.rollup(dg, "B")])
+    clave = ["cuenta", "mes", "Clasificación"]
+    r = almacen.rollup().sort_values(clave).reset_index(drop=True)
+    assert r.equals(esperado.sort_values(clave).reset_index(drop=True).astype(r.dtypes.to_dict()))
+    por = agregados.operativo_por(almacen.rollup(), ("cuenta",))
+    assert por.loc["A"].to_dict() == agregados.resumen_operativo(ds)
+
+def test_sin_saldo_inicial_queda_null(almacen):
+    df, res = _santafe([x for x in lineas("santafe") if "SALDO ANTERIOR" not in x[1]])
+    almacen.guardar(df, res, "Cliente", hash="h2")
+    p = almacen.resumen_periodo("Cliente")
+    assert p["saldo_inicial"] is None and p["diferencia"] is None and p["cuadra"] is False
+    assert almacen.movimientos("Cliente")["saldo"].isna().all()
+    assert pd.isna(almacen.resumenes().loc[0, "saldo_inicial"])
@@ -0,0 +1,25 @@
+# Lote: un resumen por archivo en la salida y una fila por archivo en
+# resumen_conciliacion.csv; un PDF roto se informa sin cortar la corrida.
+import pandas as pd
+
+from conftest import sintetico
+from parsers import batch
+
+def test_lote_con_un_archivo_roto(tmp_path, capsys):
+    entrada, salida = tmp_path / "pdfs", tmp_path / "salida"
+    entrada.mkdir()
+    for banco in ("santafe", "galicia"):
+        (entrada / f"{banco}.pdf").write_bytes(sintetico(banco))
+    (entrada / "roto.pdf").write_bytes(b"%PDF-1.4 esto no es un pdf")
+    assert batch.main([str(entrada), "-o", str(salida), "-w", "2", "-f", "csv"]) == 2
+    r = pd.read_csv(salida / "resumen_conciliacion.csv", encoding="utf-8-sig").set_index("archivo")
+    assert list(r.columns) == batch.RESUMEN_COLS[1:] and len(r) == 3
+    ok = r.loc[[str(entrada / "santafe.pdf"), str(entrada / "galicia.pdf")]]
+    assert ok["error"].isna().all() and ok["cuadra"].all() and (ok["movimientos"] > 0).all()
+    assert ok["banco"].tolist() == ["Banco de Santa Fe", "Banco Galicia"]
+    assert all((salida / f"{b}.csv").exists() for b in ("santafe", "galicia"))
+    assert isinstance(r.loc[str(entrada / "roto.pdf"), "error"], str)
+    assert "1 con error" in capsys.readouterr().out
+
+def test_sin_pdfs(tmp_path):
+    assert batch.main([str(tmp_path), "-o", str(tmp_path / "salida")]) == 1
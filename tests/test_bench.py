@@ -0,0 +1,49 @@
+# Benchmark: el runner corre sobre los sintéticos, escribe el JSON con las etapas de
+# cada parser y la comparación contra una corrida base marca las regresiones.
+import copy, io, json
+
+import pytest
+
+from bench import run, sinteticos
+from parsers.common import extract_all_lines
+
+ETAPAS = {"santafe": ["deteccion", "extract", "tokenize", "parse", "saldos", "reconstruccion", "clasificacion", "export"],
+          "macro": ["deteccion", "extract", "tokenize", "parse", "saldos", "reconstruccion", "clasificacion", "export"],
+          "galicia": ["deteccion", "extract", "parse", "clasificacion", "export"]}
+
+def _lineas(banco, paginas=1, seed=0):
+    return extract_all_lines(io.BytesIO(sinteticos.generar(banco, paginas, seed)), workers=1)
+
+def test_sinteticos():
+    # determinísticos por semilla (el contenido: reportlab estampa fecha e id en el PDF)
+    assert _lineas("macro", seed=3) == _lineas("macro", seed=3) != _lineas("macro", seed=4)
+    assert {p for p, _ in _lineas("santafe", 3)} == {1, 2, 3}
+    with pytest.raises(ValueError):
+        sinteticos.generar("otro")
+    with pytest.raises(ValueError):
+        sinteticos.generar("macro", 0)
+
+def test_corrida_y_comparacion(tmp_path, capsys):
+    salida = tmp_path / "bench.json"
+    assert run.main(["--bancos", *ETAPAS, "--paginas", "1", "-r", "1", "--sin-memoria", "-o", str(salida)]) == 0
+    r = json.loads(salida.read_text(encoding="utf-8"))
+    assert {"fecha", "python", "pandas", "pdfplumber", "parser_version", "repeticiones"} <= set(r["meta"])
+    assert [(c["banco"], c["paginas"]) for c in r["casos"]] == [(b, 1) for b in ETAPAS]
+    for c in r["casos"]:
+        assert list(c["etapas"]) == ETAPAS[c["banco"]], c["banco"]
+        assert c["paginas_pdf"] == 1 and c["filas"] > 0 and all(e["seg"] >= 0 for e in c["etapas"].values())
+    # contra sí misma no hay regresiones; contra una base mil veces más rápida, sí
+    assert run.comparar(r, r) == []
+    rapida = copy.deepcopy(r)
+    for c in rapida["casos"]:
+        for e in c["etapas"].values(): e["seg"] /= 1000
+    assert "santafe/1/extract" in run.comparar(r, rapida, piso_seg=0)
+    base = tmp_path / "base.json"
+    base.write_text(json.dumps(rapida), encoding="utf-8")
+    assert run.main(["--bancos", "santafe", "--paginas", "1", "-r", "1", "--sin-memoria",
+                     "-o", str(tmp_path / "otra.json"), "--baseline", str(base), "--tolerancia", "0"]) == 1
+    assert "regresiones" in capsys.readouterr().out
+
+def test_memoria():
+    c = run.correr_caso("galicia", 1, repeticiones=1, memoria=True)
+    assert all(e["mem_mb"] > 0 for e in c["etapas"].values())
@@ -0,0 +1,52 @@
+# Cache por contenido: memoria (LRU) + disco compartido entre procesos, con límite de tamaño.
+import os
+
+from parsers.cache import PARSER_VERSION, ResultCache, content_key
+
+def test_clave_por_contenido_y_version():
+    assert content_key(b"pdf") == content_key(b"pdf") != content_key(b"pdf2")
+    assert content_key(b"pdf").endswith(f"-v{PARSER_VERSION}") and content_key(b"pdf", "x") != content_key(b"pdf")
+
+def test_memoria_y_disco(tmp_path):
+    c = ResultCache(tmp_path, mem_items=2)
+    c.put("a", "lineas", [(1, "x")])
+    assert c.get("a", "lineas") == [(1, "x")] and c.get("a", "otra") is None
+    # otra instancia (otro proceso / reinicio): sale del disco
+    assert ResultCache(tmp_path).get("a", "lineas") == [(1, "x")]
+
+def test_lru_en_memoria(tmp_path):
+    c = ResultCache(tmp_path, mem_items=2, disk_max_bytes=0)   # sin disco
+    for k in "abc":
+        c.put(k, "v", k)
+    assert c.get("a", "v") is None and c.get("b", "v") == "b" and c.get("c", "v") == "c"
+    assert not list(tmp_path.glob("*.pkl"))
+
+def test_get_or_compute(tmp_path):
+    c, llamadas = ResultCache(tmp_path), []
+    def f():
+        llamadas.append(1)
+        return 42
+    assert c.get_or_compute("k", "v", f) == c.get_or_compute("k", "v", f) == 42
+    assert len(llamadas) == 1
+    # None también se cachea (distinto de "no está")
+    assert c.get_or_compute("n", "v", lambda: None) is None and c.get("n", "v", "falta") is None
+
+def test_desalojo_en_disco_por_antiguedad(tmp_path):
+    c = ResultCache(tmp_path, mem_items=1, disk_max_bytes=3000)
+    for i, k in enumerate("abc"):
+        c.put(k, "v", b"x" * 1000)
+        os.utime(c._path(k, "v"), (1000 + i, 1000 + i))
+    c.put("d", "v", b"x" * 1000)
+    assert not c._path("a", "v").exists() and c._path("d", "v").exists()
+    assert sum(f.stat().st_size for f in tmp_path.glob("*.pkl")) <= 3000
+
+def test_archivo_roto_es_un_fallo_de_cache(tmp_path):
+    c = ResultCache(tmp_path)
+    c._path("k", "v").write_bytes(b"no es pickle")
+    assert c.get("k", "v", "falta") == "falta"
+
+def test_valor_no_pickleable_no_deja_temporales(tmp_path):
+    c = ResultCache(tmp_path)
+    c.put("k", "v", lambda: None)
+    assert c.get("k", "v") is not None          # en memoria sí queda
+    assert list(tmp_path.iterdir()) == []
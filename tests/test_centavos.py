@@ -0,0 +1,63 @@
+# Conversión a centavos: mismos valores que la conversión original en float
+# (normalize_money / ar_to_float × 100) y exacta donde el float ya no alcanza.
+import random
+
+import numpy as np
+import pandas as pd
+
+from parsers.common import (MONEY_RE, cents_a_pesos, df_pesos, fmt_cents, normalize_money,
+                            normalize_money_cents_arr, res_pesos, vista_pesos)
+from parsers.utils import ar_to_cents, ar_to_float, concilia
+
+def _ar(c: int) -> str:
+    p, r = divmod(abs(c), 100)
+    return f"{p:,}".replace(",", ".") + f",{r:02d}"
+
+def _tokens(n=500, seed=0):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        txt = _ar(rnd.randrange(0, 10**9))
+        out.append(rnd.choice(["", "-"]) + txt + rnd.choice(["", "", "-"]) if rnd.random() < 0.3 else txt)
+    return out + ["0,00", "0,05", "1234,56"]
+
+def test_tokens_como_el_float_original():
+    toks = [t for t in _tokens() if MONEY_RE.fullmatch(t)]
+    cents = normalize_money_cents_arr(toks)
+    assert cents.dtype == np.int64
+    assert cents.tolist() == [round(normalize_money(t) * 100) for t in toks]
+
+def test_ar_to_cents_como_ar_to_float():
+    for t in _tokens(seed=1) + ["$ 1.234,5", "-$1.000", "", None, "abc"]:
+        assert ar_to_cents(t) == round(ar_to_float(t) * 100), t
+
+def test_casos_que_el_float_perdia():
+    # espacios alrededor de la coma (MONEY_RE los acepta) y el signo menos unicode:
+    # la versión en float daba NaN / 0
+    assert normalize_money_cents_arr(["12 , 34", "−5,00"]).tolist() == [1234, -500]
+    assert np.isnan(normalize_money("12 , 34"))
+    assert ar_to_cents("−5,00") == -500 and ar_to_float("−5,00") == 0.0
+
+def test_exacto_en_montos_grandes():
+    t = "98.765.432.109.876,54"
+    assert normalize_money_cents_arr([t]).tolist() == [9876543210987654]
+    assert ar_to_cents(t) == 9876543210987654
+    assert fmt_cents(9876543210987654) == t
+
+def test_sumas_exactas_y_conciliacion_por_igualdad():
+    # 0,10 × 3 − 0,30 en float no da 0; en centavos sí
+    assert sum([0.1, 0.1, 0.1]) - 0.3 != 0
+    ok, calc, diff = concilia(0, int(normalize_money_cents_arr(["0,10"] * 3).sum()), 30, 0)
+    assert ok and calc == 0 and diff == 0
+    assert concilia(0, 1, 0, 0)[0] is False
+
+def test_bordes_en_pesos():
+    assert [fmt_cents(c) for c in (0, 5, -123456, None, pd.NA, np.int64(100))] == \
+        ["0,00", "0,05", "-1.234,56", "—", "—", "1,00"]
+    assert cents_a_pesos(None) is None and cents_a_pesos(12345) == 123.45
+    df = pd.DataFrame({"debito": [150, 0], "saldo": pd.array([1000, pd.NA], dtype="Int64"), "descripcion": ["a", "b"]})
+    p = df_pesos(df)
+    assert p["debito"].tolist() == [1.5, 0.0] and p["saldo"].iloc[0] == 10.0 and np.isnan(p["saldo"].iloc[1])
+    assert vista_pesos(df)["saldo"].tolist() == ["10,00", "—"]
+    assert res_pesos({"saldo_inicial": None, "total_debitos": 250, "cuadra": False}) == \
+        {"saldo_inicial": None, "total_debitos": 2.5, "cuadra": False}
@@ -0,0 +1,119 @@
+# Clasificación por columnas: mismas etiquetas que la versión fila a fila
+# (common.clasificar / santafe.clasificar) y que el parser original.
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import lineas
+from originales import SANTAFE_CLASIFICACION as ORIGINAL_SANTAFE
+from parsers import common, dispatch, santafe
+from parsers.clasificacion import (CacheClasificacion, _textos, clasificar_columnas, clasificar_df,
+                                   lee_numeros_largos, version_reglas)
+
+def _fila_a_fila(df, clasificar):
+    return [clasificar(str(r.descripcion), str(r.desc_norm), r.debito, r.credito) for r in df.itertuples()]
+
+def test_santafe_como_el_original():
+    df, _ = santafe.parsear(list(lineas("santafe")))
+    assert df["Clasificación"].value_counts().to_dict() == ORIGINAL_SANTAFE
+    assert df["Clasificación"].tolist() == _fila_a_fila(df, santafe.clasificar)
+
+@pytest.mark.parametrize("banco", ["nacion", "macro", "santander"])
+def test_generico_fila_a_fila(banco):
+    df, _ = dispatch.cargar(banco).parsear(list(lineas(banco)))
+    assert list(clasificar_df(df)) == _fila_a_fila(df, common.clasificar)
+
+def test_signos_y_textos_raros():
+    df = pd.DataFrame({
+        "descripcion": ["IMPTRANS 123456789", "TRANSF", "TRANSF", "", None, "SIRCREB", "IVA 21%"],
+        "desc_norm": ["IMPTRANS", "TRANSF", "TRANSF", "", None, "SIRCREB", "IVA 21%"],
+        "debito": [100, 0, 250, 0, 0, np.nan, 5],
+        "credito": [0, 900, 0, 0, 10, 0, 0],
+    })
+    esperado = _fila_a_fila(df, common.clasificar)
+    assert list(clasificar_columnas(df["descripcion"], df["desc_norm"], df["debito"], df["credito"])) == esperado
+    assert len(clasificar_columnas([], [], [], [])) == 0
+
+def test_version_de_las_reglas():
+    v = version_reglas(common.REGLAS)
+    assert v == version_reglas(common.REGLAS) and v != version_reglas(santafe.REGLAS)
+    otra = tuple((e + " (bis)" if i == 0 else e, p, s) for i, (e, p, s) in enumerate(common.REGLAS))
+    assert version_reglas(otra) != v
+
+# --- cache persistente (SQLite) ---
+
+def _frame(banco="nacion"):
+    return dispatch.cargar(banco).parsear(list(lineas(banco)))[0]
+
+def test_cache_mismas_etiquetas_y_aciertos(tmp_path):
+    cache, df = CacheClasificacion(tmp_path / "c.sqlite"), _frame()
+    sin_cache = list(clasificar_df(df))
+    assert list(clasificar_df(df, common.REGLAS, "nacion", cache)) == sin_cache
+    assert cache.aciertos == 0 and cache.consultas > 0
+    # otro proceso (otra instancia, misma base): todo sale de SQLite
+    otra = CacheClasificacion(tmp_path / "c.sqlite")
+    assert list(clasificar_df(df, common.REGLAS, "nacion", otra)) == sin_cache
+    assert otra.tasa() == 1.0
+    assert otra.estadisticas()["textos"] == {"nacion": cache.consultas}
+
+def test_cache_ignora_numeros_largos(tmp_path):
+    cache = CacheClasificacion(tmp_path / "c.sqlite")
+    a = cache.clasificar(["TRANSF 20123456789"], ["TRANSF"], [100], [0], banco="x")
+    b = cache.clasificar(["TRANSF 27999888777"], ["TRANSF"], [100], [0], banco="x")
+    assert list(a) == list(b) and cache.aciertos == 1
+    # el signo entra en la clave: mismo texto como crédito se evalúa aparte
+    cache.clasificar(["TRANSF 20123456789"], ["TRANSF"], [0], [100], banco="x")
+    assert cache.aciertos == 1
+
+@pytest.mark.parametrize("reglas", [common.REGLAS, santafe.REGLAS_SANTAFE], ids=["comunes", "santafe"])
+def test_ninguna_regla_lee_numeros_largos(reglas):
+    # el cache une descripciones que sólo difieren en un número largo: si una regla
+    # empieza a mirar CBU / CUIT / nro. de operación, esto tiene que fallar (y el cache
+    # pasa solo a usar la descripción entera)
+    for _, pred, _ in reglas:
+        for t in _textos(pred):
+            if isinstance(t, str):
+                assert not common.LONG_INT_RE.search(t), t
+            else:
+                assert not any(t.search(x) for x in ("123456", "20123456789", "0170123456789012345678")), t.pattern
+    assert not lee_numeros_largos(reglas)
+
+def test_cache_con_regla_que_lee_numeros(tmp_path):
+    cbu = common._re.compile(r"CBU\s*0170\d{18}")
+    reglas = (("Cuenta propia", lambda u, n: bool(cbu.search(u)), None),) + tuple(common.REGLAS)
+    assert lee_numeros_largos(reglas)
+    cache = CacheClasificacion(tmp_path / "c.sqlite")
+    descs = ["TRANSF CBU 0170" + "1" * 18, "TRANSF CBU 0999" + "1" * 18]
+    for d in descs:
+        cache.clasificar([d], ["TRANSF CBU"], [100], [0], reglas, banco="x")
+    assert cache.aciertos == 0
+    assert list(cache.clasificar(descs, ["TRANSF CBU"] * 2, [100] * 2, [0] * 2, reglas, banco="x")) == ["Cuenta propia", "Débito"]
+
+def test_cache_no_junta_palabras_al_sacar_numeros(tmp_path):
+    # "IVA 123456 GRAL" no es "IVA GRAL" para la regla de Santa Fe (busca el texto seguido)
+    cache = CacheClasificacion(tmp_path / "c.sqlite")
+    descs, norm = ["IVA GRAL", "IVA 123456 GRAL"], ["IVA GRAL", "IVA GRAL"]
+    esperado = list(clasificar_columnas(descs, norm, [100, 100], [0, 0], santafe.REGLAS_SANTAFE))
+    assert esperado == ["IVA 21% (sobre comisiones)", "Débito"]
+    for i in (0, 1):
+        assert list(cache.clasificar(descs[i:i + 1], norm[i:i + 1], [100], [0], santafe.REGLAS_SANTAFE, banco="x")) == esperado[i:i + 1]
+
+def test_cambio_de_reglas_borra_lo_viejo(tmp_path):
+    cache, df = CacheClasificacion(tmp_path / "c.sqlite"), _frame()
+    clasificar_df(df, common.REGLAS, "nacion", cache)
+    # regla nueva al frente: todo "Otros"; no puede salir nada de la versión anterior
+    reglas = (("Otros", None, None),) + tuple(common.REGLAS)
+    assert set(clasificar_df(df, reglas, "nacion", cache)) == {"Otros"}
+    assert cache.aciertos == 0
+    con = cache._conectar()
+    try:
+        versiones = {v for (v,) in con.execute("SELECT DISTINCT version FROM clasificacion")}
+    finally:
+        con.close()
+    assert versiones == {version_reglas(reglas)}
+
+def test_base_inaccesible_no_rompe(tmp_path):
+    (tmp_path / "dir.sqlite").mkdir()   # no se puede abrir como base
+    cache, df = CacheClasificacion(tmp_path / "dir.sqlite"), _frame()
+    cache._creada = True
+    assert list(clasificar_df(df, common.REGLAS, "nacion", cache)) == list(clasificar_df(df))
@@ -0,0 +1,49 @@
+# Salida columnar: Parquet y Arrow IPC devuelven los mismos movimientos (montos en
+# centavos, sin pasar por float) con tipos compactos y los metadatos del resumen.
+import io
+
+import pandas as pd
+import pytest
+
+from conftest import lineas
+from parsers import columnar, santafe
+
+pytest.importorskip("pyarrow")
+
+def _df():
+    return santafe.parsear(list(lineas("santafe")))[0]
+
+def _igual(a: pd.DataFrame, b: pd.DataFrame):
+    # mismos valores; las categóricas vuelven como category
+    pd.testing.assert_frame_equal(a, b.astype(a.dtypes.to_dict()))
+
+def test_parquet_ida_y_vuelta(tmp_path):
+    df = _df()
+    destino = columnar.guardar_parquet(df, str(tmp_path / "sf.parquet"), {"banco": "santafe", "hash": "h1"})
+    leido = columnar.leer_parquet(destino)
+    assert leido["debito"].dtype == "int64" and leido["pagina"].dtype == "int16"
+    assert isinstance(leido["Clasificación"].dtype, pd.CategoricalDtype)
+    _igual(leido, df)
+    meta = columnar.metadatos(destino)
+    assert meta["banco"] == "santafe" and meta["hash"] == "h1" and meta["montos"] == "centavos"
+    assert columnar.leer_parquet(io.BytesIO(columnar.parquet_bytes(df)), ["saldo"])["saldo"].tolist() == df["saldo"].tolist()
+
+def test_arrow_ida_y_vuelta(tmp_path):
+    df = _df()
+    destino = columnar.guardar_arrow(df, tmp_path / "sf.arrow", {"banco": "santafe"})
+    _igual(columnar.leer_arrow(destino), df)
+    assert columnar.metadatos(destino)["banco"] == "santafe"
+    assert columnar.leer_arrow(destino, ["debito"], pandas=False).column_names == ["debito"]
+
+def test_carpeta_con_schema_compartido(tmp_path):
+    df = _df()
+    a, b = df.iloc[:40], df.iloc[40:]
+    columnar.guardar_parquet(a, str(tmp_path / "a.parquet"))
+    columnar.guardar_parquet(b, str(tmp_path / "b.parquet"))
+    todo = columnar.leer_carpeta(tmp_path, ["orden", "debito"]).sort_values("orden", ignore_index=True)
+    assert todo["debito"].tolist() == df.sort_values("orden")["debito"].tolist()
+
+def test_no_compacta_fuera_de_rango():
+    df = pd.DataFrame({"pagina": [1, 40000], "mcount": [1, None], "signo": ["debito", "credito"]})
+    c = columnar.compactar(df)
+    assert c["pagina"].dtype == "int64" and c["mcount"].dtype == "float64" and c["signo"].dtype == "category"
@@ -0,0 +1,64 @@
+# Consolidación: duplicados del borde entre resúmenes consecutivos, continuidad del
+# saldo y parsers sin desc_norm (Galicia).
+import numpy as np
+import pandas as pd
+
+from conftest import lineas
+from parsers import galicia, santafe
+from parsers.consolidar import Libro, consolidar
+
+def _santafe():
+    return santafe.parsear(list(lineas("santafe")))
+
+def _galicia():
+    return galicia.parsear(lineas("galicia"))
+
+def _tramo(df, res, a, b):
+    # filas [a, b) de un resumen como si fueran un resumen aparte (saldos en centavos)
+    imp = (df["credito"] - df["debito"]).to_numpy()
+    ini = res["saldo_inicial"] + int(imp[:a].sum())
+    return df.iloc[a:b].reset_index(drop=True), {**res, "saldo_inicial": ini, "saldo_pdf": ini + int(imp[a:b].sum())}
+
+def test_descarta_el_borde_repetido():
+    df, res = _santafe()
+    movs = df.iloc[1:].reset_index(drop=True)   # sin la fila SALDO ANTERIOR
+    partes = [(*_tramo(movs, res, 0, 50), "m1"), (*_tramo(movs, res, 40, len(movs)), "m2")]
+    libro = consolidar(partes[::-1])
+    assert len(libro) == len(movs)
+    assert [c["duplicados"] for c in libro.resumenes] == [0, 10]
+    assert libro.continuo() and libro.saldo_final == res["saldo_pdf"]
+    assert libro.df["saldo"].tolist() == movs["saldo"].tolist()
+
+def test_salto_de_saldo():
+    df, res = _santafe()
+    movs = df.iloc[1:].reset_index(drop=True)
+    libro = consolidar([(*_tramo(movs, res, 0, 30), "a"), (*_tramo(movs, res, 40, len(movs)), "b")])
+    falta = int((movs["credito"] - movs["debito"]).iloc[30:40].sum())
+    assert not libro.continuo() and libro.resumenes[1]["diferencia"] == falta
+
+def test_galicia_sin_desc_norm():
+    df, res = _galicia()
+    assert "desc_norm" not in df.columns
+    libro = consolidar([(*_tramo(df, res, 40, len(df)), "g2"), (*_tramo(df, res, 0, 50), "g1")])
+    assert len(libro) == len(df) and libro.resumenes[1]["duplicados"] == 10
+    assert libro.continuo()
+
+def test_galicia_con_otro_banco(tmp_path):
+    (dg, rg), (ds, rs) = _galicia(), _santafe()
+    libro = consolidar([(dg, rg, "galicia"), (ds, rs, "santafe")])
+    assert {c["resumen"] for c in libro.resumenes} == {"galicia", "santafe"}
+    assert sum(c["duplicados"] for c in libro.resumenes) == 0
+    assert (libro.df["resumen"] == "galicia").sum() == len(dg)
+    # ida y vuelta por Parquet: las claves guardadas siguen descartando lo ya visto
+    otro = Libro.cargar(libro.guardar(tmp_path / "libro.parquet"))
+    assert np.array_equal(otro.df["clave"].to_numpy(), libro.df["clave"].to_numpy())
+    corte = otro.agregar(*_tramo(dg, rg, 0, 20), "galicia-bis")
+    assert corte["duplicados"] == 20 and corte["movimientos"] == 0
+
+def test_sin_saldo_inicial_no_inventa_continuidad():
+    df, res = _santafe()
+    movs = df.iloc[1:].reset_index(drop=True)
+    b_df, b_res = _tramo(movs, res, 40, len(movs))
+    b_df["saldo"] = pd.array([pd.NA] * len(b_df), dtype="Int64")
+    libro = consolidar([(*_tramo(movs, res, 0, 40), "a"), (b_df, {**b_res, "saldo_inicial": None}, "b")])
+    assert libro.resumenes[1]["diferencia"] is None and not libro.continuo()
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+
+from conftest import lineas
+from parsers import detect
+
+BANCOS = ("santafe", "nacion", "macro", "santander", "galicia")
+
+def _por_hint(texto: str) -> dict:
+    # puntaje de referencia: cada hint se busca por separado (como el detector original)
+    scores = dict.fromkeys(detect.BANK_SLUG, 0)
+    for pat, peso, bancos in detect.HINTS:
+        if re.search(pat, texto, re.I):
+            for b in bancos: scores[b] += peso
+    return scores
+
+@pytest.mark.parametrize("banco", BANCOS)
+def test_detecta_banco_sintetico(banco):
+    paginas = list(detect.paginas_de_lineas(lineas(banco)))
+    r = detect.detectar_banco(paginas)
+    assert r["slug"] == banco
+    assert r["paginas_leidas"] == 1          # decide con la primera página
+    assert r["confianza"] > 0
+
+@pytest.mark.parametrize("banco", BANCOS)
+def test_puntajes_iguales_a_contar_hint_por_hint(banco):
+    texto = "\n".join(l for _, l in lineas(banco))
+    assert detect.detectar_banco([texto], margen=float("inf"))["puntajes"] == _por_hint(texto)
+
+def test_hint_contenido_en_otro_hint_se_cuenta():
+    # "BANCO DE SANTA FE" dentro de "NUEVO BANCO DE SANTA FE", "SALDO ANTERIOR" pegado
+    texto = "RESUMEN DE CUENTA CORRIENTE BANCARIA NUEVO BANCO DE SANTA FE SALDO ANTERIOR IVA GRAL"
+    assert detect.detectar_banco([texto], margen=float("inf"))["puntajes"] == _por_hint(texto)
+
+def test_hints_no_empiezan_en_la_misma_posicion():
+    # HINTS_RE reporta un solo hint por posición: ningún hint literal puede matchear
+    # también otro patrón de la tabla en su comienzo
+    literales = {h for hs in (detect.BANK_MACRO_HINTS, detect.BANK_SANTAFE_HINTS, detect.BANK_NACION_HINTS,
+                              detect.BANK_GALICIA_HINTS, detect.BANK_SANTANDER_HINTS) for h in hs}
+    for h in literales:
+        propios = [p for p, _, _ in detect.HINTS if re.fullmatch(p, h, re.I)]
+        otros = [p for p, _, _ in detect.HINTS if p not in propios and re.match(p, h, re.I)]
+        assert not otros, (h, otros)
+
+def test_sin_hints_no_identificado():
+    r = detect.detectar_banco(["nada que ver"])
+    assert r["banco"] == detect.NO_IDENTIFICADO and r["slug"] is None and r["confianza"] == 0.0
+
+def test_version_cambia_con_la_tabla(monkeypatch):
+    v = detect.version()
+    monkeypatch.setattr(detect, "MARGEN_CORTE", detect.MARGEN_CORTE + 1)
+    assert detect.version() != v
+
+def test_cache_de_deteccion_depende_de_la_version(monkeypatch, cache_vacio):
+    from conftest import sintetico
+    from parsers import pipeline
+    data = sintetico("nacion")
+    assert pipeline.procesar(data, hasta="clasificacion", cache=cache_vacio)["estados"]["deteccion"] == "calculada"
+    assert pipeline.procesar(data, hasta="clasificacion", cache=cache_vacio)["estados"]["deteccion"] == "cache"
+    monkeypatch.setattr(detect, "PESO_HINT", 2)
+    assert pipeline.procesar(data, hasta="clasificacion", cache=cache_vacio)["estados"]["deteccion"] == "calculada"
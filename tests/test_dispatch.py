@@ -0,0 +1,37 @@
+# Registro de parsers por slug con import diferido: el arranque de la app no carga
+# pdfplumber / reportlab / xlsxwriter, y cada banco se importa recién al usarlo.
+import subprocess, sys
+from pathlib import Path
+
+from parsers import dispatch, generico
+
+RAIZ = Path(__file__).resolve().parent.parent
+PESADOS = ("pdfplumber", "reportlab", "xlsxwriter")
+
+def _cargados(codigo: str) -> list[str]:
+    # módulos en sys.modules después de correr `codigo` en un intérprete nuevo
+    r = subprocess.run([sys.executable, "-c", f"import sys\n{codigo}\nprint(' '.join(sys.modules))"],
+                       cwd=RAIZ, capture_output=True, text=True, check=True)
+    return r.stdout.split()
+
+def test_arranque_de_la_app_sin_dependencias_pesadas():
+    # imports de nivel superior de app.py, más los que corren al subir un PDF
+    m = _cargados("import streamlit\nfrom parsers.cache import CACHE, content_key\nfrom parsers import perf, dispatch, pipeline\n"
+                  "from parsers import common, santafe, agregados, clasificacion, plantillas")
+    assert not [x for x in PESADOS if x in m]
+    assert not [s for s in dispatch.PARSERS if f"parsers.{s}" in m and s != "santafe"]
+
+def test_un_banco_se_importa_al_usarlo():
+    m = _cargados("from parsers import dispatch\ndispatch.cargar('macro')")
+    assert "parsers.macro" in m and "parsers.generico" in m
+    assert not {"parsers.nacion", "parsers.santander", "parsers.galicia", "parsers.santafe"} & set(m)
+    assert not [x for x in PESADOS if x in m]
+
+def test_registro(monkeypatch):
+    monkeypatch.setitem(dispatch.PARSERS, "otro", ".generico")
+    assert dispatch.cargar("otro") is generico and dispatch.cargar("desconocido") is generico
+    dispatch.registrar_parser("otro", ".nacion")
+    assert dispatch.get_parser("otro").__module__ == "parsers.nacion"
+    for slug in dispatch.PARSERS:
+        mod = dispatch.cargar(slug)
+        assert callable(mod.parsear) and callable(mod.render)
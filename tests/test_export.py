@@ -0,0 +1,43 @@
+# Excel en constant_memory: leído de vuelta, montos en pesos (no centavos), celdas
+# vacías para NA, fechas como fechas y una fila por movimiento.
+import io
+
+import pandas as pd
+import pytest
+
+from conftest import lineas
+from parsers import export, santafe
+
+pytest.importorskip("xlsxwriter")
+pytest.importorskip("openpyxl")
+
+def _leer(xlsx: bytes) -> pd.DataFrame:
+    return pd.read_excel(io.BytesIO(xlsx), sheet_name="Movimientos", engine="openpyxl")
+
+def test_ida_y_vuelta():
+    df, _ = santafe.parsear(list(lineas("santafe")))
+    x = _leer(export.excel_bytes(df))
+    assert list(x.columns) == list(df.columns) and len(x) == len(df)
+    for c in ("debito", "credito", "saldo"):
+        assert (x[c] * 100).round().astype("int64").tolist() == df[c].tolist(), c
+    assert pd.api.types.is_datetime64_any_dtype(x["fecha"]) and x["fecha"].tolist() == df["fecha"].tolist()
+    assert x["descripcion"].tolist() == df["descripcion"].tolist()
+    # saldo_pdf (Int64) vacío donde el PDF no traía saldo
+    assert x["saldo_pdf"].isna().tolist() == df["saldo_pdf"].isna().tolist()
+
+def test_celdas_vacias():
+    df = pd.DataFrame({"fecha": pd.to_datetime(["2024-03-01", None]), "descripcion": ["DEP", None],
+                       "debito": pd.array([12345, pd.NA], dtype="Int64"), "cuadra": [True, False]})
+    x = _leer(export.excel_bytes(df))
+    assert len(x) == 2 and x.loc[0, "debito"] == 123.45 and x.loc[0, "fecha"] == pd.Timestamp("2024-03-01")
+    assert x.loc[1, ["fecha", "descripcion", "debito"]].isna().all()
+    assert x["cuadra"].tolist() == [True, False]
+
+def test_archivo_y_anchos(tmp_path):
+    df = pd.DataFrame({"descripcion": ["x" * 100, "corta"], "n": [1, 22]})
+    export.escribir_excel(df, str(tmp_path / "m.xlsx"))
+    assert _leer((tmp_path / "m.xlsx").read_bytes()).equals(df)
+    assert export.anchos_columnas(df) == [export.MAX_ANCHO, 4]
+    # la muestra incluye la última fila
+    largo = pd.DataFrame({"c": ["a"] * 20 + ["b" * 30]})
+    assert export.anchos_columnas(largo, muestra=5) == [32]
@@ -0,0 +1,43 @@
+# Galicia: totales en centavos contra el parser original, montos con y sin separador
+# de miles y fechas dd/mm con el año del período.
+import pandas as pd
+
+from conftest import lineas
+from originales import GALICIA as ORIGINAL
+from parsers import galicia
+
+def _parse(*textos):
+    return galicia.parse_lineas_galicia(textos)
+
+def test_centavos_como_el_original():
+    df, res = galicia.parsear(lineas("galicia"))
+    assert len(df) == ORIGINAL["filas"]
+    for k in ("saldo_inicial", "total_creditos", "total_debitos", "saldo_pdf"):
+        assert res[k] == ORIGINAL[k], k
+    assert res["cuadra"] and res["diferencia"] == 0
+    assert (df["importe"] == df["credito"] - df["debito"]).all()
+
+def test_montos_sin_separador_de_miles():
+    res, df = _parse("Período: 01/03/2024 al 31/03/2024", "01/03 PAGO 1234,56", "02/03 PAGO -1234,56",
+                     "03/03 PAGO 1.234,56", "04/03 COMPRA -$ 58.075,10", "05/03 REF 123456 TRANSF 12,00")
+    assert df["credito"].tolist() == [123456, 0, 123456, 0, 1200]
+    assert df["debito"].tolist() == [0, 123456, 0, 5807510, 0]
+    assert res["total_creditos"] == 248112 and res["total_debitos"] == 5930966
+
+def test_lineas_que_no_son_movimientos():
+    res, df = _parse("Saldo inicial $ 1.000,00", "Período: 01/03/2024 al 31/03/2024", "CBU 0070999 01/03", "Saldo final $ 1.000,00")
+    assert df.empty and res["saldo_inicial"] == res["saldo_pdf"] == 100000 and res["cuadra"]
+
+def test_fechas_del_periodo():
+    _, df = _parse("Período: 01/03/2024 al 31/03/2024", "15/03 PAGO 1,00")
+    assert df["fecha"].tolist() == [pd.Timestamp("2024-03-15")]
+
+def test_periodo_que_cruza_el_anio():
+    _, df = _parse("Periodo 15/12/2023 - 14/01/2024", "20/12 PAGO 1,00", "05/01 PAGO 2,00")
+    assert df["fecha"].tolist() == [pd.Timestamp("2023-12-20"), pd.Timestamp("2024-01-05")]
+
+def test_dia_inexistente_y_sin_periodo():
+    _, df = _parse("Emitido el 10/02/2024", "30/02 PAGO 1,00", "29/02 PAGO 2,00")
+    assert pd.isna(df["fecha"].iloc[0]) and df["fecha"].iloc[1] == pd.Timestamp("2024-02-29")
+    _, df = _parse("01/03 PAGO 1,00")
+    assert df["fecha"].isna().all() and df["credito"].tolist() == [100]
@@ -0,0 +1,44 @@
+# Parser genérico por columnas (Nación, Macro, Santander) contra el parser original
+# fila a fila sobre los mismos sintéticos: totales, saldos y una suma ponderada por
+# posición de cada columna (detecta filas cambiadas de lugar o de signo).
+import numpy as np
+import pytest
+
+from conftest import lineas
+from originales import GENERICO as ORIGINAL
+from parsers import dispatch, generico
+
+def _ponderado(s) -> int:
+    return int((np.arange(1, len(s) + 1) * s.to_numpy(dtype=np.int64)).sum())
+
+@pytest.mark.parametrize("banco", sorted(ORIGINAL))
+def test_como_el_original(banco):
+    o = ORIGINAL[banco]
+    df, res = dispatch.cargar(banco).parsear(list(lineas(banco)))
+    assert len(df) == o["filas"]
+    assert (res["total_debitos"], res["total_creditos"]) == (o["debitos"], o["creditos"])
+    assert (res["saldo_inicial"], res["saldo_pdf"]) == (o["saldo_inicial"], o["saldo_final"])
+    assert tuple(_ponderado(df[c]) for c in ("debito", "credito", "saldo")) == o["ponderado"]
+    assert df["Clasificación"].value_counts().to_dict() == o["clasif"]
+    assert res["saldo_calc"] == res["saldo_inicial"] + res["total_creditos"] - res["total_debitos"]
+    assert res["cuadra"] == (res["diferencia"] == 0)
+
+def test_santander_corta_el_detalle_impositivo():
+    ls = list(lineas("santander"))
+    df, _ = dispatch.cargar("santander").parsear(ls)
+    assert any("DETALLE IMPOSITIVO" in l.upper() for _, l in ls)
+    assert len(dispatch.cargar("nacion").parsear(ls)[0]) > len(df)
+
+@pytest.mark.parametrize("fecha", ["0{}/03/2024", "3{}/13/2024"])
+def test_saldo_inicial_por_la_fila_de_apertura(fecha):
+    # con fechas que no se pueden leer (NaT) la apertura sigue siendo la primera fila y el
+    # saldo inicial es el suyo: el primer débito mal leído como crédito no cuadra
+    ls = [(1, "SALDO ANTERIOR 1.000,00"), (1, f"{fecha.format(1)} COMISION 50,00 950,00"),
+          (1, f"{fecha.format(2)} DEP EFEC 100,00 1.050,00"), (1, "SALDO FINAL 1.050,00")]
+    df, res = dispatch.cargar("nacion").parsear(ls)
+    assert df["descripcion"].tolist() == ["SALDO ANTERIOR", "COMISION", "DEP EFEC"]
+    assert res["saldo_inicial"] == 100000 and res["saldo_pdf"] == 105000
+    assert res["cuadra"] is False and res["diferencia"] != 0
+    # la conciliación no depende de que la apertura esté en la posición 0
+    otro_orden = generico.conciliar_generico(df.iloc[[1, 2, 0]], 105000)
+    assert otro_orden == generico.conciliar_generico(df, 105000) == res
@@ -0,0 +1,50 @@
+# Reconstrucción de líneas en una pasada sobre page.chars: mismas líneas que
+# extract_text y mismo resultado de parseo que el motor anterior (texto + palabras).
+import io
+
+import pytest
+
+from conftest import lineas, sintetico
+from parsers import dispatch
+from parsers.common import PARALLEL_MIN_PAGES, extract_all_lines, iter_lines, lines_from_chars, lines_from_text, open_pdf
+
+BANCOS = ("santafe", "nacion", "macro", "santander", "galicia")
+
+@pytest.mark.parametrize("banco", BANCOS)
+def test_chars_como_extract_text(banco):
+    with open_pdf(io.BytesIO(sintetico(banco))) as pdf:
+        for p in pdf.pages:
+            assert [l for l in lines_from_chars(p) if l] == [l for l in lines_from_text(p) if l and l.strip()]
+
+@pytest.mark.parametrize("banco", BANCOS)
+def test_mismo_parseo_que_legacy(banco):
+    legacy = extract_all_lines(io.BytesIO(sintetico(banco)), workers=1, engine="legacy")
+    m = dispatch.cargar(banco)
+    (d1, r1), (d2, r2) = m.parsear(list(lineas(banco))), m.parsear(legacy)
+    assert r1 == r2 and d1.equals(d2)
+
+# Extracción en streaming: las mismas (página, línea) que la lista, generadas de a una página.
+@pytest.mark.parametrize("banco", BANCOS)
+def test_streaming_como_la_lista(banco):
+    assert list(iter_lines(io.BytesIO(sintetico(banco)))) == list(lineas(banco))
+
+def test_streaming_pagina_por_pagina():
+    avance = []
+    it = iter_lines(io.BytesIO(sintetico("santafe", 3)), progreso=lambda i, n: avance.append((i, n)))
+    pagina, _ = next(it)
+    # la primera línea sale antes de leer la página siguiente
+    assert pagina == 1 and avance == [(1, 3)]
+    assert {p for p, _ in it} == {1, 2, 3} and avance == [(1, 3), (2, 3), (3, 3)]
+
+# Extracción en paralelo: mismas (página, línea) y en el mismo orden que en un proceso.
+@pytest.mark.parametrize("banco", ["santafe", "santander"])
+def test_paralelo_como_un_proceso(banco):
+    n = PARALLEL_MIN_PAGES + 2
+    data, avance = sintetico(banco, n), {1: [], 2: []}
+    out = {w: extract_all_lines(io.BytesIO(data), workers=w, progreso=lambda i, total, w=w: avance[w].append((i, total)))
+           for w in (1, 2)}
+    assert out[2] == out[1] and {p for p, _ in out[1]} == set(range(1, n + 1))
+    assert avance[1] == [(i, n) for i in range(1, n + 1)]
+    # en paralelo avisa una vez por rango (2 por worker), con las páginas hechas hasta n
+    hechas = [i for i, _ in avance[2]]
+    assert len(hechas) == 4 and hechas == sorted(hechas) and avance[2][-1] == (n, n)
@@ -0,0 +1,70 @@
+# Registro por etapas: etapas en orden de cierre, anidadas dentro de la externa, log
+# JSON por línea y pico de memoria sólo cuando nadie más usa tracemalloc.
+import json, threading, tracemalloc
+
+import pytest
+
+from parsers import perf
+
+def test_etapas_y_log(tmp_path):
+    log = tmp_path / "perf.jsonl"
+    with perf.registrar("prueba", log=str(log), archivo="x.pdf") as reg:
+        assert perf.actual() is reg
+        with perf.etapa("extraccion", paginas=2) as e:
+            with perf.etapa("parseo") as p:
+                p["filas"] = 10
+            e["lineas"] = 5
+    assert perf.actual() is None
+    interna, externa = reg.etapas
+    assert (interna["etapa"], externa["etapa"]) == ("parseo", "extraccion")
+    assert externa["wall_s"] >= interna["wall_s"] and externa["paginas"] == 2 and externa["lineas"] == 5
+    assert interna["filas"] == 10 and {"wall_s", "cpu_s"} <= set(interna)
+    d = json.loads(log.read_text(encoding="utf-8"))
+    assert {"fecha", "nombre", "archivo", "total_s", "etapas"} <= set(d)
+    assert d["nombre"] == "prueba" and d["archivo"] == "x.pdf" and [x["etapa"] for x in d["etapas"]] == ["parseo", "extraccion"]
+    assert list(reg.como_df()["etapa"]) == ["parseo", "extraccion"]
+
+def test_error_queda_en_el_registro(tmp_path):
+    log = tmp_path / "perf.jsonl"
+    with pytest.raises(ValueError):
+        with perf.registrar("prueba", log=str(log)):
+            with perf.etapa("parseo"):
+                raise ValueError("roto")
+    d = json.loads(log.read_text(encoding="utf-8"))
+    assert d["error"] == "ValueError: roto" and d["etapas"][0]["etapa"] == "parseo"
+    assert perf.actual() is None
+
+def test_sin_registro_no_hace_nada():
+    with perf.etapa("suelta", filas=1) as e:
+        assert e == {"etapa": "suelta", "filas": 1}
+
+def test_memoria_solo_la_externa():
+    with perf.registrar("m", log="", memoria=True) as reg:
+        with perf.etapa("externa"):
+            with perf.etapa("interna"):
+                _ = [0] * 100_000
+    interna, externa = reg.etapas
+    assert "mem_pico_mb" not in interna and externa["mem_pico_mb"] >= 0.8
+    assert not tracemalloc.is_tracing()
+
+def test_memoria_con_registros_en_paralelo():
+    # otro hilo con su registro abierto: ninguno informa un pico que mezcla a los dos
+    adentro, seguir, regs = threading.Event(), threading.Event(), {}
+    def otro():
+        with perf.registrar("otro", log="", memoria=True) as reg:
+            regs["otro"] = reg
+            with perf.etapa("lenta"):
+                adentro.set(); seguir.wait(5)
+    t = threading.Thread(target=otro); t.start()
+    assert adentro.wait(5)
+    with perf.registrar("este", log="", memoria=True) as reg:
+        with perf.etapa("rapida"):
+            _ = [0] * 100_000
+    seguir.set(); t.join()
+    assert "mem_pico_mb" not in reg.etapas[0] and "mem_pico_mb" not in regs["otro"].etapas[0]
+    assert not tracemalloc.is_tracing()
+    # ya solo, vuelve a medir
+    with perf.registrar("solo", log="", memoria=True) as reg:
+        with perf.etapa("x"):
+            pass
+    assert "mem_pico_mb" in reg.etapas[0]
@@ -0,0 +1,41 @@
+# Pipeline por etapas: mismo resultado que el parser directo y, con cache, sólo se
+# recalculan las etapas cuya versión (o la de una anterior) cambió.
+from conftest import lineas, sintetico
+from parsers import dispatch, santafe
+from parsers.pipeline import procesar
+
+def test_mismo_resultado_que_el_parser(cache_vacio):
+    for banco in ("santafe", "macro", "galicia"):
+        r = procesar(sintetico(banco), cache=cache_vacio, workers=1)
+        df, res = dispatch.cargar(banco).parsear(list(lineas(banco)))
+        assert r["slug"] == banco and r["res"] == res
+        assert r["df"].drop(columns="Clasificación", errors="ignore").equals(
+            df.drop(columns="Clasificación", errors="ignore"))
+
+def test_segunda_vez_todo_de_cache(cache_vacio):
+    data = sintetico("santafe")
+    r1 = procesar(data, cache=cache_vacio, workers=1, hasta="export")
+    assert set(r1["estados"].values()) == {"calculada"}
+    r2 = procesar(data, cache=cache_vacio, workers=1, hasta="export")
+    # clasificación en cache: no hace falta ni leer el PDF
+    assert r2["estados"] == {"deteccion": "cache", "clasificacion": "cache", "agregados": "cache", "export": "cache"}
+    assert r2["df"].equals(r1["df"]) and r2["agregados"] == r1["agregados"] and r2["xlsx"] == r1["xlsx"]
+
+def test_cambio_de_reglas_rehace_solo_clasificacion(cache_vacio, monkeypatch):
+    data = sintetico("santafe")
+    procesar(data, cache=cache_vacio, workers=1)
+    reglas = (("Otros", None, None),) + tuple(santafe.REGLAS)
+    monkeypatch.setattr(santafe, "REGLAS", reglas)
+    r = procesar(data, cache=cache_vacio, workers=1)
+    # la reconstrucción sale del cache: ni se leen las etapas anteriores
+    assert r["estados"] == {"deteccion": "cache", "reconstruccion": "cache",
+                            "clasificacion": "calculada", "agregados": "calculada"}
+    assert set(r["df"]["Clasificación"]) == {"Otros"} and r["agregados"]["total_gastos"] == 0
+
+def test_cambio_de_version_de_parseo(cache_vacio, monkeypatch):
+    data = sintetico("santafe")
+    procesar(data, cache=cache_vacio, workers=1)
+    monkeypatch.setattr(santafe, "VERSIONES", {**santafe.VERSIONES, "parseo": "test"})
+    r = procesar(data, cache=cache_vacio, workers=1)
+    assert r["estados"] == {"deteccion": "cache", "tokenizado": "cache", "parseo": "calculada",
+                            "reconstruccion": "calculada", "clasificacion": "calculada", "agregados": "calculada"}
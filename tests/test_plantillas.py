@@ -0,0 +1,110 @@
+# Plantillas de región: lo aprendido de una muestra recorta sin cambiar los movimientos.
+import io
+
+import pytest
+
+from conftest import sintetico
+from parsers import dispatch, plantillas, santafe
+from parsers.common import extract_all_lines
+
+@pytest.fixture(autouse=True)
+def _dir_propio(tmp_path, monkeypatch):
+    # sin plantillas guardadas para el resto de los tests (la detección mira `hay()`)
+    monkeypatch.setattr(plantillas, "PLANTILLAS_DIR", tmp_path)
+
+def _sin_clasificar(df):
+    return df.drop(columns=["Clasificación"], errors="ignore")
+
+@pytest.mark.parametrize("banco", ["santander", "santafe", "galicia"])
+def test_recorte_mismos_movimientos(banco):
+    data = sintetico(banco, 3)
+    pl = plantillas.aprender(data, banco)
+    assert set(pl) == {"banco", "version", "ancho", "alto", "bbox", "columnas", "encabezado", "encabezado_por_pagina", "fin"}
+    assert {c["tipo"] for c in pl["columnas"]} == {"fecha", "monto"}
+    completa = extract_all_lines(io.BytesIO(data), workers=1)
+    recortada = extract_all_lines(io.BytesIO(data), workers=1, plantilla=pl)
+    assert len(recortada) < len(completa)
+    mod = dispatch.cargar(banco)
+    (d1, r1), (d2, r2) = mod.parsear(completa), mod.parsear(recortada)
+    assert r1 == r2 and _sin_clasificar(d1).equals(_sin_clasificar(d2))
+    assert plantillas.probar(data, pl)["recortadas"] == 3
+
+def test_fin_de_tabla_santander():
+    data = sintetico("santander", 3)
+    pl = plantillas.aprender(data, "santander")
+    assert pl["fin"] == plantillas.FIN_RE["santander"]
+    assert not any("DETALLE IMPOSITIVO" in l.upper() for _, l in extract_all_lines(io.BytesIO(data), workers=1, plantilla=pl))
+
+def test_otro_tamano_usa_pagina_completa():
+    data = sintetico("santafe", 2)
+    pl = {**plantillas.aprender(data, "santafe"), "ancho": 1000.0}
+    assert plantillas.probar(data, pl)["recortadas"] == 0
+    assert extract_all_lines(io.BytesIO(data), workers=1, plantilla=pl) == extract_all_lines(io.BytesIO(data), workers=1)
+
+def test_guardar_y_versiones(tmp_path):
+    pl = plantillas.aprender(sintetico("macro", 2), "macro", version="2024-01")
+    assert plantillas.cargar("macro") is None and not plantillas.hay()
+    assert plantillas.guardar(pl) == tmp_path / "macro" / "2024-01.json"
+    assert plantillas.cargar("macro") == [pl] and plantillas.hay()
+    # otra versión no pisa la anterior; la más nueva va primero
+    nueva = {**pl, "version": "2024-06"}
+    plantillas.guardar(nueva)
+    assert plantillas.cargar("macro") == [nueva, pl]
+    v = plantillas.version(plantillas.cargar("macro"))
+    assert v.startswith("2024-06+2024-01-") and plantillas.version([nueva, {**pl, "bbox": [0, 0, 1, 1]}]) != v
+    assert plantillas.version(None) == "completa"
+
+def _santafe(corrimientos):
+    # resumen tipo Santa Fe con el encabezado de la tabla sólo en la primera página;
+    # `corrimientos`: por página, cuánto se corren (en x) las columnas de montos
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    saldo, k = 100000, 0
+    for pi, dx in enumerate(corrimientos):
+        c.setFont("Helvetica", 8)
+        y = 810
+        def fila(celdas):
+            nonlocal y
+            for x, t, der in celdas:
+                (c.drawRightString if der else c.drawString)(x, y, t)
+            y -= 15
+        fila([(40, "NUEVO BANCO DE SANTA FE S.A.", False)])
+        if pi == 0:
+            fila([(40, "FECHA MOVIMIENTO CONCEPTO IMPORTE SALDO", False)])
+            fila([(40, "SALDO ANTERIOR", False), (540 + dx, f"{saldo // 100},{saldo % 100:02d}", True)])
+        for _ in range(30):
+            k += 1; imp = 1000 * k + 25; saldo += imp
+            fila([(40, f"{1 + k // 20:02d}/03/2024", False), (110, "DEP EFEC CAJERO", False),
+                  (450 + dx, f"{imp // 100},{imp % 100:02d}", True), (540 + dx, f"{saldo // 100},{saldo % 100:02d}", True)])
+        if pi == len(corrimientos) - 1:
+            fila([(40, "SALDO AL 31/03/2024", False), (540 + dx, f"{saldo // 100},{saldo % 100:02d}", True)])
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+def _mismos_movimientos(data, pl):
+    completa = extract_all_lines(io.BytesIO(data), workers=1)
+    (d1, r1), (d2, r2) = (santafe.parsear(completa),
+                          santafe.parsear(extract_all_lines(io.BytesIO(data), workers=1, plantilla=pl)))
+    assert r1 == r2 and _sin_clasificar(d1).equals(_sin_clasificar(d2))
+    return d1
+
+def test_pagina_con_otro_layout_no_se_recorta():
+    pl = plantillas.aprender(_santafe([0, 0]), "santafe")
+    assert pl["encabezado"] and not pl["encabezado_por_pagina"]
+    # mismo tamaño de página, pero la segunda con los montos fuera del rectángulo aprendido
+    data = _santafe([0, 45])
+    assert plantillas.probar(data, pl)["recortadas"] == 1
+    assert (_mismos_movimientos(data, pl)["descripcion"] == "DEP EFEC CAJERO").sum() == 60
+
+def test_cada_pagina_con_su_version():
+    a = plantillas.aprender(_santafe([0, 0]), "santafe", version="2024-01")
+    b = plantillas.aprender(_santafe([-60, -60]), "santafe", version="2024-06")
+    plantillas.guardar(a); plantillas.guardar(b)
+    pls = plantillas.cargar("santafe")
+    data = _santafe([0, -60, 0])
+    assert plantillas.probar(data, pls)["versiones"] == {"2024-01": 2, "2024-06": 1}
+    assert plantillas.probar(data, a)["recortadas"] == 2
+    assert (_mismos_movimientos(data, pls)["descripcion"] == "DEP EFEC CAJERO").sum() == 90
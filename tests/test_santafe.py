@@ -0,0 +1,60 @@
+# Santa Fe: montos en centavos contra el parser original (app.py de la versión en
+# float sobre el mismo sintético) y saldo inicial ausente explícito.
+import numpy as np
+import pandas as pd
+
+from conftest import lineas
+from originales import SANTAFE as ORIGINAL
+from parsers import santafe
+from parsers.common import MONEY_RE, fmt_cents
+
+def _ponderado(s) -> int:
+    return int((np.arange(1, len(s) + 1) * s.to_numpy(dtype=np.int64)).sum())
+
+def test_centavos_como_el_original():
+    df, res = santafe.parsear(list(lineas("santafe")))
+    assert len(df) == ORIGINAL["filas"]
+    for k in ("saldo_inicial", "total_creditos", "total_debitos", "saldo_pdf"):
+        assert res[k] == ORIGINAL[k], k
+        assert isinstance(res[k], int)
+    assert res["diferencia"] == 0 and res["cuadra"] is True
+    assert df["debito"].dtype == "int64" and df["credito"].dtype == "int64"
+    assert df["saldo"].iloc[-1] == ORIGINAL["saldo_pdf"]
+
+def test_filas_como_el_original():
+    # reconstrucción por arrays vs el iterrows original: mismas filas, en el mismo orden
+    df, _ = santafe.parsear(list(lineas("santafe")))
+    assert tuple(_ponderado(df[c]) for c in ("debito", "credito", "saldo")) == ORIGINAL["ponderado"]
+    assert df["signo"].value_counts().to_dict() == ORIGINAL["signos"]
+
+def test_sin_saldo_por_linea_mismo_resultado():
+    # caso 2: sin la columna de saldo (un solo monto por línea) el saldo corrido sale
+    # del SALDO ANTERIOR y de los signos, y da lo mismo que con saldo por línea
+    def sin_saldo(l):
+        m = list(MONEY_RE.finditer(l))
+        return l[:m[-1].start()].rstrip() if len(m) >= 2 and "SALDO" not in l.upper() else l
+    ls = list(lineas("santafe"))
+    (d1, r1), (d2, r2) = santafe.parsear(ls), santafe.parsear([(p, sin_saldo(l)) for p, l in ls])
+    assert d2["mcount"].max() == 1
+    for c in ("debito", "credito", "saldo"):
+        assert d2[c].tolist() == d1[c].tolist(), c
+    assert r2 == r1
+
+def test_sin_saldo_anterior_queda_vacio():
+    ls = [x for x in lineas("santafe") if "SALDO ANTERIOR" not in x[1]]
+    df, res = santafe.parsear(ls)
+    # no se inventa un saldo inicial en 0: saldo corrido NA y conciliación sin datos
+    assert df["saldo"].isna().all()
+    assert res["saldo_inicial"] is None and res["saldo_calc"] is None and res["diferencia"] is None
+    assert res["cuadra"] is False
+    assert res["total_debitos"] == ORIGINAL["total_debitos"]
+    assert fmt_cents(res["saldo_inicial"]) == "—" and fmt_cents(df["saldo"].iloc[0]) == "—"
+
+def test_sin_saldo_por_linea_arranca_de_cero():
+    # caso 2 (una sola columna de montos): sin SALDO ANTERIOR el corrido parte de 0, como antes
+    df_raw = pd.DataFrame({"fecha": pd.to_datetime(["2024-03-01", "2024-03-02"]),
+                           "descripcion": ["DEP EFEC", "COMISION"], "desc_norm": ["DEP EFEC", "COMISION"],
+                           "importe_raw": [1000, 250], "saldo_pdf": pd.array([pd.NA, pd.NA], dtype="Int64"),
+                           "mcount": [1, 1], "pagina": [1, 1], "orden": [1, 2]})
+    df = santafe.reconstruir_santafe(df_raw, None)
+    assert df["saldo"].tolist() == [1000, 750]
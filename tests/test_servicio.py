@@ -0,0 +1,74 @@
+# Servicio HTTP: JSON/Parquet contra el pipeline, contrapresión y pool que se rehace
+# cuando muere un proceso.
+import io, json, os, signal, threading, time, urllib.error, urllib.request
+
+import pandas as pd
+import pytest
+
+from conftest import sintetico
+from parsers import servicio
+
+@pytest.fixture(scope="module")
+def url():
+    httpd = servicio.crear(port=0, workers=1, cola=1)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", httpd.RequestHandlerClass.servicio
+    httpd.shutdown(); httpd.server_close()
+    httpd.RequestHandlerClass.servicio.cerrar()
+
+def _post(base, ruta, data, tipo="application/pdf"):
+    req = urllib.request.Request(base + ruta, data=data, headers={"Content-Type": tipo}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=120) as r:
+            return r.status, r.read(), dict(r.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), dict(e.headers)
+
+def _multipart(archivos):
+    sep = "frontera"
+    partes = b"".join(f'--{sep}\r\nContent-Disposition: form-data; name="pdf"; filename="{n}"\r\n'
+                      f"Content-Type: application/pdf\r\n\r\n".encode() + d + b"\r\n" for n, d in archivos)
+    return partes + f"--{sep}--\r\n".encode(), f"multipart/form-data; boundary={sep}"
+
+def test_json_en_centavos(url):
+    base, _ = url
+    cuerpo, tipo = _multipart([("sf.pdf", sintetico("santafe")), ("gal.pdf", sintetico("galicia"))])
+    codigo, body, _ = _post(base, "/procesar?formato=json", cuerpo, tipo)
+    assert codigo == 200
+    out = json.loads(body)
+    assert out["montos"] == "centavos"
+    sf, gal = out["resultados"]
+    assert (sf["archivo"], sf["slug"], gal["slug"]) == ("sf.pdf", "santafe", "galicia")
+    assert sf["conciliacion"]["cuadra"] and sf["conciliacion"]["total_debitos"] == 240659888
+    assert all(isinstance(m["debito"], int) for m in sf["movimientos"])
+
+def test_parquet_con_fechas(url):
+    base, _ = url
+    codigo, body, _ = _post(base, "/procesar?formato=parquet", sintetico("galicia"))
+    assert codigo == 200
+    df = pd.read_parquet(io.BytesIO(body))
+    assert str(df["fecha"].dtype).startswith("datetime64") and df["fecha"].notna().all()
+    assert set(df["archivo"]) == {"documento.pdf"} and df["debito"].dtype == "int64"
+
+def test_contrapresion(url):
+    base, s = url
+    cuerpo, tipo = _multipart([(f"{i}.pdf", b"%PDF") for i in range(s.workers + s.cola + 1)])
+    assert _post(base, "/procesar", cuerpo, tipo)[0] == 413
+    assert s.reservar(s.workers + s.cola)
+    try:
+        codigo, _, headers = _post(base, "/procesar", sintetico("santafe"))
+    finally:
+        s.liberar(s.workers + s.cola)
+    assert codigo == 503 and headers["Retry-After"] == "1"
+
+def test_pool_roto_se_rehace(url):
+    base, s = url
+    pid = s.pool.submit(servicio._listo).result()
+    os.kill(pid, signal.SIGKILL)
+    time.sleep(0.5)
+    codigo, body, headers = _post(base, "/procesar", sintetico("santafe"))
+    assert codigo == 503 and headers["Retry-After"] == "1", body
+    codigo, body, _ = _post(base, "/procesar", sintetico("santafe"))
+    assert codigo == 200 and json.loads(body)["resultados"][0]["conciliacion"]["cuadra"]
+    with urllib.request.urlopen(base + "/metrics", timeout=30) as r:
+        assert json.loads(r.read())["reinicios_pool"] == 1
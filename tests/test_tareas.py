@@ -0,0 +1,24 @@
+# Extracción en paralelo desde hilos (modo "varios archivos" y script de Streamlit):
+# los workers salen de forkserver/spawn, nunca de un fork del proceso con hilos.
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import lineas, sintetico
+from parsers import common, tareas
+
+def test_contexto_sin_fork():
+    assert common._mp_contexto().get_start_method() in ("forkserver", "spawn")
+
+def test_extraccion_en_paralelo_desde_hilos():
+    data = sintetico("santafe", common.PARALLEL_MIN_PAGES + 2)
+    serie = list(lineas("santafe", common.PARALLEL_MIN_PAGES + 2))
+    with ThreadPoolExecutor(2) as ex:
+        futs = [ex.submit(common.extract_all_lines, io.BytesIO(data), 2) for _ in range(2)]
+        assert all(f.result(timeout=120) == serie for f in futs)
+
+def test_tarea_en_el_pool():
+    t = tareas.Tarea("sf.pdf", sintetico("santafe", common.PARALLEL_MIN_PAGES))
+    tareas.pool().submit(t.correr, "agregados", 2).result(timeout=120)
+    assert t.estado == "listo", t.error
+    assert t.banco == "Banco de Santa Fe" and t.paginas == common.PARALLEL_MIN_PAGES
+    assert t.resultado["res"]["cuadra"] and t.fila()["conciliado"] == "Sí"
@@ -0,0 +1,28 @@
+# Índice de tokens: los buscadores de saldo dan lo mismo que los originales (regex
+# línea por línea, en float) y aceptan el índice ya armado o la lista de líneas.
+import pandas as pd
+import pytest
+
+from conftest import lineas
+from originales import SALDOS as ORIGINAL
+from parsers import tokens
+
+@pytest.mark.parametrize("banco", ORIGINAL)
+def test_saldos_como_el_original(banco):
+    ant, fecha, fin = ORIGINAL[banco]
+    for ls in ([l for _, l in lineas(banco)], tokens.LineIndex.from_lines(lineas(banco))):
+        assert tokens.find_saldo_anterior_from_lines(ls) == ant
+        f, s = tokens.find_saldo_final_from_lines(ls)
+        assert s == fin and (pd.isna(f) if fecha is None else f == pd.Timestamp(fecha))
+
+def test_saldo_ultimo_resumen_en_las_lineas_siguientes():
+    ls = ["SALDO ULTIMO RESUMEN", "", "AL 29/02/2024 1.234,56", "OTRA 9,99"]
+    assert tokens.find_saldo_anterior_from_lines(ls) == 123456
+    # más allá de las 2 líneas siguientes no se busca
+    assert tokens.find_saldo_anterior_from_lines(["SALDO ULTIMO RESUMEN", "", "", "1,00"]) is None
+
+def test_indice_solo_lineas_utiles():
+    idx = tokens.LineIndex.from_lines([(1, "ENCABEZADO"), (1, "01/03/2024 COMPRA 1.000,00 -5,50"), (2, "SALDO FINAL 3,00")])
+    assert len(idx) == 2 and idx.linenos == [1, 2] and idx.pages == [1, 2]
+    assert idx.money_count(0) == 2 and idx.cents(0) == 100000 and idx.cents(0, -1) == -550
+    assert idx.date_token(0) == "01/03/2024" and idx.flagged(tokens.F_SALDO_FINAL) == [1]